@@ -0,0 +1,6 @@
+"""Benchmarks dos caminhos quentes dos serviços sobre bases sintéticas.
+
+    python scripts/bench_services.py gerar  bench.db --escala media
+    python scripts/bench_services.py rodar  bench.db --json antes.json
+    python scripts/bench_services.py comparar antes.json depois.json
+"""
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable
+from sqlalchemy.orm import sessionmaker
+from core.db import create_db_engine
+from core.auth import AuthService
+from core.rbac import RBACService
+from core.clients import ClientService
+from core.agenda import AgendaService
+from .datagen import PASSWORD, read_meta
+
+SEARCH_TERMS = ["silva", "ana souza", "lima", "cliente123", "oliv", "barbosa santos"]
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], object]
+    iterations: int
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 1) -> dict:
+    """Latências (ms) de `iterations` chamadas, após `warmup` chamadas descartadas."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "n": len(samples),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_ms": round(mean, 3),
+        "max_ms": round(samples[-1], 3),
+        "ops_per_s": round(1000 / mean, 2) if mean else None,
+    }
+
+
+class Suite:
+    """Casos de benchmark sobre uma base gerada por bench.datagen."""
+
+    def __init__(self, path: str, profile: str = "desktop-safe", seed: int = 7):
+        self.engine = create_db_engine(path, profile)
+        self.meta = read_meta(self.engine)
+        self.anchor = date.fromisoformat(self.meta["anchor"])
+        self.rng = random.Random(seed)
+        Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.auth = AuthService(Session)
+        self.rbac = RBACService(Session)
+        self.clients = ClientService(Session)
+        self.agenda = AgendaService(Session)
+        # um usuário de cada perfil relevante, com o snapshot de permissões
+        self.admin = self._login("admin0")
+        self.lawyer = self._login("advogado0")
+        self.reception = self._login("recepcao0")
+        self.lawyers = [self._login(f"advogado{i}") for i in range(min(8, self.meta["lawyers"]))]
+
+    def _login(self, username: str):
+        user = self.auth.authenticate(username, PASSWORD)
+        if user is None:
+            raise ValueError(f"Usuário {username!r} não existe na base de benchmark.")
+        return user, self.rbac.effective_permissions(user)
+
+    def _some_lawyer(self):
+        return self.rng.choice(self.lawyers)
+
+    def _some_day(self) -> date:
+        return self.anchor + timedelta(days=self.rng.randint(-60, 60))
+
+    def _walk_pages(self, user, permset, pages: int) -> None:
+        before = None
+        for _ in range(pages):
+            page = self.clients.list_clients_page(user, permset, before_id=before, limit=200)
+            if not page:
+                break
+            before = page[-1][0]
+
+    def _toggle_twice(self) -> None:
+        user, _ = self._some_lawyer()
+        d = self._some_day()
+        self.agenda.toggle_availability(user, d)
+        self.agenda.toggle_availability(user, d)  # volta ao estado original
+
+    def cases(self, repeat: int = 1) -> list[Case]:
+        admin, admin_perms = self.admin
+        lawyer, lawyer_perms = self.lawyer
+        reception, reception_perms = self.reception
+        a = self.anchor
+
+        def lawyer_call(fn):
+            def run():
+                user, perms = self._some_lawyer()
+                return fn(user, perms)
+            return run
+
+        cases = [
+            Case("auth.authenticate", lambda: self.auth.authenticate("advogado0", PASSWORD), 5),
+            Case("clients.list_clients[admin]", lambda: self.clients.list_clients(admin, admin_perms), 3),
+            Case("clients.list_clients[recepcao]",
+                 lambda: self.clients.list_clients(reception, reception_perms), 3),
+            Case("clients.list_clients_for_user[advogado]",
+                 lawyer_call(lambda u, p: self.clients.list_clients_for_user(u, p)), 10),
+            Case("clients.list_clients_page[50 páginas]",
+                 lambda: self._walk_pages(admin, admin_perms, 50), 10),
+            Case("clients.search",
+                 lambda: self.clients.search(self.rng.choice(SEARCH_TERMS), admin_perms,
+                                             limit=200, current_user=admin), 30),
+            Case("agenda.list_day",
+                 lawyer_call(lambda u, p: self.agenda.list_day(u, p, self._some_day())), 100),
+            Case("agenda.list_month",
+                 lawyer_call(lambda u, p: self.agenda.list_month(u, p, a.year, a.month)), 50),
+            Case("agenda.toggle_availability[x2]", self._toggle_twice, 50),
+            Case("users.list_users_with_roles", lambda: self.auth.list_users_with_roles(), 20),
+            # caminhos de atualização das telas (as mesmas chamadas que cada view dispara)
+            Case("view.home.refresh", lambda: self.agenda.list_day(lawyer, lawyer_perms, a), 100),
+            Case("view.agenda.refresh",
+                 lawyer_call(lambda u, p: (self.agenda.month_summary(u, a.year, a.month),
+                                           self.agenda.list_day(u, p, a))), 50),
+            Case("view.clients.refresh",
+                 lambda: self.clients.list_clients_page(admin, admin_perms, limit=200), 50),
+            Case("view.users.refresh", lambda: self.auth.list_users_with_roles(), 20),
+        ]
+        for case in cases:
+            case.iterations *= repeat
+        return cases
+
+    def run(self, only: list[str] | None = None, repeat: int = 1,
+            progress: Callable[[str, dict], None] | None = None) -> dict[str, dict]:
+        results = {}
+        for case in self.cases(repeat):
+            if only and not any(case.name.startswith(prefix) for prefix in only):
+                continue
+            results[case.name] = measure(case.run, case.iterations)
+            if progress:
+                progress(case.name, results[case.name])
+        return results
+
+    def close(self) -> None:
+        self.engine.dispose()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from core.db import Base, create_db_engine
+from core.auth import AuthService, DEFAULT_ROLES, hash_password
+from core.rbac import RBACService
+from core.models import Appointment, AvailabilityYear, Client, User, user_roles
+from core.clients import create_search_index
+from core import availability as bitmap
+
+KINDS = ["Reunião", "Audiência", "Visita", "Datas Próximas"]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fábio", "Gabriela", "Heitor", "Isabel",
+               "João", "Karina", "Lucas", "Marina", "Nelson", "Olívia", "Paulo", "Renata", "Sérgio",
+               "Tatiana", "Vítor"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Ferreira",
+              "Rodrigues", "Almeida", "Costa", "Gomes", "Martins", "Araújo", "Barbosa", "Ribeiro"]
+
+# senha de todos os usuários gerados (o hash é calculado uma vez só)
+PASSWORD = "bench"
+CHUNK = 10_000
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    clients: int
+    appointments: int
+    # fração dos usuários em cada papel (na ordem de DEFAULT_ROLES)
+    role_weights: tuple[float, ...] = (0.02, 0.6, 0.18, 0.2)
+    # anos de vagas (bitmap anual) por advogado, centrados no ano da âncora
+    availability_years: int = 3
+    # janela dos compromissos: âncora +- days_span
+    days_span: int = 365
+
+
+SCALES: dict[str, Scale] = {
+    "mini": Scale(users=40, clients=5_000, appointments=20_000),
+    "pequena": Scale(users=400, clients=50_000, appointments=300_000),
+    "media": Scale(users=2_000, clients=200_000, appointments=1_500_000),
+    "grande": Scale(users=4_000, clients=500_000, appointments=4_000_000),
+}
+
+
+def _cpf(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(9)]
+    for n in (10, 11):
+        total = sum(d * w for d, w in zip(digits, range(n, 1, -1)))
+        digits.append((total * 10 % 11) % 10)
+    s = "".join(map(str, digits))
+    return f"{s[:3]}.{s[3:6]}.{s[6:9]}-{s[9:]}"
+
+
+def _insert(conn, table, rows: list[dict]) -> None:
+    if rows:
+        conn.execute(table.insert(), rows)
+        rows.clear()
+
+
+def read_meta(bind) -> dict:
+    """Parâmetros gravados por `generate` (escala, semente, data-âncora)."""
+    with bind.connect() as conn:
+        return {k: json.loads(v) for k, v in conn.execute(text("SELECT key, value FROM bench_meta"))}
+
+
+def generate(
+    path: str | Path, scale: Scale, seed: int = 42, anchor: Optional[date] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> dict:
+    """Cria (do zero) uma base determinística em `path`.
+
+    Mesma escala + semente + data-âncora => mesmos dados. Os compromissos ficam
+    em âncora +- days_span; os benchmarks consultam a partir da âncora gravada.
+    """
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    rng = random.Random(seed)
+    report = progress or (lambda stage, n: None)
+    started = time.perf_counter()
+
+    eng = create_db_engine(path, "bulk-load")
+    Base.metadata.create_all(eng)
+    Session = sessionmaker(bind=eng, autoflush=False)
+    auth = AuthService(Session)
+    auth.get_or_create_roles()
+    rbac = RBACService(Session)
+    rbac.get_or_create_permissions()
+    rbac.assign_default_permissions_to_roles()
+
+    with eng.begin() as conn:
+        role_ids = dict(conn.execute(text("SELECT name, id FROM roles")).all())
+
+    # --- usuários: username = <papel><n>, todos com a mesma senha ---
+    pwd_hash = hash_password(PASSWORD)
+    counts = [max(1, round(scale.users * w)) for w in scale.role_weights]
+    users, links, lawyers = [], [], []
+    uid = 0
+    now = datetime(2025, 1, 1)
+    for (role, _), n in zip(DEFAULT_ROLES, counts):
+        for i in range(n):
+            uid += 1
+            users.append(dict(id=uid, username=f"{role}{i}", email=f"{role}{i}@bench.local",
+                              password_hash=pwd_hash, is_active=True, created_at=now))
+            links.append(dict(user_id=uid, role_id=role_ids[role]))
+            if role == "advogado":
+                lawyers.append(uid)
+    with eng.begin() as conn:
+        _insert(conn, User.__table__, users)
+        _insert(conn, user_roles, links)
+    report("users", uid)
+
+    # --- clientes (FTS criado depois da carga: um 'rebuild' no fim) ---
+    rows = []
+    with eng.begin() as conn:
+        for cid in range(1, scale.clients + 1):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+            doc = _cpf(rng) if rng.random() < 0.7 else None
+            owner = rng.choice(lawyers)
+            rows.append(dict(
+                id=cid, name=name, email=f"cliente{cid}@exemplo.com",
+                phone=f"+55329{rng.randrange(10**8):08d}", document=doc,
+                document_key=doc.replace(".", "").replace("-", "") if doc else None,
+                notes=None, created_at=now, updated_at=now,
+                created_by_id=owner, responsible_id=owner,
+            ))
+            if len(rows) >= CHUNK:
+                _insert(conn, Client.__table__, rows)
+                report("clients", cid)
+        _insert(conn, Client.__table__, rows)
+    create_search_index(eng)
+    report("clients", scale.clients)
+
+    # --- compromissos: só advogados têm agenda; datas em âncora +- days_span ---
+    today = anchor or date.today()
+    with eng.begin() as conn:
+        for n in range(1, scale.appointments + 1):
+            hour = rng.randrange(8, 18)
+            rows.append(dict(
+                user_id=rng.choice(lawyers),
+                client_id=rng.randrange(1, scale.clients + 1) if rng.random() < 0.8 else None,
+                date=today + timedelta(days=rng.randint(-scale.days_span, scale.days_span)),
+                start_time=dtime(hour), end_time=dtime(hour + 1),
+                kind=rng.choice(KINDS), notes=None, created_at=now, updated_at=now,
+            ))
+            if len(rows) >= CHUNK:
+                _insert(conn, Appointment.__table__, rows)
+                report("appointments", n)
+        _insert(conn, Appointment.__table__, rows)
+    report("appointments", scale.appointments)
+
+    # --- vagas: bitmap anual por advogado (~40% dos dias úteis abertos) ---
+    first_year = today.year - scale.availability_years // 2
+    with eng.begin() as conn:
+        for user_id in lawyers:
+            for year in range(first_year, first_year + scale.availability_years):
+                mask = 0
+                d = date(year, 1, 1)
+                while d.year == year:
+                    if d.weekday() < 5 and rng.random() < 0.4:
+                        mask |= 1 << bitmap.day_index(d)
+                    d += timedelta(days=1)
+                rows.append(dict(user_id=user_id, year=year, bits=bitmap.to_bytes(mask)))
+        _insert(conn, AvailabilityYear.__table__, rows)
+    report("availability", len(lawyers) * scale.availability_years)
+
+    meta = {
+        "seed": seed,
+        "anchor": today.isoformat(),
+        "scale": asdict(scale),
+        "users": uid,
+        "lawyers": len(lawyers),
+    }
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE bench_meta (key TEXT PRIMARY KEY, value TEXT)"))
+        conn.execute(text("INSERT INTO bench_meta VALUES (:k, :v)"),
+                     [{"k": k, "v": json.dumps(v)} for k, v in meta.items()])
+        conn.execute(text("ANALYZE"))
+    eng.dispose()
+    meta["seconds"] = round(time.perf_counter() - started, 1)
+    return meta
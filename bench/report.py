@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+import sqlalchemy
+
+# variação da mediana acima disso conta como regressão/melhora
+DEFAULT_THRESHOLD = 0.10
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parents[1], timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict:
+    return {
+        "git": _git_revision(),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def build_report(results: dict[str, dict], dataset: dict, profile: str) -> dict:
+    return {
+        "format": 1,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "profile": profile,
+        "dataset": dataset,
+        "results": results,
+    }
+
+
+def write_report(report: dict, path: str | Path) -> None:
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def load_report(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare(old: dict, new: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Compara as medianas caso a caso: status 'regressão', 'melhora', 'igual' ou 'novo'/'removido'."""
+    rows = []
+    old_res, new_res = old["results"], new["results"]
+    for name in sorted(set(old_res) | set(new_res)):
+        before, after = old_res.get(name), new_res.get(name)
+        if before is None or after is None:
+            rows.append({"case": name, "status": "novo" if before is None else "removido",
+                         "old_ms": before and before["median_ms"], "new_ms": after and after["median_ms"],
+                         "ratio": None})
+            continue
+        ratio = after["median_ms"] / before["median_ms"] if before["median_ms"] else None
+        if ratio is None:
+            status = "igual"
+        elif ratio > 1 + threshold:
+            status = "regressão"
+        elif ratio < 1 - threshold:
+            status = "melhora"
+        else:
+            status = "igual"
+        rows.append({"case": name, "status": status, "old_ms": before["median_ms"],
+                     "new_ms": after["median_ms"], "ratio": round(ratio, 3) if ratio else None})
+    return rows
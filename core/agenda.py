@@ -1,52 +1,305 @@
-from datetime import datetime, date
-from sqlalchemy import select, delete
+import json
+from datetime import datetime, date, time, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select, delete, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from core.db import SessionLocal as Session
-from core.models import Appointment, Availability
+from core.uow import session_scope
+from core.models import Appointment, AppointmentRule, AvailabilityYear
+from core import archive, audit, events
+from core.reminders import build_reminders
+from core import availability as bitmap
+from core.recurrence import FREQUENCIES, iter_occurrences, rule_exdates
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    """[primeiro dia do mês, primeiro dia do mês seguinte)."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _appointment_sort_key(appt):
+    return (appt.date, appt.start_time or time.min)
+
+
+def _occurrence(rule: AppointmentRule, d: date) -> Appointment:
+    return Appointment(
+        user_id=rule.user_id, client_id=rule.client_id, rule_id=rule.id,
+        date=d, start_time=rule.start_time, end_time=rule.end_time,
+        kind=rule.kind, notes=rule.notes, created_at=rule.created_at,
+    )
 
 
 class AgendaService:
+    def __init__(self, session_factory=Session):
+        self.session_factory = session_factory
+
     def list_day(self, user, permset, target_date: date):
-        with Session() as db:
+        with session_scope(self.session_factory) as db:
             stmt = select(Appointment).where(
                 Appointment.user_id == user.id,
                 Appointment.date == target_date
             ).order_by(Appointment.start_time)
-            return db.scalars(stmt).all()
+            items = list(db.scalars(stmt).all())
+            items += archive.load_archived(db, user.id, target_date, target_date)
+            items += self._virtual_occurrences(db, user.id, target_date, target_date)
+        return sorted(items, key=_appointment_sort_key)
 
     def list_month(self, user, permset, year: int, month: int):
-        with Session() as db:
+        start, end = month_bounds(year, month)
+        with session_scope(self.session_factory) as db:
             stmt = select(Appointment).where(
                 Appointment.user_id == user.id,
-                Appointment.date >= date(year, month, 1),
-                Appointment.date < date(year, month, 28)  # assume no mais de 28
+                Appointment.date >= start,
+                Appointment.date < end,
+            ).order_by(Appointment.date, Appointment.start_time)
+            items = list(db.scalars(stmt).all())
+            items += archive.load_archived(db, user.id, start, end - timedelta(days=1))
+            items += self._virtual_occurrences(db, user.id, start, end - timedelta(days=1))
+        return sorted(items, key=_appointment_sort_key)
+
+    def month_summary(self, user, year: int, month: int) -> dict[date, dict]:
+        """Resumo do mês para o calendário.
+
+        Retorna {dia: {"kinds": {tipo: qtd}, "total": qtd, "available": bool}}
+        apenas para os dias com compromissos ou vaga aberta: um GROUP BY nos
+        compromissos (UNION ALL com o arquivo morto, se o mês foi arquivado)
+        + a leitura do bitmap anual de vagas, na mesma sessão.
+        """
+        start, end = month_bounds(year, month)
+        summary: dict[date, dict] = {}
+        with session_scope(self.session_factory) as db:
+            src = archive.appointments_source(db, start, end - timedelta(days=1), "user_id", "kind")
+            stmt = (
+                select(src.c.date, src.c.kind, func.count())
+                .where(src.c.user_id == user.id, src.c.date >= start, src.c.date < end)
+                .group_by(src.c.date, src.c.kind)
             )
-            return db.scalars(stmt).all()
+            for day, kind, n in db.execute(stmt).all():
+                entry = summary.setdefault(day, {"kinds": {}, "total": 0, "available": False})
+                entry["kinds"][kind] = n
+                entry["total"] += n
+            for rule, d in self._pending_occurrences(db, user.id, start, end - timedelta(days=1)):
+                entry = summary.setdefault(d, {"kinds": {}, "total": 0, "available": False})
+                entry["kinds"][rule.kind] = entry["kinds"].get(rule.kind, 0) + 1
+                entry["total"] += 1
+            days = self._month_bits(db, user.id, year, month)
+        day = 1
+        while days:
+            if days & 1:
+                entry = summary.setdefault(date(year, month, day), {"kinds": {}, "total": 0, "available": False})
+                entry["available"] = True
+            days >>= 1
+            day += 1
+        return summary
+
+    # --- vagas (bitmap anual por usuário, ver core.availability) ---
+    def _year_bits(self, db, user_id: int, year: int) -> int:
+        row = db.get(AvailabilityYear, (user_id, year))
+        return bitmap.to_int(row.bits if row else None)
+
+    def _month_bits(self, db, user_id: int, year: int, month: int) -> int:
+        return bitmap.month_slice(self._year_bits(db, user_id, year), year, month)
+
+    def _store_year_bits(self, db, user_id: int, year: int, mask: int) -> None:
+        stmt = sqlite_insert(AvailabilityYear).values(user_id=user_id, year=year, bits=bitmap.to_bytes(mask))
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[AvailabilityYear.user_id, AvailabilityYear.year],
+            set_={"bits": stmt.excluded.bits},
+        ))
 
     def is_available(self, user, target_date: date):
-        with Session() as db:
-            exists = db.scalars(
-                select(Availability.id).where(
-                    Availability.user_id == user.id,
-                    Availability.date == target_date
-                )
-            ).first()
-            return exists is not None
+        with session_scope(self.session_factory) as db:
+            mask = self._year_bits(db, user.id, target_date.year)
+            return bool(mask >> bitmap.day_index(target_date) & 1)
+
+    def month_availability(self, user, year: int, month: int) -> int:
+        """Bitset do mês: bit (dia - 1) ligado => vaga aberta naquele dia."""
+        with session_scope(self.session_factory) as db:
+            return self._month_bits(db, user.id, year, month)
 
     def toggle_availability(self, user, target_date: date):
-        with Session() as db:
-            if self.is_available(user, target_date):
-                db.execute(
-                    delete(Availability).where(
-                        Availability.user_id == user.id,
-                        Availability.date == target_date
-                    )
+        with session_scope(self.session_factory, write=True) as db:
+            mask = self._year_bits(db, user.id, target_date.year)
+            mask ^= 1 << bitmap.day_index(target_date)
+            self._store_year_bits(db, user.id, target_date.year, mask)
+            db.commit()
+        audit.record("UPDATE", "availability", user.id,
+                     {"date": target_date, "open": bool(mask >> bitmap.day_index(target_date) & 1)},
+                     actor_id=user.id, session_factory=self.session_factory)
+
+    def set_availability(
+        self, user, start: date, end: date, is_open: bool = True,
+        weekdays: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Abre/fecha vagas em [start, end] numa única transação.
+
+        `weekdays` (0=segunda ... 6=domingo) aplica só a esses dias da semana,
+        ex.: toda terça até dezembro -> weekdays={1}.
+        """
+        if end < start:
+            return
+        weekdays = set(weekdays) if weekdays is not None else None
+        with session_scope(self.session_factory, write=True) as db:
+            for year in range(start.year, end.year + 1):
+                change = bitmap.year_mask(year, start, end, weekdays)
+                if not change:
+                    continue
+                mask = self._year_bits(db, user.id, year)
+                mask = (mask | change) if is_open else (mask & ~change)
+                self._store_year_bits(db, user.id, year, mask)
+            db.commit()
+        audit.record("UPDATE", "availability", user.id,
+                     {"start": start, "end": end, "open": is_open,
+                      "weekdays": sorted(weekdays) if weekdays is not None else None},
+                     actor_id=user.id, session_factory=self.session_factory)
+
+    def open_range(self, user, start: date, end: date, weekdays: Optional[Iterable[int]] = None) -> None:
+        self.set_availability(user, start, end, True, weekdays)
+
+    def close_range(self, user, start: date, end: date, weekdays: Optional[Iterable[int]] = None) -> None:
+        self.set_availability(user, start, end, False, weekdays)
+
+    # --- recorrência (regras guardadas uma vez, ocorrências geradas sob demanda) ---
+    def _pending_occurrences(self, db, user_id: int, start: date, end: date):
+        """(regra, data) ainda não materializadas dentro de [start, end]."""
+        rules = db.scalars(
+            select(AppointmentRule).where(
+                AppointmentRule.user_id == user_id,
+                AppointmentRule.dtstart <= end,
+                or_(AppointmentRule.until.is_(None), AppointmentRule.until >= start),
+            )
+        ).all()
+        for rule in rules:
+            lo = start
+            if rule.materialized_until is not None:
+                lo = max(start, rule.materialized_until + timedelta(days=1))
+            for d in iter_occurrences(rule, lo, end):
+                yield rule, d
+
+    def _virtual_occurrences(self, db, user_id: int, start: date, end: date) -> list[Appointment]:
+        # objetos transitórios (id=None, fora da sessão) só para exibição
+        return [_occurrence(rule, d) for rule, d in self._pending_occurrences(db, user_id, start, end)]
+
+    def create_rule(
+        self, user, permset, *, freq: str, dtstart: date, kind: str,
+        start: Optional[time] = None, end: Optional[time] = None,
+        notes: Optional[str] = None, client_id: Optional[int] = None,
+        interval: int = 1, until: Optional[date] = None, count: Optional[int] = None,
+        byweekday: Optional[Iterable[int]] = None,
+    ) -> AppointmentRule:
+        """Cria um compromisso recorrente (diário/semanal/mensal) sem gerar linhas."""
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Frequência inválida: {freq!r}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("Intervalo e quantidade devem ser positivos.")
+        with session_scope(self.session_factory, write=True) as db:
+            rule = AppointmentRule(
+                user_id=user.id, client_id=client_id, kind=kind, notes=notes,
+                start_time=start, end_time=end, freq=freq, interval=interval,
+                dtstart=dtstart, until=until, count=count,
+                byweekday=json.dumps(sorted(set(byweekday))) if byweekday else None,
+                created_at=datetime.utcnow(),
+            )
+            db.add(rule)
+            db.commit()
+            db.refresh(rule)
+            audit.record("CREATE", "appointment_rules", rule.id,
+                         {"freq": freq, "interval": interval, "dtstart": dtstart, "until": until,
+                          "count": count, "kind": kind}, actor_id=user.id,
+                         session_factory=self.session_factory)
+            return rule
+
+    def list_rules(self, user) -> list[AppointmentRule]:
+        with session_scope(self.session_factory) as db:
+            return db.scalars(
+                select(AppointmentRule)
+                .where(AppointmentRule.user_id == user.id)
+                .order_by(AppointmentRule.dtstart)
+            ).all()
+
+    def add_rule_exception(self, rule_id: int, target_date: date, user=None) -> None:
+        """Cancela uma ocorrência (e remove a linha, se já materializada).
+
+        Com `user`, só regras dele (regra de outro usuário = não encontrada).
+        """
+        with session_scope(self.session_factory, write=True) as db:
+            rule = db.get(AppointmentRule, rule_id)
+            if not rule or (user is not None and rule.user_id != user.id):
+                raise ValueError("Regra não encontrada.")
+            exdates = rule_exdates(rule) | {target_date}
+            rule.exdates = json.dumps(sorted(d.isoformat() for d in exdates))
+            db.execute(delete(Appointment).where(
+                Appointment.rule_id == rule_id, Appointment.date == target_date
+            ))
+            db.commit()
+        audit.record("UPDATE", "appointment_rules", rule_id, {"exdate": target_date},
+                     actor_id=user.id if user is not None else None,
+                     session_factory=self.session_factory)
+
+    def delete_rule(self, rule_id: int, keep_past: bool = True, user=None) -> None:
+        """Remove a regra; ocorrências materializadas passadas ficam como histórico.
+
+        Com `user`, regra de outro usuário é ignorada (como se não existisse).
+        """
+        with session_scope(self.session_factory, write=True) as db:
+            owner_id = db.scalar(select(AppointmentRule.user_id).where(AppointmentRule.id == rule_id))
+            if owner_id is None or (user is not None and owner_id != user.id):
+                return
+            stmt = delete(Appointment).where(Appointment.rule_id == rule_id)
+            if keep_past:
+                stmt = stmt.where(Appointment.date >= date.today())
+            db.execute(stmt)
+            db.execute(delete(AppointmentRule).where(AppointmentRule.id == rule_id))
+            db.commit()
+        audit.record("DELETE", "appointment_rules", rule_id, {"keep_past": keep_past},
+                     actor_id=user.id if user is not None else None,
+                     session_factory=self.session_factory)
+
+    def materialize_rules(self, user, horizon_days: int = 90) -> int:
+        """Grava como linhas as ocorrências até hoje + `horizon_days` (horizonte limitado).
+
+        Útil para quem precisa de ids reais (exportações, sincronização); o restante
+        continua sendo gerado sob demanda. Retorna quantas linhas foram inseridas.
+        Inserção em lote: não cria lembretes nem publica appointment.created.
+        """
+        horizon = date.today() + timedelta(days=horizon_days)
+        inserted = 0
+        with session_scope(self.session_factory, write=True) as db:
+            rules = db.scalars(
+                select(AppointmentRule).where(
+                    AppointmentRule.user_id == user.id,
+                    AppointmentRule.dtstart <= horizon,
+                    or_(AppointmentRule.materialized_until.is_(None),
+                        AppointmentRule.materialized_until < horizon),
                 )
-            else:
-                db.add(Availability(user_id=user.id, date=target_date))
+            ).all()
+            now = datetime.utcnow()
+            for rule in rules:
+                lo = rule.dtstart
+                if rule.materialized_until is not None:
+                    lo = rule.materialized_until + timedelta(days=1)
+                rows = [
+                    dict(user_id=rule.user_id, client_id=rule.client_id, rule_id=rule.id,
+                         date=d, start_time=rule.start_time, end_time=rule.end_time,
+                         kind=rule.kind, notes=rule.notes, created_at=now)
+                    for d in iter_occurrences(rule, lo, horizon)
+                ]
+                if rows:
+                    db.execute(Appointment.__table__.insert(), rows)
+                    inserted += len(rows)
+                rule.materialized_until = horizon
             db.commit()
+        if inserted:
+            audit.record("CREATE", "appointments", None,
+                         {"materialized": inserted, "until": horizon}, actor_id=user.id,
+                         session_factory=self.session_factory)
+        return inserted
 
     def create_appointment(self, user, permset, date, start, end, kind, notes, client_id):
-        with Session() as db:
+        """Cria o compromisso e seus lembretes na mesma transação; publica appointment.created."""
+        with session_scope(self.session_factory, write=True) as db:
             appt = Appointment(
                 user_id=user.id,
                 client_id=client_id,
@@ -55,17 +308,39 @@ class AgendaService:
                 end_time=end,
                 kind=kind,
                 notes=notes,
-                created_at=datetime.now()
+                created_at=datetime.utcnow()
             )
             db.add(appt)
+            db.flush()  # id para os lembretes
+            reminders = build_reminders(appt)
+            db.add_all(reminders)
             db.commit()
+            db.refresh(appt)
+            for r in reminders:
+                db.refresh(r)
+        audit.record("CREATE", "appointments", appt.id,
+                     {"date": date, "start": start, "kind": kind, "client_id": client_id},
+                     actor_id=user.id, session_factory=self.session_factory)
+        events.publish("appointment.created", appointment=appt, reminders=reminders)
+        return appt
 
-    def delete_appointment(self, appt_id: int):
-        with Session() as db:
-            db.execute(delete(Appointment).where(Appointment.id == appt_id))
+    def delete_appointment(self, appt_id: int, user=None):
+        # lembretes saem junto (ON DELETE CASCADE); com `user`, só compromisso dele
+        stmt = delete(Appointment).where(Appointment.id == appt_id)
+        if user is not None:
+            stmt = stmt.where(Appointment.user_id == user.id)
+        with session_scope(self.session_factory, write=True) as db:
+            user_id = db.execute(stmt.returning(Appointment.user_id)).scalar()
             db.commit()
+        if user_id is not None:
+            audit.record("DELETE", "appointments", appt_id, actor_id=user.id if user is not None else None,
+                         session_factory=self.session_factory)
+            events.publish("appointment.deleted", appointment_id=appt_id, user_id=user_id)
 
     def list_appointments(self, user):
-        with Session() as db:
+        # base ativa + todos os anos do arquivo morto (estes como objetos transitórios)
+        with session_scope(self.session_factory) as db:
             stmt = select(Appointment).where(Appointment.user_id == user.id)
-            return db.scalars(stmt).all()
+            items = list(db.scalars(stmt).all())
+            items += archive.load_archived(db, user.id, date.min, date.max)
+            return items
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import Column, Index, MetaData, Table, and_, delete, exists, func, select, union_all
+from .config import ARCHIVE_AFTER_DAYS, ARCHIVE_DIR as _CONFIG_ARCHIVE_DIR
+from .db import DB_PATH, SessionLocal
+from .uow import session_scope
+from .models import Appointment, ArchivePartition
+from . import audit
+
+# Arquivo morto da agenda: compromissos com mais de ARCHIVE_AFTER_DAYS saem de
+# juris.db para um SQLite por ano (agenda-AAAA.db). O arquivo de um ano só é
+# anexado (ATTACH ... AS arq_AAAA) à conexão quando uma consulta alcança o
+# ano, e continua anexado enquanto a conexão estiver no pool (ver
+# core.db.KEEP_ATTACHED). O catálogo archive_partitions, na base ativa, diz
+# quais anos existem, então consultas do presente não tocam em disco extra.
+
+ARCHIVE_DIR = Path(_CONFIG_ARCHIVE_DIR).resolve() if _CONFIG_ARCHIVE_DIR else DB_PATH.parent / "arquivo"
+
+_tables: dict[int, Table] = {}
+
+
+def archive_path(year: int, directory: Optional[Path] = None) -> Path:
+    return (directory or ARCHIVE_DIR) / f"agenda-{year}.db"
+
+
+def _schema(year: int) -> str:
+    return f"arq_{year}"
+
+
+def archive_table(year: int) -> Table:
+    """Tabela `appointments` do arquivo do ano (mesmas colunas, sem FKs entre bancos)."""
+    table = _tables.get(year)
+    if table is None:
+        cols = [Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in Appointment.__table__.columns]
+        table = Table("appointments", MetaData(), *cols, schema=_schema(year))
+        Index(f"ix_{_schema(year)}_user_date", table.c.user_id, table.c.date)
+        table = _tables.setdefault(year, table)
+    return table
+
+
+def attach(db, year: int, filename: Optional[str] = None) -> Table:
+    """Anexa o arquivo do ano à conexão da sessão (uma vez por conexão)."""
+    conn = db.connection()
+    attached = conn.info.setdefault("attached", set())
+    name = _schema(year)
+    if name not in attached:
+        path = Path(filename) if filename else archive_path(year)
+        conn.exec_driver_sql(f"ATTACH DATABASE ? AS {name}", (str(path),))
+        attached.add(name)
+    return archive_table(year)
+
+
+def archived_tables(db, start: date, end: date) -> list[Table]:
+    """Tabelas arquivadas com dados em [start, end]; vazio no caso comum."""
+    parts = db.execute(
+        select(ArchivePartition.year, ArchivePartition.filename)
+        .where(ArchivePartition.year >= start.year, ArchivePartition.year <= end.year,
+               ArchivePartition.rows > 0)
+    ).all()
+    return [attach(db, year, filename) for year, filename in parts]
+
+
+def appointments_source(db, start: date, end: date, *columns: str):
+    """FROM de compromissos em [start, end]: a tabela ativa ou UNION ALL com o arquivo.
+
+    Devolve um selecionável com as colunas pedidas (e `date` para o filtro).
+    """
+    tables = archived_tables(db, start, end)
+    hot = Appointment.__table__
+    if not tables:
+        return hot
+    names = dict.fromkeys((*columns, "date"))
+    parts = [select(*(t.c[n] for n in names)) for t in (hot, *tables)]
+    return union_all(*parts).subquery("appointments_all")
+
+
+def load_archived(db, user_id: int, start: date, end: date) -> list[Appointment]:
+    """Compromissos arquivados do usuário em [start, end] como objetos transitórios.
+
+    Ficam fora da sessão (como as ocorrências virtuais): só para exibição.
+    """
+    items = []
+    for t in archived_tables(db, start, end):
+        rows = db.execute(
+            select(t).where(t.c.user_id == user_id, t.c.date >= start, t.c.date <= end)
+        ).mappings().all()
+        items += [Appointment(**row) for row in rows]
+    return items
+
+
+class ArchiveService:
+    def __init__(self, session_factory=SessionLocal, directory: Optional[Path] = None):
+        self.session_factory = session_factory
+        self.directory = Path(directory) if directory else ARCHIVE_DIR
+
+    def cutoff(self, days: Optional[int] = None) -> date:
+        return date.today() - timedelta(days=ARCHIVE_AFTER_DAYS if days is None else days)
+
+    def pending(self, before: date) -> dict[int, int]:
+        """{ano: quantidade} que archive(before) moveria."""
+        year = func.strftime("%Y", Appointment.date)
+        with session_scope(self.session_factory) as db:
+            rows = db.execute(
+                select(year, func.count()).where(Appointment.date < before).group_by(year)
+            ).all()
+        return {int(y): n for y, n in rows}
+
+    def archive(self, before: date) -> dict[int, int]:
+        """Move para o arquivo anual os compromissos com date < before.
+
+        Um ano por transação: cópia e remoção da base ativa no mesmo COMMIT;
+        os lembretes saem junto pelo CASCADE. Em WAL o commit é atômico por
+        arquivo, não entre arquivos: se cair no meio, rodar de novo conclui o
+        ano sem duplicar linhas no arquivo.
+
+        O SQLite reaproveita ids apagados: um compromisso novo (retroativo)
+        pode ter o id de uma linha já arquivada. A cópia nunca sobrescreve o
+        arquivo; só sai da base ativa a linha que lá está idêntica, e as
+        demais ficam na base ativa (contadas em "kept" na auditoria).
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        hot = Appointment.__table__
+        cols = [c.name for c in hot.columns]
+        moved: dict[int, int] = {}
+        for year in sorted(self.pending(before)):
+            lo = date(year, 1, 1)
+            hi = min(before, date(year + 1, 1, 1))
+            path = archive_path(year, self.directory)
+            with session_scope(self.session_factory, write=True) as db:
+                t = attach(db, year, str(path))
+                t.create(db.connection(), checkfirst=True)
+                in_year = (hot.c.date >= lo) & (hot.c.date < hi)
+                db.execute(
+                    t.insert().prefix_with("OR IGNORE")
+                    .from_select(cols, select(*(hot.c[c] for c in cols)).where(in_year))
+                )
+                # alias: as duas tabelas se chamam "appointments" no SQL
+                arq = t.alias("arq")
+                copied = exists().where(and_(*(arq.c[c].is_not_distinct_from(hot.c[c]) for c in cols)))
+                n = db.execute(delete(hot).where(in_year, copied)).rowcount
+                kept = db.scalar(select(func.count()).select_from(hot).where(in_year))
+                total = db.scalar(select(func.count()).select_from(t))
+                part = db.get(ArchivePartition, year)
+                if part is None:
+                    part = ArchivePartition(year=year, filename=str(path))
+                    db.add(part)
+                part.filename = str(path)
+                part.archived_until = max(part.archived_until or hi, hi)
+                part.rows = total
+                part.updated_at = datetime.utcnow()
+                db.commit()
+            moved[year] = n
+            audit.record("ARCHIVE", "appointments", None,
+                         {"year": year, "rows": n, "kept": kept, "before": before},
+                         session_factory=self.session_factory)
+        return moved
+
+    def partitions(self) -> list[ArchivePartition]:
+        with session_scope(self.session_factory) as db:
+            return db.scalars(select(ArchivePartition).order_by(ArchivePartition.year)).all()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+import atexit
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, NamedTuple, Optional
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import sessionmaker
+from .db import SessionLocal
+from .uow import after_commit, session_scope
+from .writes import write_coordinator
+from .models import AuditLog
+
+# Auditoria: os serviços chamam record(...) e seguem em frente; os eventos
+# vão para uma fila em memória e uma thread grava em lotes (um INSERT
+# executemany por lote), então auditar não acrescenta commit por ação.
+# Dentro de um unit of work o evento só entra na fila depois do commit.
+# occurred_at é a hora de record() (quando a ação aconteceu), não a da
+# gravação do lote: a ordem por id pode diferir dela entre estações.
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5  # s: espera máxima de um evento na fila
+
+_actor_id: Optional[int] = None
+# ator da requisição em andamento (modo servidor: várias sessões no processo)
+_request_actor: ContextVar[Optional[int]] = ContextVar("juris_audit_actor", default=None)
+
+
+def set_actor(user_id: Optional[int]) -> None:
+    """Usuário logado (padrão do ator quando o serviço não recebe um).
+
+    Vale para o processo todo: serve ao app de mesa (um usuário por vez); com
+    vários usuários no mesmo processo use acting_as.
+    """
+    global _actor_id
+    _actor_id = user_id
+
+
+@contextmanager
+def acting_as(user_id: Optional[int]) -> Iterator[None]:
+    """Ator padrão de record() neste contexto (thread/tarefa), acima de set_actor."""
+    token = _request_actor.set(user_id)
+    try:
+        yield
+    finally:
+        _request_actor.reset(token)
+
+
+def _current_actor() -> Optional[int]:
+    actor = _request_actor.get()
+    return actor if actor is not None else _actor_id
+
+
+class AuditWriter:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, row: dict) -> None:
+        if self._thread is None:
+            self._start()
+        self._queue.put(row)
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            batch, waiters = [], []
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)  # flush(): grava já o que chegou até aqui
+                    break
+                batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for w in waiters:
+                w.set()
+
+    def _write(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            with self.session_factory() as db, write_coordinator.transaction(db):
+                db.execute(AuditLog.__table__.insert(), batch)
+                db.commit()
+            self.written += len(batch)
+        except Exception as e:  # auditoria nunca derruba a aplicação
+            self.failed += len(batch)
+            print(f"[ERRO] Falha ao gravar {len(batch)} evento(s) de auditoria: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a fila atual ser gravada (encerramento, testes, consultas do admin)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+
+# um escritor por banco (fábrica de sessão): serviços apontados para outra
+# base (benchmarks, scripts) auditam nela, não no juris.db padrão
+_writers: dict[sessionmaker, AuditWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(session_factory: sessionmaker = SessionLocal) -> AuditWriter:
+    writer = _writers.get(session_factory)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.setdefault(session_factory, AuditWriter(session_factory))
+    return writer
+
+
+@atexit.register
+def _flush_all() -> None:
+    for writer in list(_writers.values()):
+        writer.flush()
+
+
+def record(
+    action: str, entity_table: str, entity_id: Any = None,
+    payload: Optional[dict] = None, actor_id: Optional[int] = None,
+    session_factory: sessionmaker = SessionLocal,
+) -> None:
+    """Enfileira um evento de auditoria (não bloqueia, não abre transação)."""
+    row = {
+        "actor_user_id": actor_id if actor_id is not None else _current_actor(),
+        "action": action,
+        "entity_table": entity_table,
+        "entity_id": None if entity_id is None else str(entity_id),
+        "payload_json": json.dumps(payload, ensure_ascii=False, default=str) if payload else None,
+        "occurred_at": datetime.now(),
+    }
+    writer = get_writer(session_factory)
+    after_commit(lambda: writer.submit(row))
+
+
+class AuditEntry(NamedTuple):
+    id: int
+    occurred_at: datetime
+    actor_user_id: Optional[int]
+    action: str
+    entity_table: str
+    entity_id: Optional[str]
+    payload_json: Optional[str]
+
+
+class AuditService:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def query(
+        self, permset: set[str], *, actor_id: Optional[int] = None,
+        entity_table: Optional[str] = None, entity_id: Any = None, action: Optional[str] = None,
+        since: Optional[datetime] = None, until: Optional[datetime] = None,
+        before_id: Optional[int] = None, limit: int = 100,
+    ) -> list[AuditEntry]:
+        """Página de eventos, do mais novo para o mais antigo (keyset por occurred_at, id).
+
+        Próxima página: before_id = id do último item recebido. Filtros por
+        ator ou entidade usam os índices (ator, occurred_at) / (tabela,
+        entidade, occurred_at), que já entregam a página na ordem pedida; o
+        intervalo de datas filtra occurred_at direto, então o custo não
+        cresce com a tabela.
+        """
+        if "audit.view" not in permset:
+            raise PermissionError("Sem permissão para consultar a auditoria.")
+        t = AuditLog
+        with session_scope(self.session_factory) as db:
+            stmt = select(t.id, t.occurred_at, t.actor_user_id, t.action,
+                          t.entity_table, t.entity_id, t.payload_json)
+            if since is not None:
+                stmt = stmt.where(t.occurred_at >= since)
+            if until is not None:
+                stmt = stmt.where(t.occurred_at < until)
+            if before_id is not None:
+                last_at = db.scalar(select(t.occurred_at).where(t.id == before_id))
+                if last_at is None:
+                    return []
+                stmt = stmt.where(t.occurred_at <= last_at,
+                                  tuple_(t.occurred_at, t.id) < tuple_(last_at, before_id))
+            if actor_id is not None:
+                stmt = stmt.where(t.actor_user_id == actor_id)
+            if entity_table is not None:
+                stmt = stmt.where(t.entity_table == entity_table)
+                if entity_id is not None:
+                    stmt = stmt.where(t.entity_id == str(entity_id))
+            if action is not None:
+                stmt = stmt.where(t.action == action)
+            rows = db.execute(stmt.order_by(t.occurred_at.desc(), t.id.desc()).limit(limit)).all()
+        return [AuditEntry(*r) for r in rows]
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional
-from sqlalchemy import select, text
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from sqlalchemy import select, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 import bcrypt
 from .db import SessionLocal, engine
-from .models import Base, User, Role
-from .security import hash_password, verify_password
-from .rbac import RBACService
+from .uow import session_scope, uow
+from .models import Base, User, Role, user_roles
+from .rbac import RBACService, bump_permissions_version
+from .refcache import reference_cache, invalidate_reference_data
+from . import audit
+from .clients import drop_search_index
+from .schema import ensure_schema, reset_schema_version
 
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -24,33 +30,31 @@ DEFAULT_ROLES = [
     ("estagiario", "Apoio com permissões restritas"),
 ]
 
+# Pool dedicado ao login: verificação do hash e carga de papéis em paralelo,
+# sempre fora da thread da interface.
+_auth_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth")
+
 class AuthService:
     def __init__(self, session_factory=SessionLocal):
         self.session_factory = session_factory
         self._rbac = RBACService(session_factory)
 
     # --- schema ---
-    def create_schema_if_needed(self) -> None:
-        Base.metadata.create_all(bind=engine)
-    # Força criação física com escrita garantida
-        try:
-            with self.session_factory() as db:
-                db.execute(text("CREATE TABLE IF NOT EXISTS __init_check (id INTEGER PRIMARY KEY AUTOINCREMENT)"))
-                result = db.execute(text("SELECT COUNT(*) FROM __init_check"))
-                if result.scalar_one() == 0:
-                    db.execute(text("INSERT INTO __init_check DEFAULT VALUES"))
-                db.commit()
-        except Exception as e:
-            print(f"[ERRO] Não foi possível garantir a criação do banco: {e}")
-
+    def create_schema_if_needed(self) -> bool:
+        """Migra/semeia só se o carimbo de versão do banco mudou (ver core.schema)."""
+        return ensure_schema(engine, seed=self.ensure_root_user)
 
     def reset_database(self) -> None:
+        drop_search_index(engine)
         Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
+        reset_schema_version(engine)
+        ensure_schema(engine, seed=self.ensure_root_user)
+        bump_permissions_version()
+        invalidate_reference_data()
 
     # --- roles ---
     def get_or_create_roles(self) -> list[Role]:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             existing = {r.name: r for r in db.scalars(select(Role)).all()}
             changed = False
             for name, desc in DEFAULT_ROLES:
@@ -59,15 +63,38 @@ class AuthService:
                     changed = True
             if changed:
                 db.commit()
+                bump_permissions_version()
+                invalidate_reference_data("roles")
             return db.scalars(select(Role).order_by(Role.name)).all()
 
     def list_roles(self) -> list[Role]:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             return db.scalars(select(Role).order_by(Role.name)).all()
 
+    def list_role_names(self) -> tuple[str, ...]:
+        """Nomes dos papéis, em cache (ver core.refcache)."""
+        def load():
+            with session_scope(self.session_factory) as db:
+                return tuple(db.scalars(select(Role.name).order_by(Role.name)).all())
+        return reference_cache.get("roles", load)
+
+    def list_responsibles(self, role_name: str = "advogado") -> tuple[tuple[int, str], ...]:
+        """(id, username) dos usuários com o papel, para combos de responsável; em cache."""
+        def load():
+            with session_scope(self.session_factory) as db:
+                rows = db.execute(
+                    select(User.id, User.username)
+                    .join(user_roles, user_roles.c.user_id == User.id)
+                    .join(Role, Role.id == user_roles.c.role_id)
+                    .where(Role.name == role_name)
+                    .order_by(User.username)
+                ).all()
+                return tuple((uid, uname) for uid, uname in rows)
+        return reference_cache.get(f"users.by_role:{role_name}", load)
+
     # --- users ---
     def create_user(self, username: str, email: str, password: str, roles: list[str]) -> User:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             role_objs = db.scalars(select(Role).where(Role.name.in_(roles))).all()
             user = User(
                 username=username,
@@ -81,35 +108,147 @@ class AuthService:
             except IntegrityError as e:
                 db.rollback()
                 raise ValueError(f"Usuário ou email já existe: {e}")
+            invalidate_reference_data("users.")
             db.refresh(user)
+            audit.record("CREATE", "users", user.id, {"username": username, "email": email, "roles": roles},
+                         session_factory=self.session_factory)
             return user
 
     def authenticate(self, username_or_email: str, password: str) -> Optional[User]:
         """Retorna o User com roles/permissions *pré-carregados* se a senha bater."""
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             stmt = (
                 select(User)
                 .options(selectinload(User.roles).selectinload(Role.permissions))
                 .where((User.username == username_or_email) | (User.email == username_or_email))
             )
             user = db.scalars(stmt).first()
-            if not user or not user.is_active:
-                return None
-            if verify_password(password, user.password_hash):
+            if user and user.is_active and verify_password(password, user.password_hash):
+                audit.record("LOGIN", "users", user.id, actor_id=user.id,
+                             session_factory=self.session_factory)
                 return user
+            audit.record("LOGIN_FAILED", "users", None, {"login": username_or_email},
+                         session_factory=self.session_factory)
+            return None
+
+    def logout(self, user_id: int) -> None:
+        audit.record("LOGOUT", "users", user_id, actor_id=user_id, session_factory=self.session_factory)
+
+    def authenticate_async(
+        self,
+        username_or_email: str,
+        password: str,
+        callback: Optional[Callable[[Future], None]] = None,
+    ) -> Future:
+        """Versão não bloqueante de `authenticate`.
+
+        A verificação da senha (lenta por definição) e a carga do usuário com
+        roles/permissions rodam em paralelo no pool de autenticação. O Future
+        resolve com o User (ou None); `callback` é chamado na thread do pool.
+        """
+        result: Future = Future()
+        verified = _auth_pool.submit(self._verify_credentials, username_or_email, password)
+        loaded = _auth_pool.submit(self._load_session_user, username_or_email)
+        lock = threading.Lock()
+
+        def _join(_):
+            with lock:
+                if result.done() or not (verified.done() and loaded.done()):
+                    return
+                try:
+                    user_id = verified.result()
+                    user = loaded.result()
+                except Exception as e:
+                    result.set_exception(e)
+                    return
+                # as duas consultas precisam ter achado o mesmo registro
+                ok = user_id is not None and user is not None and user.id == user_id
+                if ok:
+                    audit.record("LOGIN", "users", user.id, actor_id=user.id,
+                                 session_factory=self.session_factory)
+                else:
+                    audit.record("LOGIN_FAILED", "users", None, {"login": username_or_email},
+                                 session_factory=self.session_factory)
+                result.set_result(user if ok else None)
+
+        verified.add_done_callback(_join)
+        loaded.add_done_callback(_join)
+        if callback is not None:
+            result.add_done_callback(callback)
+        return result
+
+    def _verify_credentials(self, username_or_email: str, password: str) -> Optional[int]:
+        """Busca só id/hash/ativo e verifica a senha. Retorna o id se bater."""
+        with session_scope(self.session_factory) as db:
+            row = db.execute(
+                select(User.id, User.password_hash, User.is_active)
+                .where((User.username == username_or_email) | (User.email == username_or_email))
+            ).first()
+        if not row or not row.is_active:
             return None
+        return row.id if verify_password(password, row.password_hash) else None
+
+    def _load_session_user(self, username_or_email: str) -> Optional[User]:
+        """Carrega o User com roles/permissions e já aquece o snapshot do RBAC."""
+        with session_scope(self.session_factory) as db:
+            user = db.scalars(
+                select(User)
+                .options(selectinload(User.roles).selectinload(Role.permissions))
+                .where((User.username == username_or_email) | (User.email == username_or_email))
+            ).first()
+        if user is not None and user.is_active:
+            self._rbac.effective_permissions(user)
+            return user
+        return None
 
     def list_users(self) -> list[tuple[int, str, str, bool]]:
         """Retorna somente colunas básicas para evitar duplicações por join."""
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             rows = db.execute(
                 select(User.id, User.username, User.email, User.is_active).order_by(User.id)
             ).all()
             return [(r[0], r[1], r[2], r[3]) for r in rows]
 
+    def list_users_with_roles(
+        self,
+        *,
+        role: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[tuple[int, str, str, bool, str]]:
+        """(id, username, email, ativo, "papel1, papel2") numa única consulta agrupada.
+
+        `role` filtra usuários que possuem o papel; `limit`/`offset` paginam.
+        """
+        with session_scope(self.session_factory) as db:
+            stmt = (
+                select(
+                    User.id, User.username, User.email, User.is_active,
+                    func.group_concat(Role.name, ","),
+                )
+                .outerjoin(user_roles, user_roles.c.user_id == User.id)
+                .outerjoin(Role, Role.id == user_roles.c.role_id)
+                .group_by(User.id)
+                .order_by(User.id)
+            )
+            if role is not None:
+                has_role = (
+                    select(user_roles.c.user_id)
+                    .join(Role, Role.id == user_roles.c.role_id)
+                    .where(Role.name == role)
+                )
+                stmt = stmt.where(User.id.in_(has_role))
+            if limit is not None:
+                stmt = stmt.limit(limit).offset(offset)
+            rows = db.execute(stmt).all()
+            return [
+                (r[0], r[1], r[2], r[3], ", ".join(sorted(r[4].split(","))) if r[4] else "")
+                for r in rows
+            ]
+
     def list_users_by_role(self, role_name: str) -> list[User]:
         """Lista usuários que possuem determinado papel (ex.: 'advogado')."""
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             result = db.execute(
                 select(User)
                 .join(User.roles)
@@ -119,7 +258,7 @@ class AuthService:
             return result
 
     def get_user(self, user_id: int) -> Optional[User]:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             return db.get(User, user_id)
 
     def update_user(
@@ -132,7 +271,7 @@ class AuthService:
         is_active: Optional[bool] = None,
         roles: Optional[list[str]] = None,
     ) -> User:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             u = db.get(User, user_id)
             if not u:
                 raise ValueError("Usuário não encontrado")
@@ -154,26 +293,44 @@ class AuthService:
             except IntegrityError as e:
                 db.rollback()
                 raise ValueError(f"Conflito de unicidade: {e}")
+            bump_permissions_version()
+            invalidate_reference_data("users.")
             db.refresh(u)
+            changed = {"username": username, "email": email, "is_active": is_active, "roles": roles}
+            changed = {k: v for k, v in changed.items() if v is not None}
+            if password:
+                changed["password"] = "***"
+            audit.record("UPDATE", "users", user_id, changed, session_factory=self.session_factory)
             return u
 
     def delete_user(self, user_id: int) -> None:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             u = db.get(User, user_id)
             if not u:
                 return
+            username = u.username
             db.delete(u)
             db.commit()
+        bump_permissions_version()
+        invalidate_reference_data("users.")
+        audit.record("DELETE", "users", user_id, {"username": username},
+                     session_factory=self.session_factory)
 
     # --- seed inicial (papéis, permissões + 1 usuário por papel) ---
     def seed_one_actor_per_role(self) -> dict[str, str]:
         created: dict[str, str] = {}
 
-        # garante papéis e permissões
-        self.get_or_create_roles()
-        self._rbac.get_or_create_permissions()
-        self._rbac.assign_default_permissions_to_roles()
+        # tudo numa transação só: papéis, permissões, vínculos e usuários
+        with uow(self.session_factory):
+            self.get_or_create_roles()
+            self._rbac.get_or_create_permissions()
+            self._rbac.assign_default_permissions_to_roles()
+            self._seed_users(created)
+        if created:
+            invalidate_reference_data("users.")
+        return created
 
+    def _seed_users(self, created: dict[str, str]) -> None:
         defaults = [
             ("admin", "admin@local", "admin", ["admin"]),
             ("advogada", "advogada@local", "advogada", ["advogado"]),
@@ -181,7 +338,7 @@ class AuthService:
             ("estagiario", "estagiario@local", "estagiario", ["estagiario"]),
         ]
 
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             for username, email, pwd, roles in defaults:
                 exists = db.scalars(select(User).where(User.username == username)).first()
                 if exists:
@@ -196,11 +353,10 @@ class AuthService:
                 db.add(u)
                 created[username] = roles[0]
             db.commit()
-        return created
 
     def ensure_root_user(self):
             self.get_or_create_roles()
-            with self.session_factory() as db:
+            with session_scope(self.session_factory, write=True) as db:
                 from .models import User, Role
                 from sqlalchemy import select
                 root = db.scalars(select(User).where(User.username == "root")).first()
@@ -218,4 +374,5 @@ class AuthService:
                         is_active=True,
                     )
                     db.add(root)
-                    db.commit()
\ No newline at end of file
+                    db.commit()
+                    invalidate_reference_data("users.")
\ No newline at end of file
@@ -0,0 +1,74 @@
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import text
+
+# 366 bits cabem em 46 bytes; o bit i corresponde ao dia (i + 1) do ano.
+YEAR_BYTES = 46
+
+
+def day_index(d: date) -> int:
+    return d.timetuple().tm_yday - 1
+
+
+def to_int(bits: Optional[bytes]) -> int:
+    return int.from_bytes(bits, "little") if bits else 0
+
+
+def to_bytes(mask: int) -> bytes:
+    return mask.to_bytes(YEAR_BYTES, "little")
+
+
+def year_mask(year: int, start: date, end: date, weekdays: Optional[Iterable[int]] = None) -> int:
+    """Máscara dos dias de `year` dentro de [start, end] (inclusive).
+
+    `weekdays` (0=segunda ... 6=domingo) restringe a dias da semana, ex. {1} = toda terça.
+    """
+    lo = max(start, date(year, 1, 1))
+    hi = min(end, date(year, 12, 31))
+    if lo > hi:
+        return 0
+    a, b = day_index(lo), day_index(hi)
+    if weekdays is None:
+        return ((1 << (b - a + 1)) - 1) << a
+    wanted = set(weekdays)
+    mask = 0
+    # anda de 7 em 7 a partir da primeira ocorrência de cada dia da semana
+    for offset in range(7):
+        d = lo + timedelta(days=offset)
+        if d > hi or d.weekday() not in wanted:
+            continue
+        for i in range(day_index(d), b + 1, 7):
+            mask |= 1 << i
+    return mask
+
+
+def month_slice(mask: int, year: int, month: int) -> int:
+    """Recorta o mês do bitmap anual: bit (dia - 1) => vaga aberta no dia."""
+    first = date(year, month, 1)
+    last = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    ndays = (last - first).days
+    return (mask >> day_index(first)) & ((1 << ndays) - 1)
+
+
+def migrate_legacy_rows(bind) -> int:
+    """Converte linhas antigas de `availability` (uma por dia) em bitmaps anuais."""
+    with bind.begin() as conn:
+        rows = conn.execute(text("SELECT user_id, date FROM availability")).all()
+        if not rows:
+            return 0
+        masks: dict[tuple[int, int], int] = {}
+        for user_id, raw in rows:
+            d = raw if isinstance(raw, date) else date.fromisoformat(str(raw)[:10])
+            key = (user_id, d.year)
+            masks[key] = masks.get(key, 0) | (1 << day_index(d))
+        existing = {
+            (r[0], r[1]): to_int(r[2])
+            for r in conn.execute(text("SELECT user_id, year, bits FROM availability_years")).all()
+        }
+        conn.execute(
+            text("INSERT OR REPLACE INTO availability_years (user_id, year, bits) VALUES (:u, :y, :b)"),
+            [{"u": u, "y": y, "b": to_bytes(m | existing.get((u, y), 0))} for (u, y), m in masks.items()],
+        )
+        conn.execute(text("DELETE FROM availability"))
+    return len(rows)
@@ -1,24 +1,121 @@
 from __future__ import annotations
-from typing import Optional
-from sqlalchemy import select
+import re
+from typing import Optional, Sequence
+from sqlalchemy import select, func, text, inspect
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import selectinload
 from .db import SessionLocal
+from .uow import session_scope
 from .models import Client, User
+from . import audit
+
+# --- busca textual (SQLite FTS5, conteúdo externo sincronizado por triggers) ---
+CLIENTS_FTS_COLUMNS = "name, email, phone, document, notes"
+
+CLIENTS_FTS_TABLE = (
+    "CREATE VIRTUAL TABLE clients_fts USING fts5("
+    f"{CLIENTS_FTS_COLUMNS}, content='clients', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+CLIENTS_FTS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS clients_fts_ai AFTER INSERT ON clients BEGIN
+        INSERT INTO clients_fts(rowid, {CLIENTS_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.email, new.phone, new.document, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS clients_fts_ad AFTER DELETE ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, {CLIENTS_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.document, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS clients_fts_au
+        AFTER UPDATE OF {CLIENTS_FTS_COLUMNS} ON clients BEGIN
+        INSERT INTO clients_fts(clients_fts, rowid, {CLIENTS_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.document, old.notes);
+        INSERT INTO clients_fts(rowid, {CLIENTS_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.email, new.phone, new.document, new.notes);
+    END""",
+]
+
+
+def create_search_index(bind) -> bool:
+    """Cria o índice FTS5 de clientes (e reconstrói quando recém-criado).
+
+    Retorna False se o SQLite não tiver FTS5; nesse caso `search` usa LIKE.
+    """
+    with bind.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='clients_fts'")
+        ).first()
+        try:
+            if not exists:
+                conn.execute(text(CLIENTS_FTS_TABLE))
+            for ddl in CLIENTS_FTS_TRIGGERS:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text("INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')"))
+        except OperationalError as e:
+            print(f"[AVISO] Índice de busca indisponível (FTS5): {e}")
+            return False
+    return True
+
+
+def drop_search_index(bind) -> None:
+    with bind.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS clients_fts"))
+
+
+def normalize_document(document: str | None) -> str | None:
+    """CPF/CNPJ só com dígitos ('123.456.789-00' -> '12345678900')."""
+    if not document:
+        return None
+    digits = re.sub(r"\D", "", document)
+    return digits or None
+
+
+def backfill_document_keys(bind) -> int:
+    """Preenche document_key de registros antigos (antes da coluna existir)."""
+    with bind.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, document FROM clients WHERE document IS NOT NULL AND document_key IS NULL"
+        )).all()
+        params = [{"id": r[0], "key": normalize_document(r[1])} for r in rows]
+        params = [p for p in params if p["key"]]
+        if params:
+            conn.execute(text("UPDATE clients SET document_key = :key WHERE id = :id"), params)
+    return len(params)
+
+
+def _fts_query(query: str) -> str:
+    # cada termo vira um prefixo entre aspas: 'joão sil' -> '"joão"* "sil"*' (AND implícito)
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{t}"*' for t in terms)
+
+def _like_escape(value: str) -> str:
+    # '%' e '_' digitados pelo usuário são literais, não curingas do LIKE
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 class ClientService:
     def __init__(self, session_factory=SessionLocal):
         self.session_factory = session_factory
 
-    def get_client(self, client_id: int) -> Optional[Client]:
-        with self.session_factory() as db:
-            return db.scalars(
-                select(Client)
-                .options(selectinload(Client.responsible))
-                .where(Client.id == client_id)
-            ).first()
+    def get_client(
+        self, client_id: int, current_user: User | None = None, permset: set[str] | None = None,
+    ) -> Optional[Client]:
+        """Cliente pelo id; com `permset`, None se o usuário não puder vê-lo (como list_clients)."""
+        stmt = select(Client).options(selectinload(Client.responsible)).where(Client.id == client_id)
+        if permset is not None:
+            if "clients.view_all" in permset:
+                pass
+            elif "clients.view_own" in permset and current_user is not None:
+                stmt = stmt.where(Client.responsible_id == current_user.id)
+            else:
+                return None
+        with session_scope(self.session_factory) as db:
+            return db.scalars(stmt).first()
 
     def list_clients(self, current_user: User, permset: set[str]) -> list[Client]:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             stmt = select(Client).options(selectinload(Client.responsible))
             if "clients.view_all" in permset:
                 pass
@@ -28,9 +125,92 @@ class ClientService:
                 return []
             return db.scalars(stmt.order_by(Client.id.desc())).all()
 
+    def list_clients_page(
+        self, current_user: User, permset: set[str], *,
+        before_id: Optional[int] = None, limit: int = 200, ids: Optional[Sequence[int]] = None,
+    ) -> list[tuple[int, str, str | None, str | None, str | None, str | None, str | None]]:
+        """Janela de clientes por keyset (Client.id desc), sem instanciar ORM.
+
+        Retorna (id, nome, email, telefone, documento, responsável, prévia das notas);
+        para a próxima página passe `before_id` = último id recebido. `ids` restringe
+        a um conjunto (ex.: resultado de `search`).
+        """
+        with session_scope(self.session_factory) as db:
+            stmt = (
+                select(
+                    Client.id, Client.name, Client.email, Client.phone, Client.document,
+                    User.username, func.substr(Client.notes, 1, 120),
+                )
+                .outerjoin(User, User.id == Client.responsible_id)
+            )
+            if "clients.view_all" in permset:
+                pass
+            elif "clients.view_own" in permset:
+                stmt = stmt.where(Client.responsible_id == current_user.id)
+            else:
+                return []
+            if before_id is not None:
+                stmt = stmt.where(Client.id < before_id)
+            if ids is not None:
+                stmt = stmt.where(Client.id.in_(list(ids)))
+            rows = db.execute(stmt.order_by(Client.id.desc()).limit(limit)).all()
+            return [tuple(r) for r in rows]
+
+    def search(
+        self, query: str, permset: set[str], limit: int = 50, current_user: User | None = None,
+    ) -> list[tuple[int, str]]:
+        """Busca por nome/e-mail/telefone/documento/notas com prefixo, ordenada por relevância.
+
+        Respeita clients.view_all / clients.view_own (este exige `current_user`).
+        """
+        match = _fts_query(query)
+        if not match:
+            return []
+        if "clients.view_all" in permset:
+            owner_id = None
+        elif "clients.view_own" in permset and current_user is not None:
+            owner_id = current_user.id
+        else:
+            return []
+
+        owner_filter = "" if owner_id is None else "AND c.responsible_id = :owner_id"
+        params = {"match": match, "owner_id": owner_id, "limit": limit}
+        with session_scope(self.session_factory) as db:
+            try:
+                rows = db.execute(text(
+                    "SELECT c.id, c.name FROM clients_fts f "
+                    "JOIN clients c ON c.id = f.rowid "
+                    f"WHERE clients_fts MATCH :match {owner_filter} "
+                    "ORDER BY f.rank LIMIT :limit"
+                ), params).all()
+            except OperationalError:
+                # sem FTS5: busca simples por nome
+                stmt = select(Client.id, Client.name).where(
+                    Client.name.like(f"%{_like_escape(query.strip())}%", escape="\\")
+                )
+                if owner_id is not None:
+                    stmt = stmt.where(Client.responsible_id == owner_id)
+                rows = db.execute(stmt.order_by(Client.name).limit(limit)).all()
+            return [(r[0], r[1]) for r in rows]
+
+    def document_exists(self, document: str | None, exclude_id: int | None = None) -> bool:
+        """Há outro cliente com o mesmo CPF/CNPJ (ignorando máscara)?
+
+        Só diz se existe: id e nome do outro cadastro podem ser de cliente que
+        o usuário não enxerga.
+        """
+        key = normalize_document(document)
+        if not key:
+            return False
+        with session_scope(self.session_factory) as db:
+            stmt = select(Client.id).where(Client.document_key == key)
+            if exclude_id is not None:
+                stmt = stmt.where(Client.id != exclude_id)
+            return db.execute(stmt.limit(1)).first() is not None
+
     def list_clients_for_user(self, current_user, permset: set[str]) -> list[tuple[int, str]]:
         """Admin/quem tem view_all vê todos; advogado vê apenas próprios (responsible_id)."""
-        with self.session_factory() as db:
+        with session_scope(self.session_factory) as db:
             from sqlalchemy import select
             from .models import Client
             stmt = select(Client.id, Client.name)
@@ -50,15 +230,18 @@ class ClientService:
         can_assign = ("clients.assign_responsible" in permset) or ("clients.update_all" in permset)
         resp_id = responsible_id if (responsible_id and can_assign) else current_user.id
 
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             c = Client(
                 name=name, email=email or None, phone=phone or None,
-                document=document or None, notes=notes or None,
+                document=document or None, document_key=normalize_document(document),
+                notes=notes or None,
                 created_by_id=current_user.id, responsible_id=resp_id,
             )
             db.add(c)
             db.commit()
             db.refresh(c)
+            audit.record("CREATE", "clients", c.id, {"name": name, "responsible_id": resp_id},
+                         actor_id=current_user.id, session_factory=self.session_factory)
             return c
 
     def update_client(
@@ -66,7 +249,7 @@ class ClientService:
         phone: Optional[str]=None, document: Optional[str]=None, notes: Optional[str]=None,
         responsible_id: Optional[int]=None, current_user: User=None, permset: set[str]=frozenset()
     ) -> Client:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             c = db.get(Client, client_id)
             if not c:
                 raise ValueError("Cliente não encontrado.")
@@ -80,19 +263,24 @@ class ClientService:
             if name is not None: c.name = name
             if email is not None: c.email = email or None
             if phone is not None: c.phone = phone or None
-            if document is not None: c.document = document or None
+            if document is not None:
+                c.document = document or None
+                c.document_key = normalize_document(document)
             if notes is not None: c.notes = notes or None
 
             # alterar responsável só para quem pode
             if responsible_id is not None and (("clients.assign_responsible" in permset) or can_all):
                 c.responsible_id = responsible_id
 
+            changed = sorted(attr.key for attr in inspect(c).attrs if attr.history.has_changes())
             db.commit()
             db.refresh(c)
+            audit.record("UPDATE", "clients", client_id, {"fields": changed}, actor_id=current_user.id,
+                         session_factory=self.session_factory)
             return c
 
     def delete_client(self, client_id: int, *, current_user: User, permset: set[str]) -> None:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             c = db.get(Client, client_id)
             if not c:
                 return
@@ -101,5 +289,8 @@ class ClientService:
             can_own = "clients.delete_own" in permset and owns
             if not (can_all or can_own):
                 raise PermissionError("Sem permissão para excluir este cliente.")
+            name = c.name
             db.delete(c)
             db.commit()
+        audit.record("DELETE", "clients", client_id, {"name": name}, actor_id=current_user.id,
+                     session_factory=self.session_factory)
@@ -8,6 +8,23 @@ COMENTAR O BLOCO ABAIXO ATIVA O MODO DEBUG/DEV
 '''
 DEV_MODE = os.getenv("JURIS_DEV", "0") not in {"0", "", "false", "False"}
 
+# Banco de dados
+#   JURIS_DB_PATH     caminho do arquivo SQLite (padrão: juris.db no diretório atual)
+#   JURIS_DB_PROFILE  perfil de armazenamento (ver core.db.STORAGE_PROFILES):
+#                     desktop-safe | shared-network-drive | bulk-load
+DB_PATH = os.getenv("JURIS_DB_PATH", "juris.db")
+DB_PROFILE = os.getenv("JURIS_DB_PROFILE", "desktop-safe")
+
+# Arquivo morto da agenda (compromissos antigos, um SQLite por ano)
+#   JURIS_ARCHIVE_DIR         pasta dos arquivos anuais (padrão: "arquivo" ao lado do banco)
+#   JURIS_ARCHIVE_AFTER_DAYS  idade, em dias, a partir da qual o compromisso é arquivado
+ARCHIVE_DIR = os.getenv("JURIS_ARCHIVE_DIR", "")
+ARCHIVE_AFTER_DAYS = int(os.getenv("JURIS_ARCHIVE_AFTER_DAYS", "730"))
+
+# Modo servidor (scripts/serve.py): com JURIS_SERVER_URL definido
+# (ex.: http://192.168.0.10:8765) o app não abre o banco, usa o servidor
+SERVER_URL = os.getenv("JURIS_SERVER_URL", "")
+
 
 
 # '''
@@ -1,24 +1,135 @@
 from __future__ import annotations
+from contextvars import ContextVar
+from functools import partial
 from pathlib import Path
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool
+from .config import DB_PATH as _CONFIG_DB_PATH, DB_PROFILE
 
-# Caminho absoluto para o banco SQLite persistente
-DB_PATH = Path("juris.db").resolve()
+# Perfis de armazenamento do SQLite (selecionados por core.config.DB_PROFILE).
+# "pragmas" são aplicados em cada conexão nova; "pool" vai para o create_engine.
+STORAGE_PROFILES: dict[str, dict] = {
+    # uma estação, disco local: WAL + NORMAL (durável a cada checkpoint, sem fsync por commit)
+    "desktop-safe": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16000,        # ~16 MB
+            "mmap_size": 128 * 1024**2,
+            "temp_store": "MEMORY",
+            "busy_timeout": 5000,
+            "wal_autocheckpoint": 1000,
+        },
+        "pool": {"pool_size": 5, "max_overflow": 5},
+    },
+    # arquivo numa pasta compartilhada (SMB/NFS): WAL e mmap não são seguros em
+    # rede, então journal clássico, fsync completo e conexões que não ficam presas
+    "shared-network-drive": {
+        "pragmas": {
+            "journal_mode": "DELETE",
+            "synchronous": "FULL",
+            "cache_size": -8000,
+            "mmap_size": 0,
+            "temp_store": "MEMORY",
+            "busy_timeout": 30000,
+            "wal_autocheckpoint": 1000,
+        },
+        "pool": {"poolclass": NullPool},
+    },
+    # cargas/migrações em massa com o sistema parado: sem fsync, cache grande e
+    # checkpoints espaçados (o arquivo pode corromper se a máquina cair no meio)
+    "bulk-load": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -262144,       # ~256 MB
+            "mmap_size": 1024**3,
+            "temp_store": "MEMORY",
+            "busy_timeout": 60000,
+            "wal_autocheckpoint": 10000,
+        },
+        "pool": {"pool_size": 2, "max_overflow": 0},
+    },
+}
 
-# Criação do engine com echo desabilitado
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
+# Caminho absoluto para o banco SQLite persistente
+DB_PATH = Path(_CONFIG_DB_PATH).resolve()
 
-# Sessão de banco de dados
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
-# Ativa foreign_keys e modo WAL no SQLite (melhora integridade e performance)
-@event.listens_for(engine, "connect")
-def _set_sqlite_pragma(dbapi_conn, _):
+# Ativa foreign_keys e os pragmas do perfil em cada conexão nova
+def _set_sqlite_pragma(pragmas: dict, dbapi_conn, record):
     cur = dbapi_conn.cursor()
     cur.execute("PRAGMA foreign_keys = ON;")
-    cur.execute("PRAGMA journal_mode = WAL;")
+    for name, value in pragmas.items():
+        cur.execute(f"PRAGMA {name} = {value};")
     cur.close()
+    record.info["busy_timeout"] = pragmas.get("busy_timeout", 5000)
+
+
+# O pysqlite abre transações por conta própria (e só antes de DML), o que quebra
+# SAVEPOINT e o isolamento de leituras. Desligamos isso e o BEGIN passa a ser
+# emitido pelo SQLAlchemy no início de cada transação (receita da documentação
+# do SQLAlchemy para o driver sqlite3).
+def _disable_pysqlite_transactions(dbapi_conn, _):
+    dbapi_conn.isolation_level = None
+
+
+# Transações de escrita (ver core.writes) começam com BEGIN IMMEDIATE: a trava
+# de escrita é pega logo no início, em vez de o SQLite recusar ("database is
+# locked") ao promover uma leitura no meio. Nesse BEGIN o busy_timeout cai para
+# WRITE_BUSY_MS e quem espera é o coordenador (backoff com jitter + métricas);
+# depois volta ao valor do perfil, que ainda cobre o COMMIT.
+WRITE_BUSY_MS = 20
+immediate_begin: ContextVar[bool] = ContextVar("juris_immediate_begin", default=False)
+
+
+def _emit_begin(conn):
+    if not immediate_begin.get():
+        conn.exec_driver_sql("BEGIN")
+        return
+    conn.exec_driver_sql(f"PRAGMA busy_timeout = {WRITE_BUSY_MS}")
+    try:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    finally:
+        conn.exec_driver_sql(f"PRAGMA busy_timeout = {conn.info.get('busy_timeout', 5000)}")
+
+
+# Bancos anexados sob demanda (ATTACH, ver core.archive) ficam na conexão
+# entre usos; acima de KEEP_ATTACHED são soltos quando ela volta ao pool,
+# já fora de transação (DETACH não é permitido no meio de uma).
+KEEP_ATTACHED = 4
+
+
+def _detach_surplus(dbapi_conn, record):
+    attached = record.info.get("attached")
+    if dbapi_conn is None or not attached or len(attached) <= KEEP_ATTACHED:
+        return
+    for name in attached:
+        dbapi_conn.execute(f"DETACH DATABASE {name}")
+    attached.clear()
+
+
+def create_db_engine(path: str | Path, profile: str = "desktop-safe") -> Engine:
+    """Engine SQLite configurado com o perfil de armazenamento informado."""
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Perfil de armazenamento desconhecido: {profile!r} "
+                         f"(use {', '.join(STORAGE_PROFILES)})")
+    conf = STORAGE_PROFILES[profile]
+    eng = create_engine(f"sqlite:///{Path(path).resolve()}", echo=False, future=True, **conf["pool"])
+    event.listen(eng, "connect", partial(_set_sqlite_pragma, conf["pragmas"]))
+    event.listen(eng, "connect", _disable_pysqlite_transactions)
+    event.listen(eng, "begin", _emit_begin)
+    event.listen(eng, "checkin", _detach_surplus)
+    return eng
+
+
+# Criação do engine com echo desabilitado
+engine = create_db_engine(DB_PATH, DB_PROFILE)
+
+# Sessão de banco de dados
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 # Base para todos os modelos ORM
 class Base(DeclarativeBase):
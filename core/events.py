@@ -0,0 +1,50 @@
+from __future__ import annotations
+import threading
+from collections import defaultdict
+from typing import Callable
+from .uow import after_commit
+
+# Barramento de eventos em processo (publica/assina) para desacoplar os
+# serviços de quem reage a eles (agendador de lembretes, auditoria...).
+# Handlers rodam na thread de quem publica, depois do commit real
+# (core.uow.after_commit: dentro de um unit of work, só quando ele grava;
+# se for desfeito, o evento é descartado). Quem mexe em widgets deve repassar
+# para a thread da UI (ex.: via Signal).
+#
+# Tópicos publicados:
+#   appointment.created  appointment=<Appointment>, reminders=[<Reminder>, ...]
+#   appointment.deleted  appointment_id=<int>, user_id=<int | None>
+# Só create_appointment/delete_appointment publicam. Gravações em lote
+# (AgendaService.materialize_rules, IcsService.import_ics) não criam lembretes
+# nem publicam: o agendador só vê o que tem linha em `reminders`.
+
+Handler = Callable[..., None]
+
+_lock = threading.Lock()
+_handlers: dict[str, list[Handler]] = defaultdict(list)
+
+
+def subscribe(topic: str, handler: Handler) -> None:
+    with _lock:
+        if handler not in _handlers[topic]:
+            _handlers[topic].append(handler)
+
+
+def unsubscribe(topic: str, handler: Handler) -> None:
+    with _lock:
+        if handler in _handlers.get(topic, []):
+            _handlers[topic].remove(handler)
+
+
+def publish(topic: str, **payload) -> None:
+    after_commit(lambda: _dispatch(topic, payload))
+
+
+def _dispatch(topic: str, payload: dict) -> None:
+    with _lock:
+        handlers = list(_handlers.get(topic, ()))
+    for handler in handlers:
+        try:
+            handler(**payload)
+        except Exception as e:  # um assinante com defeito não derruba o serviço
+            print(f"[ERRO] Handler de '{topic}' falhou: {e}")
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import csv
+import json
+from datetime import date
+from typing import IO, Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from .db import SessionLocal
+from .uow import session_scope
+from .models import Client, User
+from . import archive
+
+FORMATS = ("csv", "jsonl")
+
+
+class ExportService:
+    """Exportações completas (auditoria/BI) com memória constante.
+
+    Só colunas projetadas (sem ORM nem relacionamentos), lidas do cursor em
+    lotes de `batch_size` via yield_per e gravadas linha a linha.
+    """
+
+    CLIENT_COLUMNS = [
+        "id", "name", "email", "phone", "document", "notes",
+        "responsible", "created_by", "created_at", "updated_at",
+    ]
+    APPOINTMENT_COLUMNS = [
+        "id", "date", "start_time", "end_time", "kind", "client_id",
+        "client", "notes", "rule_id", "created_at",
+    ]
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 1000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    def _stream(self, stmt) -> Iterator[tuple]:
+        """`stmt` pode ser uma função da sessão (consultas que anexam o arquivo morto)."""
+        with session_scope(self.session_factory) as db:
+            if callable(stmt):
+                stmt = stmt(db)
+            result = db.execute(stmt.execution_options(yield_per=self.batch_size))
+            for partition in result.partitions():
+                for row in partition:
+                    yield tuple(row)
+
+    def iter_clients(self, current_user: User, permset: set[str]) -> Iterator[tuple]:
+        """Mesmo filtro da tela de clientes: view_all => todos; view_own => os próprios."""
+        resp = aliased(User)
+        creator = aliased(User)
+        stmt = (
+            select(
+                Client.id, Client.name, Client.email, Client.phone, Client.document,
+                Client.notes, resp.username, creator.username,
+                Client.created_at, Client.updated_at,
+            )
+            .outerjoin(resp, resp.id == Client.responsible_id)
+            .outerjoin(creator, creator.id == Client.created_by_id)
+            .order_by(Client.id)
+        )
+        if "clients.view_all" in permset:
+            pass
+        elif "clients.view_own" in permset:
+            stmt = stmt.where(Client.responsible_id == current_user.id)
+        else:
+            return iter(())
+        return self._stream(stmt)
+
+    def iter_appointments(
+        self, current_user: User, permset: set[str], *,
+        start: Optional[date] = None, end: Optional[date] = None,
+    ) -> Iterator[tuple]:
+        """Mesmo filtro da agenda: apenas compromissos gravados do próprio usuário.
+
+        Inclui os anos do arquivo morto (UNION ALL, como AgendaService.month_summary).
+        """
+        cols = ("id", "date", "start_time", "end_time", "kind", "client_id",
+                "notes", "rule_id", "created_at", "user_id")
+
+        def build(db):
+            src = archive.appointments_source(db, start or date.min, end or date.max, *cols)
+            stmt = (
+                select(
+                    src.c.id, src.c.date, src.c.start_time, src.c.end_time,
+                    src.c.kind, src.c.client_id, Client.name, src.c.notes,
+                    src.c.rule_id, src.c.created_at,
+                )
+                .outerjoin(Client, Client.id == src.c.client_id)
+                .where(src.c.user_id == current_user.id)
+                .order_by(src.c.date, src.c.start_time, src.c.id)
+            )
+            if start is not None:
+                stmt = stmt.where(src.c.date >= start)
+            if end is not None:
+                stmt = stmt.where(src.c.date <= end)
+            return stmt
+
+        return self._stream(build)
+
+    @staticmethod
+    def write(rows: Iterator[tuple], columns: list[str], fp: IO[str], fmt: str = "csv") -> int:
+        """Grava incrementalmente em CSV (com cabeçalho) ou JSONL. Retorna nº de linhas."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato inválido: {fmt!r} (use {', '.join(FORMATS)})")
+        n = 0
+        if fmt == "csv":
+            w = csv.writer(fp)
+            w.writerow(columns)
+            for row in rows:
+                w.writerow(["" if v is None else v for v in row])
+                n += 1
+        else:
+            for row in rows:
+                fp.write(json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False))
+                fp.write("\n")
+                n += 1
+        return n
+
+    def export_clients(self, fp: IO[str], current_user: User, permset: set[str], fmt: str = "csv") -> int:
+        return self.write(self.iter_clients(current_user, permset), self.CLIENT_COLUMNS, fp, fmt)
+
+    def export_appointments(
+        self, fp: IO[str], current_user: User, permset: set[str], fmt: str = "csv", *,
+        start: Optional[date] = None, end: Optional[date] = None,
+    ) -> int:
+        rows = self.iter_appointments(current_user, permset, start=start, end=end)
+        return self.write(rows, self.APPOINTMENT_COLUMNS, fp, fmt)
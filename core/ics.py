@@ -0,0 +1,289 @@
+from __future__ import annotations
+import re
+from datetime import date, datetime, time, timezone
+from typing import IO, Iterable, Iterator, Optional
+from sqlalchemy import exists, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+from .db import SessionLocal
+from .uow import session_scope
+from .models import Appointment, Client, User
+
+try:  # zoneinfo pode não ter base de fusos no Windows (pacote tzdata)
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    ZoneInfo = None
+
+PRODID = "-//Bento e Gervasio Advocacia//JurisGestao//PT-BR"
+UID_DOMAIN = "jurisgestao"
+_LOCAL_UID_RE = re.compile(rf"^appt-(\d+)@{UID_DOMAIN}$")
+# campos que a sincronização pode alterar
+_SYNCED = ("date", "start_time", "end_time", "kind", "notes")
+
+
+def appointment_uid(appt_id: int, uid: Optional[str]) -> str:
+    return uid or f"appt-{appt_id}@{UID_DOMAIN}"
+
+
+def foreign_uid(user_id: int, uid: str) -> str:
+    """UID local de outro usuário importado por `user_id` ("u7.appt-12@..."): não é local."""
+    return f"u{user_id}.{uid}"[:255]
+
+
+# --- formatação ---
+def _escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _unescape(value: str) -> str:
+    out, i = [], 0
+    while i < len(value):
+        c = value[i]
+        if c == "\\" and i + 1 < len(value):
+            nxt = value[i + 1]
+            out.append("\n" if nxt in "nN" else nxt)
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _fold(line: str) -> str:
+    """Quebra em linhas de até 75 octetos (RFC 5545 §3.1) sem partir caracteres UTF-8."""
+    parts, current, size = [], [], 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > 75:
+            parts.append("".join(current))
+            current, size = [" "], 1
+        current.append(ch)
+        size += n
+    parts.append("".join(current))
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _utc(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _local(d: date, t: time) -> str:
+    # horário "flutuante": o mesmo relógio de parede do escritório
+    return datetime.combine(d, t).strftime("%Y%m%dT%H%M%S")
+
+
+# --- leitura ---
+def _unfold(fp: IO[str]) -> Iterator[str]:
+    pending: Optional[str] = None
+    for raw in fp:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending
+        pending = line
+    if pending:
+        yield pending
+
+
+def _split_property(line: str) -> tuple[str, dict[str, str], str]:
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    opts = {}
+    for p in params:
+        k, _, v = p.partition("=")
+        opts[k.upper()] = v.strip('"')
+    return name.upper(), opts, value
+
+
+def _parse_dt(value: str, params: dict[str, str]) -> tuple[date, Optional[time]]:
+    """(data, hora local) a partir de DATE, DATE-TIME flutuante, UTC (Z) ou TZID."""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date(), None
+    dt = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        dt = dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    elif "TZID" in params and ZoneInfo is not None:
+        try:
+            dt = dt.replace(tzinfo=ZoneInfo(params["TZID"])).astimezone().replace(tzinfo=None)
+        except Exception:
+            pass  # fuso desconhecido: trata como horário local
+    return dt.date(), dt.time()
+
+
+def _parse_stamp(value: str) -> Optional[datetime]:
+    try:
+        dt = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        return None
+    return dt  # LAST-MODIFIED/DTSTAMP são UTC, como updated_at
+
+
+class IcsService:
+    """Feed iCalendar (VEVENT) por usuário e importação com upsert por UID."""
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    # --- exportação ---
+    def iter_feed(self, user: User, since: Optional[datetime] = None) -> Iterator[str]:
+        """Gera o VCALENDAR linha a linha. `since` (UTC) => só eventos alterados depois."""
+        modified = Appointment.updated_at  # UTC em todas as linhas (ver core.schema v5)
+        stmt = (
+            select(
+                Appointment.id, Appointment.uid, Appointment.date, Appointment.start_time,
+                Appointment.end_time, Appointment.kind, Appointment.notes, Client.name, modified,
+            )
+            .outerjoin(Client, Client.id == Appointment.client_id)
+            .where(Appointment.user_id == user.id)
+            .order_by(Appointment.id)
+        )
+        if since is not None:
+            stmt = stmt.where(modified > since)
+
+        stamp = _utc(datetime.now(timezone.utc))
+        yield "BEGIN:VCALENDAR\r\n"
+        yield "VERSION:2.0\r\n"
+        yield f"PRODID:{PRODID}\r\n"
+        yield "CALSCALE:GREGORIAN\r\n"
+        yield _fold(f"X-WR-CALNAME:{_escape('Agenda ' + user.username)}")
+        with session_scope(self.session_factory) as db:
+            result = db.execute(stmt.execution_options(yield_per=self.batch_size))
+            for appt_id, uid, d, start, end, kind, notes, client, changed in result:
+                yield "BEGIN:VEVENT\r\n"
+                yield _fold(f"UID:{appointment_uid(appt_id, uid)}")
+                yield f"DTSTAMP:{stamp}\r\n"
+                if changed:
+                    yield f"LAST-MODIFIED:{_utc(changed)}\r\n"
+                if start is None:
+                    yield f"DTSTART;VALUE=DATE:{d.strftime('%Y%m%d')}\r\n"
+                else:
+                    yield f"DTSTART:{_local(d, start)}\r\n"
+                    if end is not None:
+                        yield f"DTEND:{_local(d, end)}\r\n"
+                summary = f"{kind} - {client}" if client else kind
+                yield _fold(f"SUMMARY:{_escape(summary)}")
+                yield _fold(f"CATEGORIES:{_escape(kind)}")
+                if notes:
+                    yield _fold(f"DESCRIPTION:{_escape(notes)}")
+                yield "END:VEVENT\r\n"
+        yield "END:VCALENDAR\r\n"
+
+    def write_feed(self, fp: IO[str], user: User, since: Optional[datetime] = None) -> None:
+        for line in self.iter_feed(user, since):
+            fp.write(line)
+
+    # --- importação ---
+    def iter_events(self, fp: IO[str]) -> Iterator[dict]:
+        """VEVENTs do arquivo como {propriedade: (params, valor)}, um por vez."""
+        event: Optional[dict] = None
+        for line in _unfold(fp):
+            if not line:
+                continue
+            name, params, value = _split_property(line)
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event = {}
+            elif name == "END" and value.upper() == "VEVENT":
+                if event is not None:
+                    yield event
+                event = None
+            elif event is not None and name not in event:
+                event[name] = (params, value)
+
+    def _to_row(self, event: dict, user: User, now: datetime) -> Optional[dict]:
+        if "UID" not in event or "DTSTART" not in event:
+            return None
+        d, start = _parse_dt(event["DTSTART"][1], event["DTSTART"][0])
+        end = None
+        if "DTEND" in event and start is not None:
+            _, end = _parse_dt(event["DTEND"][1], event["DTEND"][0])
+        summary = _unescape(event["SUMMARY"][1]) if "SUMMARY" in event else ""
+        notes = _unescape(event["DESCRIPTION"][1]) if "DESCRIPTION" in event else None
+        if "CATEGORIES" in event:
+            kind = _unescape(event["CATEGORIES"][1]).split(",")[0]
+            # título externo mais rico que o tipo vai para o início das notas
+            # (o nosso próprio feed usa "tipo - cliente", que não precisa voltar)
+            if summary and summary != kind and not summary.startswith(f"{kind} - "):
+                notes = f"{summary}\n{notes}" if notes else summary
+        else:
+            kind = summary or "Compromisso"
+        stamp = event.get("LAST-MODIFIED") or event.get("DTSTAMP")
+        updated = (_parse_stamp(stamp[1]) if stamp else None) or now
+        return dict(
+            user_id=user.id, uid=event["UID"][1][:255], date=d, start_time=start,
+            end_time=end, kind=kind[:40] or "Compromisso", notes=notes,
+            created_at=now, updated_at=updated,
+        )
+
+    def _upsert(self, rows: list[dict]) -> int:
+        stmt = sqlite_insert(Appointment)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Appointment.uid],
+            set_={**{c: getattr(excluded, c) for c in _SYNCED}, "updated_at": excluded.updated_at},
+            # só toca o que mudou (conteúdo diferente e não mais antigo que o gravado)
+            # e nunca sobrescreve evento de outro usuário
+            where=(Appointment.user_id == excluded.user_id)
+            & or_(*(getattr(Appointment, c).is_distinct_from(getattr(excluded, c)) for c in _SYNCED))
+            & ((Appointment.updated_at.is_(None)) | (Appointment.updated_at <= excluded.updated_at)),
+        )
+        with session_scope(self.session_factory, write=True) as db:
+            # UIDs gerados no nosso próprio feed ("appt-<id>@...") ainda não estão
+            # gravados: fixa-os nas linhas de origem para o upsert casar com elas
+            local = [(int(m.group(1)), r) for r in rows if (m := _LOCAL_UID_RE.match(r["uid"]))]
+            if local:
+                owners = dict(db.execute(
+                    select(Appointment.id, Appointment.user_id)
+                    .where(Appointment.id.in_([appt_id for appt_id, _ in local]))
+                ).all())
+                mine = []
+                for appt_id, r in local:
+                    if owners.get(appt_id) == r["user_id"]:
+                        mine.append(appt_id)
+                    else:
+                        # feed de outro usuário (ou id que não existe aqui): o UID
+                        # não é nosso; vira um UID externo, estável por importador
+                        r["uid"] = foreign_uid(r["user_id"], r["uid"])
+                if mine:
+                    taken = aliased(Appointment)
+                    pinned = func.printf(f"appt-%d@{UID_DOMAIN}", Appointment.id)
+                    db.execute(
+                        update(Appointment)
+                        .where(Appointment.id.in_(mine), Appointment.uid.is_(None),
+                               Appointment.user_id == rows[0]["user_id"],
+                               # só se nenhuma outra linha já usa o UID
+                               ~exists().where(taken.uid == pinned))
+                        .values(uid=pinned, updated_at=Appointment.updated_at)
+                        .execution_options(synchronize_session=False)
+                    )
+            result = db.connection().execute(stmt, rows)
+            db.commit()
+            return max(result.rowcount, 0)
+
+    def import_ics(self, fp: IO[str], user: User) -> dict[str, int]:
+        """Importa VEVENTs em lotes; reimportar o mesmo arquivo não altera nada.
+
+        Retorna {"read": lidos, "skipped": sem UID/DTSTART, "written": inseridos/alterados}.
+        Upsert em lote: não cria lembretes nem publica eventos (ver core.events).
+        """
+        now = datetime.utcnow()
+        stats = {"read": 0, "skipped": 0, "written": 0}
+        batch: list[dict] = []
+        for event in self.iter_events(fp):
+            stats["read"] += 1
+            row = self._to_row(event, user, now)
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                stats["written"] += self._upsert(batch)
+                batch = []
+        if batch:
+            stats["written"] += self._upsert(batch)
+        return stats
@@ -0,0 +1,232 @@
+from __future__ import annotations
+import csv
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+from sqlalchemy import select
+from .db import SessionLocal
+from .uow import session_scope, uow
+from .models import Client, User
+from .clients import normalize_document
+from . import audit
+
+# cabeçalhos aceitos (planilhas exportadas em pt-BR ou en) -> campo do Client
+HEADER_ALIASES: dict[str, str] = {
+    "nome": "name", "name": "name", "cliente": "name", "nome completo": "name",
+    "email": "email", "e-mail": "email",
+    "telefone": "phone", "phone": "phone", "celular": "phone", "fone": "phone",
+    "documento": "document", "document": "document", "cpf": "document",
+    "cnpj": "document", "cpf/cnpj": "document",
+    "observacoes": "notes", "observações": "notes", "notas": "notes", "notes": "notes",
+    "responsavel": "responsible", "responsável": "responsible", "responsible": "responsible",
+}
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+Progress = Callable[[int, int, int], None]  # (lidas, inseridas, rejeitadas)
+OnReject = Callable[[int, str], None]  # (linha, motivo)
+
+# rejeições guardadas em ImportResult.rejects; o total continua em `rejected`
+# (para a lista completa, passe on_reject a ClientImporter.run)
+MAX_KEPT_REJECTS = 1000
+
+
+class _ExcelSemicolon(csv.excel):
+    delimiter = ";"
+
+
+@dataclass
+class ImportResult:
+    processed: int = 0
+    inserted: int = 0
+    rejected: int = 0
+    rejects: list[tuple[int, str]] = field(default_factory=list)  # (linha, motivo), no máx. MAX_KEPT_REJECTS
+    on_reject: Optional[OnReject] = field(default=None, repr=False)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < MAX_KEPT_REJECTS:
+            self.rejects.append((line, reason))
+        if self.on_reject:
+            self.on_reject(line, reason)
+
+
+def _check_digits(digits: str, weights: list[int]) -> int:
+    total = sum(int(d) * w for d, w in zip(digits, weights))
+    rest = total % 11
+    return 0 if rest < 2 else 11 - rest
+
+
+def valid_document(digits: str) -> bool:
+    """Valida dígitos verificadores de CPF (11) ou CNPJ (14)."""
+    if len(set(digits)) == 1:
+        return False
+    if len(digits) == 11:
+        return (_check_digits(digits[:9], list(range(10, 1, -1))) == int(digits[9])
+                and _check_digits(digits[:10], list(range(11, 1, -1))) == int(digits[10]))
+    if len(digits) == 14:
+        w1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+        return (_check_digits(digits[:12], w1) == int(digits[12])
+                and _check_digits(digits[:13], [6] + w1) == int(digits[13]))
+    return False
+
+
+def format_document(digits: str) -> str:
+    if len(digits) == 11:
+        return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+
+def normalize_phone(phone: str) -> str:
+    """Telefone brasileiro em E.164 (+55DDDNÚMERO); ValueError se inválido."""
+    digits = re.sub(r"\D", "", phone)
+    if digits.startswith("55") and len(digits) in (12, 13):
+        return f"+{digits}"
+    if digits.startswith("0"):
+        digits = digits.lstrip("0")
+    if len(digits) in (10, 11):
+        return f"+55{digits}"
+    raise ValueError(f"telefone inválido: {phone!r}")
+
+
+class ClientImporter:
+    """Importação em massa de clientes a partir de CSV, em streaming.
+
+    Lê o arquivo linha a linha, valida/normaliza e grava em lotes de
+    `chunk_size` (um executemany + um commit por lote). Com `atomic=True`
+    o arquivo inteiro vira um único unit of work (tudo ou nada).
+    """
+
+    def __init__(self, session_factory=SessionLocal, chunk_size: int = 1000):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+
+    def iter_rows(self, path: str, encoding: str = "utf-8-sig") -> Iterator[tuple[int, dict]]:
+        """Gera (nº da linha, {campo: valor}) com cabeçalhos já traduzidos."""
+        with open(path, newline="", encoding=encoding) as fp:
+            sample = fp.read(4096)
+            fp.seek(0)
+            # Excel em pt-BR exporta com ';'
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=";,\t") if sample else csv.excel
+            except csv.Error:
+                # amostra ambígua (ex.: uma coluna só): decide pelo cabeçalho
+                first = sample.splitlines()[0] if sample else ""
+                dialect = _ExcelSemicolon if ";" in first else csv.excel
+            reader = csv.reader(fp, dialect)
+            header = next(reader, None)
+            if not header:
+                return
+            fields = [HEADER_ALIASES.get(h.strip().lower()) for h in header]
+            if "name" not in fields:
+                raise ValueError("Arquivo sem coluna de nome (nome/name).")
+            for values in reader:
+                if not any(v.strip() for v in values):
+                    continue
+                row = {f: v.strip() for f, v in zip(fields, values) if f}
+                yield reader.line_num, row
+
+    def normalize(self, row: dict, responsibles: dict[str, int]) -> dict:
+        """Converte uma linha do arquivo nos valores do Client; ValueError com o motivo."""
+        name = row.get("name", "")
+        if not name:
+            raise ValueError("nome vazio")
+        if len(name) > 120:
+            raise ValueError("nome com mais de 120 caracteres")
+
+        email = row.get("email", "").lower() or None
+        if email and not EMAIL_RE.match(email):
+            raise ValueError(f"e-mail inválido: {email!r}")
+
+        phone = normalize_phone(row["phone"]) if row.get("phone") else None
+
+        document = document_key = None
+        if row.get("document"):
+            document_key = normalize_document(row["document"])
+            if not document_key or not valid_document(document_key):
+                raise ValueError(f"CPF/CNPJ inválido: {row['document']!r}")
+            document = format_document(document_key)
+
+        responsible_id = None
+        if row.get("responsible"):
+            responsible_id = responsibles.get(row["responsible"].lower())
+            if responsible_id is None:
+                raise ValueError(f"responsável desconhecido: {row['responsible']!r}")
+
+        return dict(
+            name=name, email=email, phone=phone, document=document,
+            document_key=document_key, notes=row.get("notes") or None,
+            responsible_id=responsible_id,
+        )
+
+    def run(
+        self, path: str, *, created_by_id: Optional[int] = None,
+        default_responsible_id: Optional[int] = None, skip_duplicates: bool = True,
+        encoding: str = "utf-8-sig", progress: Optional[Progress] = None,
+        atomic: bool = False, on_reject: Optional[OnReject] = None,
+    ) -> ImportResult:
+        if atomic:
+            with uow(self.session_factory):
+                return self.run(
+                    path, created_by_id=created_by_id, default_responsible_id=default_responsible_id,
+                    skip_duplicates=skip_duplicates, encoding=encoding, progress=progress,
+                    on_reject=on_reject,
+                )
+        result = ImportResult(on_reject=on_reject)
+        with session_scope(self.session_factory) as db:
+            # mapa username -> id carregado uma vez (sem consulta por linha)
+            responsibles = {u.lower(): uid for uid, u in db.execute(select(User.id, User.username)).all()}
+
+        seen_keys: set[str] = set()
+        chunk: list[tuple[int, dict]] = []
+
+        def flush():
+            if not chunk:
+                return
+            rows = chunk
+            with session_scope(self.session_factory, write=True) as db:
+                if skip_duplicates:
+                    keys = [r["document_key"] for _, r in rows if r["document_key"]]
+                    existing = set(db.scalars(
+                        select(Client.document_key).where(Client.document_key.in_(keys))
+                    ).all()) if keys else set()
+                    kept = []
+                    for line, r in rows:
+                        if r["document_key"] in existing:
+                            result.reject(line, "CPF/CNPJ já cadastrado")
+                        else:
+                            kept.append((line, r))
+                    rows = kept
+                if rows:
+                    db.execute(Client.__table__.insert(), [r for _, r in rows])
+                    db.commit()
+                    result.inserted += len(rows)
+            chunk.clear()
+            if progress:
+                progress(result.processed, result.inserted, result.rejected)
+
+        for line, raw in self.iter_rows(path, encoding=encoding):
+            result.processed += 1
+            try:
+                values = self.normalize(raw, responsibles)
+            except ValueError as e:
+                result.reject(line, str(e))
+                continue
+            key = values["document_key"]
+            if key and skip_duplicates:
+                if key in seen_keys:
+                    result.reject(line, "CPF/CNPJ repetido no arquivo")
+                    continue
+                seen_keys.add(key)
+            values["created_by_id"] = created_by_id
+            if values["responsible_id"] is None:
+                values["responsible_id"] = default_responsible_id
+            chunk.append((line, values))
+            if len(chunk) >= self.chunk_size:
+                flush()
+        flush()
+        audit.record("IMPORT", "clients", None,
+                     {"file": str(path), "processed": result.processed, "inserted": result.inserted,
+                      "rejected": result.rejected}, actor_id=created_by_id,
+                     session_factory=self.session_factory)
+        return result
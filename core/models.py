@@ -2,7 +2,7 @@ from __future__ import annotations
 from datetime import datetime, time, date
 from sqlalchemy import (
     String, Integer, Boolean, DateTime, Table, Column,
-    ForeignKey, UniqueConstraint, Text
+    ForeignKey, UniqueConstraint, Text, Index
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .db import Base
@@ -81,6 +81,8 @@ class Client(Base):
     email: Mapped[str | None] = mapped_column(String(255), nullable=True)
     phone: Mapped[str | None] = mapped_column(String(30), nullable=True)
     document: Mapped[str | None] = mapped_column(String(20), nullable=True)  # CPF/CNPJ
+    # só dígitos do documento (mantido pelo ClientService) -> busca de duplicados por índice
+    document_key: Mapped[str | None] = mapped_column(String(20), nullable=True, index=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -92,19 +94,64 @@ class Client(Base):
     created_by: Mapped[User | None] = relationship("User", foreign_keys=[created_by_id], lazy="selectin")
     responsible: Mapped[User | None] = relationship("User", foreign_keys=[responsible_id], lazy="selectin")
 
-from sqlalchemy import Date, Time
+from sqlalchemy import Date, Time, LargeBinary
 
 class Availability(Base):
+    # legado: uma linha por dia. Mantida só para migrar bancos antigos para
+    # AvailabilityYear (ver core.availability.migrate_legacy_rows).
     __tablename__ = "availability"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     date: Mapped[datetime.date] = mapped_column(Date, index=True)
 
+class AvailabilityYear(Base):
+    """Vagas abertas de um usuário num ano: bitmap de 366 bits (bit i = dia i+1 do ano)."""
+    __tablename__ = "availability_years"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bits: Mapped[bytes] = mapped_column(LargeBinary(46))
+
+class ArchivePartition(Base):
+    """Ano da agenda com compromissos no arquivo morto (ver core.archive)."""
+    __tablename__ = "archive_partitions"
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    filename: Mapped[str] = mapped_column(String(255))
+    # compromissos com date < archived_until (dentro do ano) já foram movidos
+    archived_until: Mapped[datetime.date] = mapped_column(Date)
+    rows: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+class AppointmentRule(Base):
+    """Compromisso recorrente (estilo RRULE): guardado uma vez, expandido sob demanda."""
+    __tablename__ = "appointment_rules"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    client_id: Mapped[int | None] = mapped_column(ForeignKey("clients.id", ondelete="SET NULL"), nullable=True)
+
+    kind: Mapped[str] = mapped_column(String(40))
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    start_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
+    end_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
+
+    freq: Mapped[str] = mapped_column(String(10))  # "daily" | "weekly" | "monthly"
+    interval: Mapped[int] = mapped_column(Integer, default=1)
+    dtstart: Mapped[date] = mapped_column(Date, index=True)
+    until: Mapped[date | None] = mapped_column(Date, nullable=True)
+    count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    byweekday: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON: [0..6], 0 = segunda
+    exdates: Mapped[str | None] = mapped_column(Text, nullable=True)    # JSON: ["2025-09-08", ...]
+    # ocorrências até esta data já existem como linhas em appointments
+    materialized_until: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
 class Appointment(Base):
     __tablename__ = "appointments"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
     client_id: Mapped[int | None] = mapped_column(ForeignKey("clients.id", ondelete="SET NULL"), nullable=True, index=True)
+    # ocorrência materializada de uma regra recorrente (None => compromisso avulso)
+    rule_id: Mapped[int | None] = mapped_column(ForeignKey("appointment_rules.id", ondelete="SET NULL"), nullable=True, index=True)
 
     date: Mapped[datetime.date] = mapped_column(Date, index=True)
     start_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
@@ -114,6 +161,44 @@ class Appointment(Base):
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # UID estável para sincronização iCalendar (None => "appt-<id>@jurisgestao")
+    uid: Mapped[str | None] = mapped_column(String(255), nullable=True, unique=True, index=True)
 
     user: Mapped[User] = relationship("User", lazy="selectin")
-    client: Mapped["Client | None"] = relationship("Client", lazy="selectin")
\ No newline at end of file
+    client: Mapped["Client | None"] = relationship("Client", lazy="selectin")
+class Reminder(Base):
+    """Lembrete de um compromisso/prazo (pop-up na área de notificação)."""
+    __tablename__ = "reminders"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    appointment_id: Mapped[int] = mapped_column(ForeignKey("appointments.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    fire_at: Mapped[datetime] = mapped_column(DateTime)
+    channel: Mapped[str] = mapped_column(String(20), default="popup")  # popup | email | sms | webhook
+    message: Mapped[str] = mapped_column(Text)
+    delivered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    is_dismissed: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    # pendentes de um usuário em ordem de disparo (carga inicial do agendador)
+    __table_args__ = (Index("ix_reminders_user_pending", "user_id", "delivered_at", "fire_at"),)
+
+class AuditLog(Base):
+    """Trilha de auditoria (só inserção; gravada em lotes por core.audit)."""
+    __tablename__ = "audit_log"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # sem FK: o histórico sobrevive à exclusão do usuário
+    actor_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    action: Mapped[str] = mapped_column(String(20))          # CREATE | UPDATE | DELETE | LOGIN ...
+    entity_table: Mapped[str] = mapped_column(String(40))    # users | clients | appointments ...
+    entity_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    payload_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime)
+
+    # consultas do admin em keyset por (occurred_at, id); o rowid já vai no fim
+    # de cada índice do SQLite, então eles entregam essa ordem sem sort
+    __table_args__ = (
+        Index("ix_audit_actor_time", "actor_user_id", "occurred_at"),
+        Index("ix_audit_entity_time", "entity_table", "entity_id", "occurred_at"),
+        Index("ix_audit_occurred_at", "occurred_at"),
+    )
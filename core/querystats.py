@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instrumentação de SQL para o Dev Tools (root): latência por instrução
+# (histograma), linhas afetadas, método de serviço que disparou a consulta e
+# detecção de N+1. Desligada por padrão: enable() instala os listeners
+# before/after_cursor_execute (e handle_error) no engine e disable() remove.
+
+# limites superiores (ms) das faixas do histograma; a última é "acima de 1 s"
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+# N+1: mesma SELECT, do mesmo chamador, repetida N vezes entre as últimas
+# WINDOW instruções da thread (ex.: carregar papéis usuário a usuário)
+N_PLUS_ONE_THRESHOLD = 10
+N_PLUS_ONE_WINDOW = 50
+
+_PROJECT_DIR = str(Path(__file__).resolve().parents[1])
+_SKIP_FILES = {str(Path(__file__).resolve()), str(Path(_PROJECT_DIR, "core", "db.py")),
+               str(Path(_PROJECT_DIR, "core", "uow.py"))}
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\?,\s*)+\?\)")
+
+
+def normalize_statement(statement: str) -> str:
+    """Uma linha, com listas IN (?, ?, ...) colapsadas: chave de agrupamento."""
+    return _IN_LIST.sub("(?...)", _WS.sub(" ", statement).strip())
+
+
+def calling_method(depth: int = 2) -> str:
+    """Primeiro frame do projeto fora da infraestrutura, ex.: 'AgendaService.list_day'."""
+    frame = sys._getframe(depth)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_DIR) and filename not in _SKIP_FILES:
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            if owner is not None:
+                return f"{type(owner).__name__}.{name}"
+            return f"{Path(filename).stem}.{name}"
+        frame = frame.f_back
+    return "?"
+
+
+class StatementStats:
+    __slots__ = ("statement", "count", "total_ms", "max_ms", "rows", "histogram", "callers")
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.histogram = [0] * len(BUCKETS_MS)
+        self.callers: Counter[str] = Counter()
+
+    def add(self, elapsed_ms: float, rows: int, caller: str) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if rows > 0:
+            self.rows += rows
+        self.histogram[bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        self.callers[caller] += 1
+
+    def percentile(self, q: float) -> float:
+        """Limite superior da faixa do histograma onde cai o percentil q (0-1)."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.histogram):
+            seen += n
+            if seen >= target:
+                return bound if bound != float("inf") else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        return {
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p95_ms": self.percentile(0.95),
+            "rows": self.rows,
+            "callers": dict(self.callers.most_common()),
+            "histogram": {("inf" if b == float("inf") else str(b)): n
+                          for b, n in zip(BUCKETS_MS, self.histogram)},
+        }
+
+
+class _CountingCursor:
+    """Cursor de SELECT que soma em `stats.rows` as linhas realmente buscadas.
+
+    rowcount do sqlite3 é -1 para SELECT; o resultado do SQLAlchemy é lido
+    depois de after_cursor_execute, então a contagem acontece no fetch.
+    """
+
+    __slots__ = ("_cursor", "_stats", "_lock")
+
+    def __init__(self, cursor, stats: StatementStats, lock: threading.Lock):
+        self._cursor = cursor
+        self._stats = stats
+        self._lock = lock
+
+    def _count(self, n: int) -> None:
+        if n:
+            with self._lock:
+                self._stats.rows += n
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._count(row is not None)
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._engines: list[Engine] = []
+        self.started_at: Optional[datetime] = None
+        self.reset()
+
+    # --- ciclo de vida ---
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def enable(self, engine: Optional[Engine] = None) -> None:
+        if engine is None:
+            from .db import engine
+        if engine in self._engines:
+            return
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "handle_error", self._failed)
+        self._engines.append(engine)
+        if self.started_at is None:
+            self.started_at = datetime.now()
+
+    def disable(self) -> None:
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+            event.remove(engine, "handle_error", self._failed)
+        self._engines.clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats: dict[str, StatementStats] = {}
+            self._suspects: dict[tuple[str, str], dict] = {}
+            self.started_at = datetime.now() if getattr(self, "_engines", None) else None
+
+    # --- listeners ---
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        key = normalize_statement(statement)
+        caller = calling_method(depth=3)
+        # SELECT: linhas contadas no fetch (ver _CountingCursor); DML: rowcount
+        returns_rows = cursor is not None and cursor.description is not None
+        rows = cursor.rowcount if cursor is not None and not returns_rows else -1
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            stats.add(elapsed_ms, rows, caller)
+        if returns_rows and context is not None and context.cursor is cursor:
+            context.cursor = _CountingCursor(cursor, stats, self._lock)
+        if key.startswith("SELECT"):
+            self._check_n_plus_one(key, caller)
+
+    def _failed(self, ctx):
+        # instrução que falhou não chega a after_cursor_execute: tira o início
+        # dela da pilha para a próxima instrução da conexão não herdar o tempo
+        if ctx.connection is None or ctx.execution_context is None:
+            return
+        starts = ctx.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+    def _check_n_plus_one(self, key: str, caller: str) -> None:
+        recent = getattr(self._local, "recent", None)
+        if recent is None:
+            recent = self._local.recent = deque(maxlen=N_PLUS_ONE_WINDOW)
+        recent.append((key, caller))
+        repeats = sum(1 for item in recent if item == (key, caller))
+        if repeats < N_PLUS_ONE_THRESHOLD:
+            return
+        with self._lock:
+            suspect = self._suspects.get((caller, key))
+            if suspect is None:
+                self._suspects[(caller, key)] = {
+                    "caller": caller, "statement": key,
+                    "repeats": repeats, "first_seen": datetime.now().isoformat(timespec="seconds"),
+                }
+            else:
+                suspect["repeats"] = max(suspect["repeats"], repeats)
+
+    # --- leitura ---
+    def top(self, n: int = 20, by: str = "total_ms") -> list[dict]:
+        """Top-n instruções por 'total_ms', 'max_ms', 'count' ou 'p95_ms'."""
+        with self._lock:
+            rows = [s.as_dict() for s in self._stats.values()]
+        return sorted(rows, key=lambda r: r[by], reverse=True)[:n]
+
+    def suspects(self) -> list[dict]:
+        with self._lock:
+            return sorted((dict(s) for s in self._suspects.values()),
+                          key=lambda s: s["repeats"], reverse=True)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            statements = [s.as_dict() for s in self._stats.values()]
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "taken_at": datetime.now().isoformat(timespec="seconds"),
+            "total_queries": sum(s["count"] for s in statements),
+            "total_ms": round(sum(s["total_ms"] for s in statements), 3),
+            "statements": sorted(statements, key=lambda s: s["total_ms"], reverse=True),
+            "n_plus_one": self.suspects(),
+        }
+
+
+query_stats = QueryStats()
@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import Set
+import threading
+from typing import FrozenSet
 from sqlalchemy import select
 from .db import SessionLocal
-from .models import Role, Permission, User
+from .uow import after_commit, session_scope
+from .models import Role, Permission, User, user_roles, role_permissions
+from .refcache import reference_cache, invalidate_reference_data
 
 DEFAULT_PERMISSIONS: list[tuple[str, str]] = [
     # usuários
@@ -19,6 +22,8 @@ DEFAULT_PERMISSIONS: list[tuple[str, str]] = [
     ("clients.delete_all", "Excluir qualquer cliente"),
     ("clients.delete_own", "Excluir clientes próprios"),
     ("clients.assign_responsible", "Atribuir responsável do cliente"),  # <- NOVA
+    # auditoria
+    ("audit.view", "Consultar trilha de auditoria"),
 ]
 
 
@@ -56,12 +61,40 @@ ROLE_DEFAULT_PERMISSIONS: dict[str, list[str]] = {
 }
 
 
+# --- snapshots de permissões efetivas ---
+# Cache por user_id -> (versão, frozenset). Qualquer alteração em papéis,
+# permissões ou vínculos usuário-papel incrementa a versão e invalida tudo.
+_perm_lock = threading.Lock()
+_perm_version = 0
+_perm_snapshots: dict[int, tuple[int, FrozenSet[str]]] = {}
+
+
+def bump_permissions_version() -> None:
+    """Invalida todos os snapshots (chamar após editar papéis/permissões/usuários).
+
+    Dentro de um unit of work só vale após o commit real (core.uow.after_commit):
+    antes disso outras threads ainda leem as permissões antigas.
+    """
+    after_commit(_bump_permissions_version)
+
+
+def _bump_permissions_version() -> None:
+    global _perm_version
+    with _perm_lock:
+        _perm_version += 1
+        _perm_snapshots.clear()
+
+
+def permissions_version() -> int:
+    return _perm_version
+
+
 class RBACService:
     def __init__(self, session_factory=SessionLocal):
         self.session_factory = session_factory
 
     def get_or_create_permissions(self) -> list[Permission]:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             existing = {p.name: p for p in db.scalars(select(Permission)).all()}
             changed = False
             for name, desc in DEFAULT_PERMISSIONS:
@@ -70,10 +103,18 @@ class RBACService:
                     changed = True
             if changed:
                 db.commit()
+                invalidate_reference_data("permissions")
             return db.scalars(select(Permission)).all()
 
+    def list_permission_names(self) -> tuple[str, ...]:
+        """Catálogo de permissões (nomes), em cache (ver core.refcache)."""
+        def load():
+            with session_scope(self.session_factory) as db:
+                return tuple(db.scalars(select(Permission.name).order_by(Permission.name)).all())
+        return reference_cache.get("permissions", load)
+
     def assign_default_permissions_to_roles(self) -> None:
-        with self.session_factory() as db:
+        with session_scope(self.session_factory, write=True) as db:
             roles = {r.name: r for r in db.scalars(select(Role)).all()}
             perms_all = {p.name: p for p in db.scalars(select(Permission)).all()}
             for role_name, perm_names in ROLE_DEFAULT_PERMISSIONS.items():
@@ -86,14 +127,34 @@ class RBACService:
                     if p.name not in current:
                         role.permissions.append(p)
             db.commit()
+        bump_permissions_version()
 
     # (métodos sync_permissions / effective_permissions / can) — manter como esta para efetividade das roles
-    def effective_permissions(self, user: User) -> Set[str]:
-        names: Set[str] = set()
-        for role in user.roles:
-            for p in role.permissions:
-                names.add(p.name)
+    def effective_permissions(self, user: User) -> FrozenSet[str]:
+        """Snapshot imutável das permissões do usuário (O(1) em cache quente)."""
+        version = _perm_version
+        cached = _perm_snapshots.get(user.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        names = self._load_permission_names(user.id)
+        with _perm_lock:
+            # só grava se ninguém invalidou durante a consulta
+            if version == _perm_version:
+                _perm_snapshots[user.id] = (version, names)
         return names
 
+    def _load_permission_names(self, user_id: int) -> FrozenSet[str]:
+        # Uma única consulta direto nas tabelas de associação: não depende de
+        # user.roles/role.permissions já estarem carregados (objeto destacado).
+        with session_scope(self.session_factory) as db:
+            rows = db.scalars(
+                select(Permission.name)
+                .join(role_permissions, role_permissions.c.permission_id == Permission.id)
+                .join(user_roles, user_roles.c.role_id == role_permissions.c.role_id)
+                .where(user_roles.c.user_id == user_id)
+                .distinct()
+            ).all()
+            return frozenset(rows)
+
     def can(self, user: User, perm_name: str) -> bool:
         return perm_name in self.effective_permissions(user)
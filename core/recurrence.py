@@ -0,0 +1,91 @@
+from __future__ import annotations
+import json
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def rule_weekdays(rule) -> list[int]:
+    if rule.byweekday:
+        return sorted({int(w) for w in json.loads(rule.byweekday)})
+    return [rule.dtstart.weekday()]
+
+
+def rule_exdates(rule) -> set[date]:
+    if not rule.exdates:
+        return set()
+    return {date.fromisoformat(d) for d in json.loads(rule.exdates)}
+
+
+def _add_months(d: date, months: int) -> Optional[date]:
+    """Mesmo dia `months` meses depois; None se o dia não existir (ex.: 31/04)."""
+    m = d.month - 1 + months
+    year, month = d.year + m // 12, m % 12 + 1
+    try:
+        return date(year, month, d.day)
+    except ValueError:
+        return None
+
+
+def _candidates(rule, skip_to: Optional[date]) -> Iterator[date]:
+    """Datas da regra em ordem crescente (sem fim próprio; sem exdates).
+
+    Com `skip_to`, pula direto para o período que contém essa data em vez de
+    enumerar desde dtstart — só é válido quando a regra não usa COUNT.
+    """
+    interval = max(1, rule.interval or 1)
+    start = rule.dtstart
+
+    if rule.freq == "daily":
+        k = 0
+        if skip_to and skip_to > start:
+            k = -(-(skip_to - start).days // interval)
+        while True:
+            yield start + timedelta(days=k * interval)
+            k += 1
+
+    elif rule.freq == "weekly":
+        weekdays = rule_weekdays(rule)
+        anchor = start - timedelta(days=start.weekday())  # segunda da semana inicial
+        w = 0
+        if skip_to and skip_to > start:
+            w = ((skip_to - anchor).days // 7) // interval * interval
+        while True:
+            week = anchor + timedelta(weeks=w)
+            for wd in weekdays:
+                d = week + timedelta(days=wd)
+                if d >= start:
+                    yield d
+            w += interval
+
+    elif rule.freq == "monthly":
+        m = 0
+        if skip_to and skip_to > start:
+            m = ((skip_to.year - start.year) * 12 + skip_to.month - start.month) // interval * interval
+        while True:
+            d = _add_months(start, m)
+            if d is not None:
+                yield d
+            m += interval
+
+    else:
+        raise ValueError(f"Frequência inválida: {rule.freq!r}")
+
+
+def iter_occurrences(rule, window_start: date, window_end: date) -> Iterator[date]:
+    """Gera preguiçosamente as ocorrências da regra dentro de [window_start, window_end].
+
+    Respeita until/count (COUNT conta as datas antes de remover exdates, como no RFC 5545)
+    e nunca percorre além do fim da janela.
+    """
+    last = window_end if rule.until is None else min(window_end, rule.until)
+    if last < window_start or last < rule.dtstart:
+        return
+    exdates = rule_exdates(rule)
+    skip_to = None if rule.count else window_start
+    for n, d in enumerate(_candidates(rule, skip_to), start=1):
+        if d > last or (rule.count and n > rule.count):
+            return
+        if d >= window_start and d not in exdates:
+            yield d
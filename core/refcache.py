@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Optional
+from .uow import after_commit
+
+# Dados de referência (papéis, permissões, listas de responsáveis) quase nunca
+# mudam durante o uso do app: ficam em memória com TTL e são invalidados
+# explicitamente pelos serviços que os alteram (create/update/delete_user etc.).
+DEFAULT_TTL = 300.0
+
+
+class RefCache:
+    """Cache chave -> valor com expiração; valores devem ser imutáveis (tuplas)."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[float, Any]] = {}
+        # sobe a cada invalidate(): carga iniciada antes não grava (dado velho)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        # carrega fora do lock (consulta ao banco); duas cargas simultâneas
+        # da mesma chave apenas gravam o mesmo valor duas vezes
+        value = loader()
+        with self._lock:
+            # só grava se ninguém invalidou durante a carga (como rbac._perm_version)
+            if generation == self._generation:
+                self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, *prefixes: str) -> None:
+        """Remove as chaves que começam com algum prefixo; sem argumentos, limpa tudo."""
+        with self._lock:
+            self._generation += 1
+            if not prefixes:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.startswith(prefixes)]:
+                del self._entries[key]
+
+
+reference_cache = RefCache()
+
+
+def invalidate_reference_data(*prefixes: str) -> None:
+    """Invalida após o commit do unit of work ativo (na hora, se não houver um)."""
+    after_commit(lambda: reference_cache.invalidate(*prefixes))
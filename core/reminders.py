@@ -0,0 +1,87 @@
+from __future__ import annotations
+from datetime import datetime, time, timedelta
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import select, update
+from .db import SessionLocal
+from .uow import session_scope
+from .models import Appointment, Reminder
+
+# antecedência do aviso por tipo de compromisso; prazos avisam na véspera
+LEAD_TIMES: dict[str, timedelta] = {"Datas Próximas": timedelta(days=1)}
+DEFAULT_LEAD = timedelta(minutes=30)
+# horário de referência de compromissos sem hora de início (dia inteiro)
+ALL_DAY_AT = time(8, 0)
+
+
+class PendingReminder(NamedTuple):
+    fire_at: datetime
+    id: int
+    appointment_id: int
+    message: str
+
+
+def reminder_message(appt: Appointment) -> str:
+    when = appt.date.strftime("%d/%m")
+    if appt.start_time:
+        when += f" às {appt.start_time.strftime('%H:%M')}"
+    text = f"{appt.kind} — {when}"
+    if appt.notes:
+        text += f": {appt.notes[:80]}"
+    return text
+
+
+def build_reminders(appt: Appointment, now: Optional[datetime] = None) -> list[Reminder]:
+    """Lembretes de um compromisso recém-criado (ainda não adicionados à sessão).
+
+    Compromisso já passado não gera lembrete; se a antecedência já passou,
+    o aviso sai imediatamente.
+    """
+    now = now or datetime.now()
+    starts = datetime.combine(appt.date, appt.start_time or ALL_DAY_AT)
+    if starts <= now:
+        return []
+    fire_at = max(starts - LEAD_TIMES.get(appt.kind, DEFAULT_LEAD), now)
+    return [Reminder(
+        appointment_id=appt.id, user_id=appt.user_id, fire_at=fire_at,
+        channel="popup", message=reminder_message(appt), created_at=now,
+    )]
+
+
+def as_pending(reminder: Reminder) -> PendingReminder:
+    return PendingReminder(reminder.fire_at, reminder.id, reminder.appointment_id, reminder.message)
+
+
+class ReminderService:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def pending(self, user_id: int, channel: str = "popup") -> list[PendingReminder]:
+        """Lembretes ainda não entregues do usuário, em ordem de disparo."""
+        with session_scope(self.session_factory) as db:
+            rows = db.execute(
+                select(Reminder.fire_at, Reminder.id, Reminder.appointment_id, Reminder.message)
+                .where(Reminder.user_id == user_id, Reminder.delivered_at.is_(None),
+                       Reminder.is_dismissed.is_(False), Reminder.channel == channel)
+                .order_by(Reminder.fire_at)
+            ).all()
+        return [PendingReminder(*r) for r in rows]
+
+    def mark_delivered(self, ids: Iterable[int], user_id: Optional[int] = None) -> None:
+        """Marca como entregues; com `user_id`, só lembretes desse usuário."""
+        ids = list(ids)
+        if not ids:
+            return
+        stmt = update(Reminder).where(Reminder.id.in_(ids))
+        if user_id is not None:
+            stmt = stmt.where(Reminder.user_id == user_id)
+        with session_scope(self.session_factory, write=True) as db:
+            db.execute(stmt.values(delivered_at=datetime.now()))
+            db.commit()
+
+    def dismiss(self, reminder_id: int, user_id: Optional[int] = None) -> None:
+        stmt = update(Reminder).where(Reminder.id == reminder_id)
+        if user_id is not None:
+            stmt = stmt.where(Reminder.user_id == user_id)
+        with session_scope(self.session_factory, write=True) as db:
+            db.execute(stmt.values(is_dismissed=True))
+            db.commit()
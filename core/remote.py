@@ -0,0 +1,195 @@
+from __future__ import annotations
+import http.client
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+from . import events, wire
+from .reminders import PendingReminder
+
+# Cliente do modo servidor (ver core.server): serviços com os mesmos métodos
+# de AuthService/ClientService/AgendaService/RBACService/ReminderService, mas
+# que chamam o servidor por HTTP. As telas recebem um ou outro sem saber.
+# Argumentos de usuário/permissões são enviados só por compatibilidade de
+# assinatura; o servidor usa os da sessão do token.
+
+_ERRORS: dict[str, type[Exception]] = {
+    "ValueError": ValueError,
+    "PermissionError": PermissionError,
+}
+
+
+def _stale_keepalive(error: Exception, sent: bool) -> bool:
+    """Keep-alive reaproveitada que o servidor fechou enquanto ociosa.
+
+    Falha ao enviar (pipe/conexão fechada) ou fechamento sem nenhuma resposta
+    (RemoteDisconnected): o pedido não chegou a ser processado.
+    """
+    if isinstance(error, TimeoutError):
+        return False
+    if not sent:
+        return isinstance(error, (BrokenPipeError, ConnectionResetError, ConnectionAbortedError))
+    return isinstance(error, http.client.RemoteDisconnected)
+
+
+class RemoteClient:
+    """Conexão HTTP com o servidor (uma keep-alive por thread) + token da sessão."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url if "//" in base_url else f"http://{base_url}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 8765
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self.user = None
+        self.permissions: frozenset[str] = frozenset()
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def request(self, verb: str, path: str, payload: Any = None) -> Any:
+        body = wire.dumps(payload) if payload is not None else b""
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in (0, 1):
+            conn = self._conn()
+            reused = conn.sock is not None
+            sent = False
+            try:
+                conn.request(verb, path, body=body, headers=headers)
+                sent = True
+                resp = conn.getresponse()
+                data = resp.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                conn.close()
+                self._local.conn = None
+                # só repete (uma vez, em conexão nova) o que o servidor com certeza
+                # não executou; timeout ou queda no meio da resposta não se repete
+                if attempt or not reused or not _stale_keepalive(e, sent):
+                    raise RuntimeError(f"Servidor indisponível em {self.host}:{self.port}: {e}") from e
+        if resp.status >= 400:
+            err = json.loads(data or b"{}")
+            raise _ERRORS.get(err.get("error"), RuntimeError)(err.get("message") or resp.reason)
+        return wire.loads(data)
+
+    def call(self, service: str, method: str, *args, **kwargs) -> Any:
+        return self.request("POST", f"/rpc/{service}/{method}", {"args": list(args), "kwargs": kwargs})["result"]
+
+    def login(self, login: str, password: str):
+        try:
+            result = self.request("POST", "/login", {"login": login, "password": password})["result"]
+        except PermissionError:
+            return None
+        self.token = result["token"]
+        self.user = result["user"]
+        self.permissions = result["permissions"]
+        return self.user
+
+    def logout(self) -> None:
+        if self.token:
+            try:
+                self.request("POST", "/logout", {})
+            finally:
+                self.token, self.user, self.permissions = None, None, frozenset()
+
+    def health(self) -> dict:
+        return self.request("GET", "/health")
+
+
+class RemoteService:
+    """Encaminha qualquer método público para /rpc/<service>/<método>."""
+
+    service = ""
+
+    def __init__(self, client: RemoteClient):
+        self.client = client
+        self.session_factory = None
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _remote(*args, **kwargs):
+            return self.client.call(self.service, name, *args, **kwargs)
+
+        _remote.__name__ = name
+        return _remote
+
+
+_login_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="juris-remote-login")
+
+
+class RemoteAuthService(RemoteService):
+    service = "auth"
+
+    def create_schema_if_needed(self) -> bool:
+        # o esquema é do servidor; aqui só confirma que ele responde
+        self.client.health()
+        return False
+
+    def authenticate(self, username_or_email: str, password: str):
+        return self.client.login(username_or_email, password)
+
+    def authenticate_async(
+        self, username_or_email: str, password: str,
+        callback: Optional[Callable[[Future], None]] = None,
+    ) -> Future:
+        future = _login_pool.submit(self.client.login, username_or_email, password)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def logout(self, user_id: int) -> None:
+        self.client.logout()
+
+
+class RemoteRBACService(RemoteService):
+    service = "rbac"
+
+    def effective_permissions(self, user) -> frozenset[str]:
+        return frozenset(self.client.call("rbac", "effective_permissions", user))
+
+    def can(self, user, perm_name: str) -> bool:
+        return perm_name in self.effective_permissions(user)
+
+
+class RemoteClientService(RemoteService):
+    service = "clients"
+
+
+class RemoteAgendaService(RemoteService):
+    service = "agenda"
+
+    # o servidor publica os eventos no processo dele; aqui republicamos os do
+    # próprio usuário para o agendador de lembretes desta estação
+    def create_appointment(self, user, permset, date, start, end, kind, notes, client_id):
+        appt = self.client.call("agenda", "create_appointment", user, permset, date, start, end,
+                                kind, notes, client_id)
+        pending = self.client.call("reminders", "pending", appt.user_id)
+        reminders = [
+            wire.Record("Reminder", id=r[1], appointment_id=r[2], fire_at=r[0], message=r[3], channel="popup")
+            for r in pending if r[2] == appt.id
+        ]
+        events.publish("appointment.created", appointment=appt, reminders=reminders)
+        return appt
+
+    def delete_appointment(self, appt_id: int, user=None):
+        self.client.call("agenda", "delete_appointment", appt_id)
+        user = self.client.user
+        events.publish("appointment.deleted", appointment_id=appt_id,
+                       user_id=user.id if user is not None else None)
+
+
+class RemoteReminderService(RemoteService):
+    service = "reminders"
+
+    def pending(self, user_id: int, channel: str = "popup") -> list[PendingReminder]:
+        return [PendingReminder(*r) for r in self.client.call("reminders", "pending", user_id, channel)]
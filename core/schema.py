@@ -0,0 +1,136 @@
+from __future__ import annotations
+from typing import Callable, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from .db import Base
+
+# Versão do esquema gravada no próprio arquivo (PRAGMA user_version).
+# Ao mudar os modelos: acrescentar um passo em MIGRATIONS e subir SCHEMA_VERSION.
+# Na inicialização, versão igual => nada a fazer (uma única leitura do PRAGMA).
+SCHEMA_VERSION = 6
+
+
+def add_missing_columns(bind) -> list[str]:
+    """Acrescenta colunas/índices novos dos modelos em tabelas já existentes.
+
+    `create_all` só cria tabelas que faltam; bancos antigos (juris.db já em uso)
+    precisam de ALTER TABLE para colunas adicionadas depois. Só suporta colunas
+    anuláveis (ou com default de servidor), que é o que o SQLite aceita.
+    """
+    added: list[str] = []
+    insp = inspect(bind)
+    existing_tables = set(insp.get_table_names())
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in insp.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in present:
+                    continue
+                ddl = CreateColumn(col).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                added.append(f"{table.name}.{col.name}")
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+    return added
+
+
+def schema_version(bind) -> int:
+    with bind.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def _baseline(bind) -> None:
+    # v1: tudo o que create_schema_if_needed fazia a cada inicialização; cada
+    # etapa é idempotente, então também "adota" bancos anteriores ao carimbo
+    from .clients import backfill_document_keys, create_search_index
+    from .availability import migrate_legacy_rows
+
+    Base.metadata.create_all(bind=bind)
+    if "clients.document_key" in add_missing_columns(bind):
+        backfill_document_keys(bind)
+    migrate_legacy_rows(bind)
+    create_search_index(bind)
+
+
+def _create_new_tables(bind) -> None:
+    # tabelas novas (v2 reminders, v4 archive_partitions) só precisam de create_all
+    Base.metadata.create_all(bind=bind)
+
+
+def _audit_log(bind) -> None:
+    # v3: tabela audit_log + permissão audit.view concedida ao papel admin
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        conn.execute(text(
+            "INSERT OR IGNORE INTO permissions (name, description) "
+            "VALUES ('audit.view', 'Consultar trilha de auditoria')"
+        ))
+        conn.execute(text(
+            "INSERT OR IGNORE INTO role_permissions (role_id, permission_id) "
+            "SELECT r.id, p.id FROM roles r, permissions p "
+            "WHERE r.name = 'admin' AND p.name = 'audit.view'"
+        ))
+
+
+def _appointments_utc(bind) -> None:
+    # v5: created_at de compromissos era gravado em hora local e updated_at em
+    # UTC; linhas anteriores a updated_at ficam com ele convertido para UTC,
+    # então o feed ICS (core.ics) compara `since` só com updated_at
+    with bind.begin() as conn:
+        conn.execute(text(
+            "UPDATE appointments SET updated_at = datetime(created_at, 'utc') "
+            "WHERE updated_at IS NULL AND created_at IS NOT NULL"
+        ))
+
+
+def _audit_time_indexes(bind) -> None:
+    # v6: auditoria filtrada por occurred_at direto; índices por (ator|entidade, hora)
+    from .models import AuditLog
+
+    with bind.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_audit_actor"))
+        conn.execute(text("DROP INDEX IF EXISTS ix_audit_entity"))
+        for index in AuditLog.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# (versão alcançada, passo); aplicados em ordem a partir da versão do arquivo
+MIGRATIONS: list[tuple[int, Callable]] = [
+    (1, _baseline),
+    (2, _create_new_tables),
+    (3, _audit_log),
+    (4, _create_new_tables),
+    (5, _appointments_utc),
+    (6, _audit_time_indexes),
+]
+
+
+def ensure_schema(bind, seed: Optional[Callable[[], None]] = None) -> bool:
+    """Leva o banco até SCHEMA_VERSION; retorna True se precisou migrar.
+
+    `seed` (papéis, usuário root...) roda só quando houve migração.
+    """
+    current = schema_version(bind)
+    if current == SCHEMA_VERSION:
+        return False
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Banco na versão {current}, mais nova que a deste programa ({SCHEMA_VERSION}). "
+            "Atualize o JurisGestão."
+        )
+    for version, step in MIGRATIONS:
+        if version > current:
+            step(bind)
+    if seed is not None:
+        seed()
+    # carimbo por último: se algo falhar acima, a próxima inicialização tenta de novo
+    with bind.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return True
+
+
+def reset_schema_version(bind) -> None:
+    with bind.begin() as conn:
+        conn.exec_driver_sql("PRAGMA user_version = 0")
@@ -0,0 +1,402 @@
+from __future__ import annotations
+import asyncio
+import inspect
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Optional
+from .db import SessionLocal
+from .auth import AuthService
+from .clients import ClientService
+from .agenda import AgendaService
+from .rbac import RBACService
+from .reminders import ReminderService
+from .refcache import RefCache
+from . import audit, wire
+
+# Modo servidor: um processo abre o juris.db e atende as estações por
+# HTTP/JSON (asyncio, só biblioteca padrão). Vantagens sobre cada estação abrir
+# o arquivo: um único pool de conexões, escritas enfileiradas num só processo
+# (core.writes) e um cache de leituras compartilhado por todas as estações.
+#
+#   POST /login                 {"login", "password"} -> {"token", "user", "permissions"}
+#   POST /logout
+#   POST /rpc/<serviço>/<método> {"args": [...], "kwargs": {...}} -> {"result": ...}
+#   GET  /health
+#
+# Chamadas /rpc exigem "Authorization: Bearer <token>". Usuário e permissões
+# nunca vêm do cliente: parâmetros `user`/`current_user`/`user_id` recebem o
+# usuário da sessão e `permset` as permissões atuais dele (RBAC do servidor),
+# mesmo quando opcionais. Por isso só se expõem métodos que filtram por esses
+# parâmetros: os que recebem um id (get_client, delete_appointment, dismiss...)
+# só alcançam registros do usuário (ou os que clients.view_all permite ver).
+# O ator da auditoria também é o usuário da sessão (audit.acting_as).
+# Sessões expiram após SESSION_TTL sem uso; desativar, excluir ou trocar a
+# senha de um usuário (auth.update_user/delete_user) encerra as dele.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_TTL = 30.0            # s: teto de desatualização para gravações feitas fora do servidor
+SESSION_TTL = 8 * 3600.0    # s sem nenhuma chamada até o token expirar
+MAX_BODY = 1024 * 1024
+
+_USER_PARAMS = ("user", "current_user")
+
+
+class Method:
+    """Método exposto: leitura (cacheada) ou escrita (limpa o cache)."""
+
+    def __init__(self, write: bool = False, perms: tuple[str, ...] = ()):
+        self.write = write
+        self.perms = perms  # basta uma delas; vazio = qualquer usuário logado
+
+
+READ, WRITE = Method(), Method(write=True)
+
+# serviço -> método -> regra; o que não está aqui não é exposto
+EXPOSED: dict[str, dict[str, Method]] = {
+    "auth": {
+        "list_role_names": READ,
+        "list_responsibles": READ,
+        "list_roles": READ,
+        "list_users": Method(perms=("users.view",)),
+        "list_users_with_roles": Method(perms=("users.view",)),
+        "list_users_by_role": READ,
+        "get_user": Method(perms=("users.view",)),
+        "create_user": Method(write=True, perms=("users.create",)),
+        "update_user": Method(write=True, perms=("users.update",)),
+        "delete_user": Method(write=True, perms=("users.delete",)),
+    },
+    "rbac": {
+        "effective_permissions": READ,
+        "list_permission_names": READ,
+        "can": READ,
+    },
+    "clients": {
+        "get_client": READ,
+        "list_clients": READ,
+        "list_clients_page": READ,
+        "search": READ,
+        "document_exists": READ,
+        "list_clients_for_user": READ,
+        "create_client": WRITE,
+        "update_client": WRITE,
+        "delete_client": WRITE,
+    },
+    "agenda": {
+        "list_day": READ,
+        "list_month": READ,
+        "month_summary": READ,
+        "is_available": READ,
+        "month_availability": READ,
+        "list_rules": READ,
+        "list_appointments": READ,
+        "toggle_availability": WRITE,
+        "set_availability": WRITE,
+        "open_range": WRITE,
+        "close_range": WRITE,
+        "create_rule": WRITE,
+        "add_rule_exception": WRITE,
+        "delete_rule": WRITE,
+        "materialize_rules": WRITE,
+        "create_appointment": WRITE,
+        "delete_appointment": WRITE,
+    },
+    "reminders": {
+        "pending": READ,
+        "mark_delivered": WRITE,
+        "dismiss": WRITE,
+    },
+}
+
+
+class RpcError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, kind: str = "RuntimeError"):
+        super().__init__(message)
+        self.status = status
+        self.kind = kind
+
+
+class _Session:
+    __slots__ = ("user", "last_seen")
+
+    def __init__(self, user):
+        self.user = user
+        self.last_seen = time.monotonic()
+
+
+class AppServer:
+    def __init__(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+        session_factory=SessionLocal, workers: Optional[int] = None, cache_ttl: float = CACHE_TTL,
+        session_ttl: float = SESSION_TTL,
+    ):
+        self.host = host
+        self.port = port
+        self.session_ttl = session_ttl
+        self.auth = AuthService(session_factory)
+        self.rbac = RBACService(session_factory)
+        self.services = {
+            "auth": self.auth,
+            "rbac": self.rbac,
+            "clients": ClientService(session_factory),
+            "agenda": AgendaService(session_factory),
+            "reminders": ReminderService(session_factory),
+        }
+        # uma thread por conexão do pool: chamadas além disso esperam na fila
+        # do executor, não numa conexão do SQLite
+        pool = session_factory.kw["bind"].pool
+        pool_size = pool.size() if hasattr(pool, "size") else 5
+        self._executor = ThreadPoolExecutor(max_workers=workers or pool_size, thread_name_prefix="juris-rpc")
+        self.cache = RefCache(ttl=cache_ttl)
+        self._sessions: dict[str, _Session] = {}   # token -> usuário + último uso
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: set[asyncio.StreamWriter] = set()
+        self.requests = 0
+
+    # --- ciclo de vida ---
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # porta 0 => escolhida pelo SO
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def run(self) -> None:
+        """Bloqueia atendendo até Ctrl+C."""
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def start_background(self) -> "AppServer":
+        """Sobe numa thread própria e retorna já escutando (testes, benchmarks)."""
+        ready = threading.Event()
+
+        def _main():
+            async def _serve():
+                await self.start()
+                ready.set()
+                async with self._server:
+                    try:
+                        await self._server.serve_forever()
+                    except asyncio.CancelledError:
+                        pass
+            asyncio.run(_serve())
+
+        self._thread = threading.Thread(target=_main, name="juris-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    async def _shutdown(self) -> None:
+        # fecha as conexões keep-alive ociosas: os handlers saem pelo EOF
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+
+    def stop(self) -> None:
+        if self._server is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- HTTP ---
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    verb, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, _error("Requisição inválida"), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        _error("Corpo da requisição grande demais"), False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(verb, path, headers, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: HTTPStatus, payload: bytes, keep_alive: bool) -> None:
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _dispatch(self, verb: str, path: str, headers: dict, body: bytes) -> tuple[HTTPStatus, bytes]:
+        self.requests += 1
+        try:
+            if verb == "GET" and path == "/health":
+                return HTTPStatus.OK, wire.dumps(self.health())
+            if verb != "POST":
+                raise RpcError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+            try:
+                data = wire.loads(body) or {}
+            except (ValueError, TypeError):
+                raise RpcError(HTTPStatus.BAD_REQUEST, "JSON inválido")
+            if path == "/login":
+                return HTTPStatus.OK, await self._login(data)
+            token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+            user = self._touch(token)
+            if user is None:
+                raise RpcError(HTTPStatus.UNAUTHORIZED, "Sessão inválida ou expirada; faça login novamente.",
+                               "PermissionError")
+            if path == "/logout":
+                self._sessions.pop(token, None)
+                await self._run(self.auth.logout, user.id)
+                return HTTPStatus.OK, wire.dumps({"ok": True})
+            parts = path.strip("/").split("/")
+            if len(parts) != 3 or parts[0] != "rpc":
+                raise RpcError(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {path}")
+            return HTTPStatus.OK, await self._call(user, parts[1], parts[2],
+                                                   data.get("args") or [], data.get("kwargs") or {},
+                                                   token=token)
+        except RpcError as e:
+            return e.status, _error(str(e), e.kind)
+        except PermissionError as e:
+            return HTTPStatus.FORBIDDEN, _error(str(e), "PermissionError")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, _error(str(e), "ValueError")
+        except Exception as e:  # erro inesperado: vai para o log do servidor, não derruba a conexão
+            print(f"[ERRO] {path}: {type(e).__name__}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, _error(f"Erro interno: {e}")
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        return await self._loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    # --- sessão ---
+    async def _login(self, data: dict) -> bytes:
+        user = await self._run(self.auth.authenticate, data.get("login", ""), data.get("password", ""))
+        if user is None:
+            raise RpcError(HTTPStatus.UNAUTHORIZED, "Usuário ou senha inválidos.", "PermissionError")
+        permset = await self._run(self.rbac.effective_permissions, user)
+        self._expire_idle()
+        token = secrets.token_urlsafe(32)
+        self._sessions[token] = _Session(user)
+        return wire.dumps({"result": {"token": token, "user": user, "permissions": permset}})
+
+    def _touch(self, token: str):
+        """Usuário da sessão (renovando o prazo) ou None se não existe/expirou."""
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        now = time.monotonic()
+        if now - session.last_seen > self.session_ttl:
+            self._sessions.pop(token, None)
+            return None
+        session.last_seen = now
+        return session.user
+
+    def _expire_idle(self) -> None:
+        limit = time.monotonic() - self.session_ttl
+        for token in [t for t, s in self._sessions.items() if s.last_seen < limit]:
+            del self._sessions[token]
+
+    def _end_sessions(self, user_id: int, keep: Optional[str] = None) -> None:
+        for token in [t for t, s in self._sessions.items() if s.user.id == user_id and t != keep]:
+            del self._sessions[token]
+
+    def _after_user_change(self, method: str, bound, user, token: Optional[str]) -> None:
+        # usuário excluído, desativado ou com senha nova: os tokens dele caem
+        # (quem trocou a própria senha continua na sessão em que trocou)
+        target = bound.arguments.get("user_id")
+        if method == "delete_user" or bound.arguments.get("is_active") is False:
+            self._end_sessions(target)
+        elif bound.arguments.get("password"):
+            self._end_sessions(target, keep=token if target == user.id else None)
+
+    # --- RPC ---
+    async def _call(self, user, service: str, method: str, args: list, kwargs: dict,
+                    token: Optional[str] = None) -> bytes:
+        rule = EXPOSED.get(service, {}).get(method)
+        if rule is None:
+            raise RpcError(HTTPStatus.NOT_FOUND, f"Método não exposto: {service}.{method}")
+        permset = await self._run(self.rbac.effective_permissions, user)
+        if rule.perms and not (set(rule.perms) & permset):
+            raise PermissionError(f"Sem permissão para {service}.{method}.")
+        fn = getattr(self.services[service], method)
+        try:
+            bound = inspect.signature(fn).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(HTTPStatus.BAD_REQUEST, f"Argumentos inválidos para {service}.{method}: {e}")
+        for name in bound.signature.parameters:
+            if name in _USER_PARAMS:
+                bound.arguments[name] = user
+            elif name == "user_id" and service == "reminders":
+                bound.arguments[name] = user.id
+            elif name == "permset":
+                bound.arguments[name] = permset
+
+        def call() -> bytes:
+            # roda na thread do executor: o ator da auditoria é o da sessão
+            with audit.acting_as(user.id):
+                return wire.dumps({"result": fn(*bound.args, **bound.kwargs)})
+
+        if rule.write:
+            try:
+                result = await self._run(call)
+            finally:
+                self.cache.invalidate()
+            if service == "auth" and method in ("update_user", "delete_user"):
+                self._after_user_change(method, bound, user, token)
+            return result
+
+        # leitura: resposta já serializada no cache, por usuário e argumentos;
+        # carga que cruzar com uma escrita não é guardada (geração do RefCache)
+        shown = {k: v for k, v in bound.arguments.items() if k not in _USER_PARAMS + ("permset",)}
+        key = f"{user.id}:{service}.{method}:{wire.dumps(shown).decode()}"
+        return await self._run(self.cache.get, key, call)
+
+    def health(self) -> dict:
+        return {
+            "ok": True,
+            "sessions": len(self._sessions),
+            "requests": self.requests,
+            "cache": {"entries": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses},
+        }
+
+
+def _error(message: str, kind: str = "RuntimeError") -> bytes:
+    return json.dumps({"error": kind, "message": message}, ensure_ascii=False).encode("utf-8")
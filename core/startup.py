@@ -0,0 +1,24 @@
+from __future__ import annotations
+import os
+import sys
+import time
+
+# Rastreamento do tempo de inicialização. Importar este módulo primeiro no
+# main.py: o t0 é o momento do import. Ative com JURIS_STARTUP_TRACE=1.
+_T0 = time.perf_counter()
+ENABLED = os.getenv("JURIS_STARTUP_TRACE", "0") not in {"0", "", "false", "False"}
+
+_marks: list[tuple[str, float]] = []
+
+
+def mark(label: str) -> float:
+    """Registra (e, se ativo, imprime) os ms decorridos desde o t0."""
+    elapsed = (time.perf_counter() - _T0) * 1000
+    _marks.append((label, elapsed))
+    if ENABLED:
+        print(f"[startup] {elapsed:8.1f} ms  {label}", file=sys.stderr)
+    return elapsed
+
+
+def marks() -> list[tuple[str, float]]:
+    return list(_marks)
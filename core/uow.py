@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+from sqlalchemy.orm import Session, sessionmaker
+from .db import SessionLocal
+from .writes import write_coordinator
+
+# Unit of work: `with uow():` abre UMA sessão/transação e os métodos de serviço
+# chamados dentro do bloco (via session_scope) passam a usá-la em vez de abrir
+# a própria. Um único commit/fsync no fim; erro em qualquer ponto desfaz tudo.
+#
+#     with uow():
+#         auth.create_user(...)
+#         clients.create_client(...)
+#
+# Cada método de serviço roda num SAVEPOINT: se ele mesmo trata o erro
+# (ex.: IntegrityError -> rollback -> ValueError), só o trecho dele é desfeito
+# e quem chamou pode capturar a exceção e seguir com o restante do lote.
+#
+# Escritas (session_scope(write=True) e todo uow) passam pelo coordenador de
+# core.writes: fila do processo + BEGIN IMMEDIATE com retentativas.
+_current: ContextVar[Optional[tuple[sessionmaker, Session, list[Callable[[], None]]]]] = ContextVar("juris_uow", default=None)
+
+
+class _JoinedSession:
+    """Visão da sessão do unit of work entregue a um método de serviço.
+
+    commit() só faz flush (o commit real é do `uow()` mais externo),
+    rollback() desfaz apenas o savepoint do método e close() não fecha nada.
+    """
+
+    def __init__(self, session: Session, savepoint, callbacks: list, mark: int):
+        self._session = session
+        self._savepoint = savepoint
+        self._callbacks = callbacks
+        self._mark = mark
+
+    def commit(self) -> None:
+        self._session.flush()
+
+    def rollback(self) -> None:
+        _release(self._session, self._savepoint, commit=False)
+        del self._callbacks[self._mark:]
+
+    def close(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+def _release(session: Session, savepoint, *, commit: bool) -> None:
+    # após uma falha de flush o savepoint fica inativo mas ainda aberto:
+    # ele só precisa de rollback enquanto for o savepoint corrente da sessão
+    if session.get_nested_transaction() is not savepoint:
+        return
+    if commit and savepoint.is_active:
+        savepoint.commit()
+    else:
+        savepoint.rollback()
+
+
+def after_commit(fn: Callable[[], None]) -> None:
+    """Roda `fn` após o commit do unit of work ativo (na hora, se não houver um).
+
+    Se o unit of work (ou o savepoint do método que registrou) for desfeito,
+    `fn` é descartada: efeitos colaterais só para o que de fato foi gravado.
+    """
+    current = _current.get()
+    if current is None:
+        fn()
+    else:
+        current[2].append(fn)
+
+
+def active_session(session_factory: sessionmaker = SessionLocal) -> Optional[Session]:
+    """Sessão do unit of work em andamento para esta fábrica (ou None)."""
+    current = _current.get()
+    if current is None or current[0] is not session_factory:
+        return None
+    return current[1]
+
+
+@contextmanager
+def session_scope(session_factory: sessionmaker = SessionLocal, write: bool = False) -> Iterator[Session]:
+    """Sessão para um método de serviço: a do unit of work ativo ou uma nova.
+
+    write=True: o método grava; a sessão nova entra na fila de escrita e abre
+    a transação com BEGIN IMMEDIATE (dentro de um uow isso já foi feito).
+    """
+    session = active_session(session_factory)
+    if session is None:
+        with session_factory() as db:
+            if write:
+                with write_coordinator.transaction(db):
+                    yield db
+            else:
+                yield db
+        return
+    callbacks = _current.get()[2]
+    mark = len(callbacks)
+    savepoint = session.begin_nested()
+    try:
+        yield _JoinedSession(session, savepoint, callbacks, mark)
+    except BaseException:
+        _release(session, savepoint, commit=False)
+        del callbacks[mark:]
+        raise
+    else:
+        _release(session, savepoint, commit=True)
+
+
+@contextmanager
+def uow(session_factory: sessionmaker = SessionLocal) -> Iterator[Session]:
+    """Agrupa várias operações de serviço numa única transação.
+
+    Aninhado dentro de outro `uow()` vira um savepoint do externo.
+    """
+    if _current.get() is not None:
+        with session_scope(session_factory) as db:
+            yield db
+        return
+    # expire_on_commit=False: objetos devolvidos pelos serviços continuam
+    # legíveis depois que o bloco termina e a sessão fecha
+    with session_factory(expire_on_commit=False) as db, write_coordinator.transaction(db):
+        callbacks: list[Callable[[], None]] = []
+        token = _current.set((session_factory, db, callbacks))
+        try:
+            yield db
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            _current.reset(token)
+        for fn in callbacks:
+            fn()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import json
+from datetime import date, datetime, time
+from types import SimpleNamespace
+from typing import Any
+from sqlalchemy import inspect
+from sqlalchemy.orm import DeclarativeBase
+
+# Formato JSON do modo servidor (core.server <-> core.remote). Tipos que o
+# JSON não tem viram objetos marcados com "$":
+#   {"$date": "2025-03-01"}  {"$datetime": ...}  {"$time": "14:30:00"}
+#   {"$set": [...]}          {"$dict": [[chave, valor], ...]}  (chaves não-str)
+#   {"$obj": "Client", "fields": {...}}  objeto ORM: colunas + relações já
+#                                        carregadas (nada é lido do banco aqui)
+#   {"$ref": ["User", 7]}    objeto enviado pelo cliente como argumento
+# Do lado do cliente $obj vira Record (atributos iguais aos do modelo), então
+# as telas usam o resultado remoto como usariam o objeto ORM.
+
+MAX_DEPTH = 3
+# colunas que nunca saem do servidor
+PRIVATE_FIELDS = frozenset({"password_hash"})
+
+
+class Record(SimpleNamespace):
+    """Objeto ORM recebido do servidor: só dados, sem sessão."""
+
+    def __init__(self, _kind: str = "", **fields):
+        super().__init__(**fields)
+        self._kind = _kind
+
+    def __repr__(self) -> str:
+        return f"<{self._kind} {getattr(self, 'id', '?')}>"
+
+
+def _encode_obj(obj, depth: int) -> dict:
+    state = inspect(obj)
+    fields = {}
+    unloaded = state.unloaded  # expirado/não carregado: fica de fora em vez de ir ao banco
+    for attr in state.mapper.column_attrs:
+        if attr.key in PRIVATE_FIELDS or attr.key in unloaded:
+            continue
+        fields[attr.key] = encode(getattr(obj, attr.key), depth + 1)
+    if depth < MAX_DEPTH:
+        for rel in state.mapper.relationships:
+            if rel.key not in unloaded:
+                fields[rel.key] = encode(getattr(obj, rel.key), depth + 1)
+    return {"$obj": type(obj).__name__, "fields": fields}
+
+
+def encode(value: Any, depth: int = 0) -> Any:
+    """Valor Python -> estrutura serializável em JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, time):
+        return {"$time": value.isoformat()}
+    if isinstance(value, (set, frozenset)):
+        return {"$set": [encode(v, depth) for v in sorted(value, key=str)]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: encode(v, depth) for k, v in value.items()}
+        return {"$dict": [[encode(k, depth), encode(v, depth)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [encode(v, depth) for v in value]
+    if isinstance(value, Record):
+        return {"$ref": [value._kind, getattr(value, "id", None)]}
+    if isinstance(value, DeclarativeBase):
+        return _encode_obj(value, depth)
+    raise TypeError(f"Tipo não serializável no modo servidor: {type(value).__name__}")
+
+
+def decode(value: Any) -> Any:
+    """Inverso de encode (objetos ORM voltam como Record)."""
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "$date" in value:
+        return date.fromisoformat(value["$date"])
+    if "$datetime" in value:
+        return datetime.fromisoformat(value["$datetime"])
+    if "$time" in value:
+        return time.fromisoformat(value["$time"])
+    if "$set" in value:
+        return frozenset(decode(v) for v in value["$set"])
+    if "$dict" in value:
+        return {_hashable(decode(k)): decode(v) for k, v in value["$dict"]}
+    if "$obj" in value:
+        return Record(value["$obj"], **{k: decode(v) for k, v in value["fields"].items()})
+    if "$ref" in value:
+        kind, id_ = value["$ref"]
+        return Record(kind, id=id_)
+    return {k: decode(v) for k, v in value.items()}
+
+
+def _hashable(key):
+    return tuple(key) if isinstance(key, list) else key
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(encode(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return decode(json.loads(data)) if data else None
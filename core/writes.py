@@ -0,0 +1,156 @@
+from __future__ import annotations
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from .db import immediate_begin
+
+# Coordenação de escrita para várias estações no mesmo juris.db.
+#
+# Dentro do processo: uma fila única (FIFO por senha) — só uma transação de
+# escrita por vez, na ordem de chegada, então threads do app não disputam a
+# trava do SQLite entre si.
+# Entre processos: a transação começa com BEGIN IMMEDIATE; se outra estação
+# está gravando, tenta de novo com backoff exponencial e jitter completo
+# (espera aleatória em [0, min(MAX_DELAY, BASE_DELAY * 2**tentativa)]), para
+# as estações não acordarem todas juntas. Depois de TIMEOUT desiste com erro
+# legível em vez do "database is locked" cru.
+
+BASE_DELAY = 0.005  # s
+MAX_DELAY = 0.5
+TIMEOUT = 30.0
+SAMPLES = 2000      # janela das métricas de espera
+
+
+def is_busy(exc: BaseException) -> bool:
+    msg = str(getattr(exc, "orig", exc)).lower()
+    return "database is locked" in msg or "database is busy" in msg
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class WriteCoordinator:
+    def __init__(self, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY, timeout: float = TIMEOUT):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._owner: int | None = None
+        self._depth = 0
+        self._stats_lock = threading.Lock()
+        self.reset()
+
+    # --- fila do processo ---
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Vez de escrever neste processo (reentrante na mesma thread)."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                reentrant = True
+            else:
+                reentrant = False
+                ticket = self._next_ticket
+                self._next_ticket += 1
+                t0 = time.perf_counter()
+                while ticket != self._serving:
+                    self._cond.wait()
+                self._owner, self._depth = me, 1
+        if not reentrant:
+            self._sample(self._queue_ms, (time.perf_counter() - t0) * 1000)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._owner = None
+                    self._serving += 1
+                    self._cond.notify_all()
+
+    # --- BEGIN IMMEDIATE com retentativas ---
+    def begin(self, db: Session) -> None:
+        """Abre a transação de escrita da sessão (trava de escrita já adquirida)."""
+        t0 = time.perf_counter()
+        attempt = 0
+        while True:
+            token = immediate_begin.set(True)
+            try:
+                db.connection()
+                break
+            except OperationalError as e:
+                if not is_busy(e):
+                    raise
+                db.rollback()
+                waited = time.perf_counter() - t0
+                if waited >= self.timeout:
+                    with self._stats_lock:
+                        self.timeouts += 1
+                    raise RuntimeError(
+                        f"Banco ocupado por outra estação há {waited:.0f} s; tente novamente."
+                    ) from e
+                with self._stats_lock:
+                    self.retries += 1
+                time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+                attempt += 1
+            finally:
+                immediate_begin.reset(token)
+        with self._stats_lock:
+            self.transactions += 1
+            if attempt:
+                self.contended += 1
+        self._sample(self._begin_ms, (time.perf_counter() - t0) * 1000)
+
+    @contextmanager
+    def transaction(self, db: Session) -> Iterator[Session]:
+        """Fila do processo + BEGIN IMMEDIATE; a vez é liberada ao sair do bloco."""
+        with self.slot():
+            if not db.in_transaction():
+                self.begin(db)
+            yield db
+
+    # --- métricas ---
+    def _sample(self, bucket: deque, ms: float) -> None:
+        with self._stats_lock:
+            bucket.append(ms)
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self.transactions = 0
+            self.contended = 0
+            self.retries = 0
+            self.timeouts = 0
+            self._queue_ms: deque = deque(maxlen=SAMPLES)
+            self._begin_ms: deque = deque(maxlen=SAMPLES)
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            queue_ms, begin_ms = list(self._queue_ms), list(self._begin_ms)
+            out = {
+                "transactions": self.transactions,
+                "contended": self.contended,
+                "retries": self.retries,
+                "timeouts": self.timeouts,
+            }
+        for name, values in (("queue_wait_ms", queue_ms), ("begin_wait_ms", begin_ms)):
+            out[name] = {
+                "p50": round(_percentile(values, 0.50), 3),
+                "p95": round(_percentile(values, 0.95), 3),
+                "max": round(max(values, default=0.0), 3),
+            }
+        return out
+
+
+write_coordinator = WriteCoordinator()
@@ -1,29 +1,58 @@
 from __future__ import annotations
+from core import startup  # primeiro import: marca o t0 do rastreamento de inicialização
 import sys
 from PySide6.QtWidgets import QApplication
 from ui.login_view import LoginView
-from ui.root_window import RootWindow
-from core.auth import AuthService
+from ui.db_executor import get_executor
+
+
+def _bootstrap():
+    # fora da thread da UI: carrega SQLAlchemy/ORM e confere a versão do esquema
+    # enquanto a tela de login já está visível
+    from core.config import DEV_MODE, SERVER_URL
+    if SERVER_URL:
+        from core.remote import RemoteAuthService, RemoteClient
+        auth = RemoteAuthService(RemoteClient(SERVER_URL))
+        auth.create_schema_if_needed()  # só confere se o servidor responde
+        startup.mark("servidor pronto")
+        return auth
+    from core.auth import AuthService
+    if DEV_MODE:
+        from core.querystats import query_stats
+        query_stats.enable()  # Dev Tools já abre com o histórico desde o início
+    startup.mark("módulos do banco importados")
+    auth = AuthService()
+    auth.create_schema_if_needed()  # migra e cria o root só quando a versão do banco muda
+    startup.mark("banco pronto")
+    return auth
+
 
 def main():
     app = QApplication(sys.argv)
     app.setApplicationName("JurisGestão")
     app.setOrganizationName("Bento e Gervásio Advocacia")
+    startup.mark("QApplication criada")
+    # descarta consultas pendentes e libera a thread do banco ao sair
+    app.aboutToQuit.connect(get_executor().shutdown)
 
-    auth = AuthService()
-    auth.create_schema_if_needed()
-    auth.ensure_root_user()  # cria root se necessário
+    windows = {}
 
     def on_login_ok(user):
-        window = RootWindow(auth_service=auth)
+        from ui.root_window import RootWindow  # telas só são importadas após o login
+        window = RootWindow(auth_service=login.auth_service)
         window.current_user = user
         window._go_home(user)
         window.show()
+        windows["root"] = window  # mantém a janela viva após o retorno
+        login.close()
+        startup.mark("primeira tela pós-login")
 
-    login = LoginView(auth_service=auth, on_login_ok=on_login_ok)
+    login = LoginView(auth_service=None, on_login_ok=on_login_ok)
     login.show()
+    startup.mark("login visível")
+    get_executor().submit(_bootstrap).then(login.set_auth_service, login.set_unavailable)
 
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
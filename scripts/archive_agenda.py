@@ -0,0 +1,39 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.auth import AuthService  # noqa: E402
+from core.archive import ArchiveService  # noqa: E402
+from core.config import ARCHIVE_AFTER_DAYS  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Move compromissos antigos para o arquivo morto (um SQLite por ano)")
+    p.add_argument("--dias", type=int, default=ARCHIVE_AFTER_DAYS,
+                   help=f"Arquiva o que tiver mais de N dias (padrão: {ARCHIVE_AFTER_DAYS})")
+    p.add_argument("--ate", help="Arquiva o que for anterior a esta data (AAAA-MM-DD); ignora --dias")
+    p.add_argument("--pasta", help="Pasta dos arquivos anuais (padrão: JURIS_ARCHIVE_DIR ou ./arquivo)")
+    p.add_argument("--simular", action="store_true", help="Só mostra quantos compromissos seriam movidos")
+    args = p.parse_args()
+
+    AuthService().create_schema_if_needed()
+    service = ArchiveService(directory=args.pasta)
+    before = date.fromisoformat(args.ate) if args.ate else service.cutoff(args.dias)
+
+    pending = service.pending(before)
+    if not pending:
+        print(f"Nada a arquivar antes de {before:%d/%m/%Y}.")
+        return
+    for year, n in sorted(pending.items()):
+        print(f"  {year}: {n} compromisso(s)")
+    if args.simular:
+        print(f"Simulação: {sum(pending.values())} compromisso(s) anteriores a {before:%d/%m/%Y}.")
+        return
+
+    moved = service.archive(before)
+    print(f"Arquivados {sum(moved.values())} compromisso(s) em {service.directory}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.db import STORAGE_PROFILES  # noqa: E402
+from bench.datagen import SCALES, generate  # noqa: E402
+from bench.cases import Suite  # noqa: E402
+from bench.report import DEFAULT_THRESHOLD, build_report, compare, load_report, write_report  # noqa: E402
+
+
+def cmd_generate(args):
+    def progress(stage, n):
+        print(f"\r{stage:<13} {n:>10,}", end="", flush=True)
+    anchor = date.fromisoformat(args.ancora) if args.ancora else None
+    meta = generate(args.banco, SCALES[args.escala], seed=args.semente, anchor=anchor, progress=progress)
+    print(f"\nBase gerada em {meta['seconds']} s: {args.banco} (âncora {meta['anchor']})")
+
+
+def cmd_run(args):
+    suite = Suite(args.banco, profile=args.perfil)
+    print(f"{'caso':<42}{'mediana':>10}{'p95':>10}{'ops/s':>10}")
+
+    def progress(name, r):
+        print(f"{name:<42}{r['median_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['ops_per_s'] or 0:>10.1f}")
+
+    try:
+        results = suite.run(only=args.casos, repeat=args.repeticoes, progress=progress)
+        dataset = suite.meta
+    finally:
+        suite.close()
+    if args.json:
+        write_report(build_report(results, dataset, args.perfil), args.json)
+        print(f"Relatório gravado em {args.json}")
+
+
+def cmd_compare(args):
+    old, new = load_report(args.antes), load_report(args.depois)
+    if old["dataset"] != new["dataset"]:
+        print("[AVISO] Relatórios de bases diferentes (escala/semente/âncora); compare com cautela.")
+    rows = compare(old, new, args.limite)
+    print(f"{'caso':<42}{'antes':>10}{'depois':>10}{'razão':>8}  status")
+    for r in rows:
+        fmt = lambda v: f"{v:>10.2f}" if v is not None else f"{'-':>10}"  # noqa: E731
+        ratio = f"{r['ratio']:>8.2f}" if r["ratio"] is not None else f"{'-':>8}"
+        print(f"{r['case']:<42}{fmt(r['old_ms'])}{fmt(r['new_ms'])}{ratio}  {r['status']}")
+    if any(r["status"] == "regressão" for r in rows):
+        sys.exit(1)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmarks dos serviços com dados sintéticos")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("gerar", help="Gera uma base sintética determinística")
+    g.add_argument("banco", help="Arquivo SQLite a criar (sobrescrito)")
+    g.add_argument("--escala", choices=list(SCALES), default="pequena")
+    g.add_argument("--semente", type=int, default=42)
+    g.add_argument("--ancora", help="Data central dos compromissos (AAAA-MM-DD; padrão: hoje)")
+    g.set_defaults(func=cmd_generate)
+
+    r = sub.add_parser("rodar", help="Executa os casos de benchmark")
+    r.add_argument("banco", help="Base gerada com 'gerar'")
+    r.add_argument("--perfil", choices=list(STORAGE_PROFILES), default="desktop-safe")
+    r.add_argument("--casos", nargs="*", help="Prefixos dos casos (ex.: agenda. view.)")
+    r.add_argument("--repeticoes", type=int, default=1, help="Multiplica as iterações de cada caso")
+    r.add_argument("--json", help="Grava o relatório neste arquivo")
+    r.set_defaults(func=cmd_run)
+
+    c = sub.add_parser("comparar", help="Compara dois relatórios JSON (sai com 1 se houver regressão)")
+    c.add_argument("antes")
+    c.add_argument("depois")
+    c.add_argument("--limite", type=float, default=DEFAULT_THRESHOLD, help="Variação tolerada (0.10 = 10%%)")
+    c.set_defaults(func=cmd_compare)
+
+    args = p.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
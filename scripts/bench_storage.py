@@ -0,0 +1,97 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from core.db import Base, STORAGE_PROFILES, create_db_engine  # noqa: E402
+from core.models import Client, User  # noqa: E402
+from core.clients import ClientService, create_search_index  # noqa: E402
+
+PERMSET = frozenset({"clients.view_all", "clients.create"})
+
+
+def _rows(start, n):
+    return [
+        dict(name=f"Cliente {i}", email=f"c{i}@exemplo.com", phone=f"+553299{i:07d}",
+             document=None, notes=f"observação {i}", responsible_id=1, created_by_id=1)
+        for i in range(start, start + n)
+    ]
+
+
+def bench_profile(profile: str, n_single: int, n_bulk: int, n_pages: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        eng = create_db_engine(Path(tmp) / "bench.db", profile)
+        Base.metadata.create_all(eng)
+        create_search_index(eng)
+        Session = sessionmaker(bind=eng, autoflush=False)
+        with Session() as db:
+            db.add(User(username="bench", email="bench@local", password_hash="x"))
+            db.commit()
+            user = db.get(User, 1)
+        svc = ClientService(Session)
+        out = {}
+
+        # 1) uso interativo: um commit por cliente (como o formulário da UI)
+        t0 = time.perf_counter()
+        for row in _rows(0, n_single):
+            row.pop("responsible_id"), row.pop("created_by_id")
+            svc.create_client(current_user=user, permset=PERMSET, responsible_id=None, **row)
+        out["insert_commit_each_per_s"] = n_single / (time.perf_counter() - t0)
+
+        # 2) carga em massa: executemany em lotes de 1000 (como o importador)
+        t0 = time.perf_counter()
+        done = 0
+        while done < n_bulk:
+            batch = _rows(n_single + done, min(1000, n_bulk - done))
+            with eng.begin() as conn:
+                conn.execute(Client.__table__.insert(), batch)
+            done += len(batch)
+        out["insert_bulk_rows_per_s"] = n_bulk / (time.perf_counter() - t0)
+
+        # 3) leitura: páginas da tela de clientes (keyset) e busca textual
+        t0 = time.perf_counter()
+        before = None
+        for _ in range(n_pages):
+            page = svc.list_clients_page(user, PERMSET, before_id=before, limit=200)
+            before = page[-1][0] if page else None
+        out["list_page_per_s"] = n_pages / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        for i in range(n_pages):
+            svc.search(str(i * 37 % (n_single + n_bulk)), PERMSET, limit=20)
+        out["search_per_s"] = n_pages / (time.perf_counter() - t0)
+
+        with eng.connect() as conn:
+            out["journal_mode"] = conn.execute(text("PRAGMA journal_mode")).scalar()
+        eng.dispose()
+        return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark dos perfis de armazenamento SQLite")
+    p.add_argument("--perfis", nargs="*", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    p.add_argument("--commits", type=int, default=500, help="Inserções com um commit cada")
+    p.add_argument("--bulk", type=int, default=100_000, help="Linhas da carga em massa")
+    p.add_argument("--paginas", type=int, default=300, help="Consultas de página/busca")
+    p.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = p.parse_args()
+
+    results = {}
+    for profile in args.perfis:
+        results[profile] = bench_profile(profile, args.commits, args.bulk, args.paginas)
+
+    cols = ["insert_commit_each_per_s", "insert_bulk_rows_per_s", "list_page_per_s", "search_per_s"]
+    print(f"{'perfil':<22}" + "".join(f"{c:>26}" for c in cols))
+    for profile, r in results.items():
+        print(f"{profile:<22}" + "".join(f"{r[c]:>26,.0f}" for c in cols))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
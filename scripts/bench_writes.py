@@ -0,0 +1,136 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+# core.* lê JURIS_DB_PATH/JURIS_DB_PROFILE na importação: só é importado
+# depois que main() aponta o ambiente para a base temporária (os processos das
+# estações herdam o ambiente).
+
+PERMSET = frozenset({"clients.create", "clients.view_all", "agenda.create"})
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _desk(desk: int, n: int, start, out) -> None:
+    """Uma estação: n gravações alternando cadastro de cliente e compromisso."""
+    from core import audit
+    from core.agenda import AgendaService
+    from core.clients import ClientService
+    from core.db import SessionLocal
+    from core.models import User
+    from core.writes import write_coordinator
+
+    with SessionLocal() as db:
+        user = db.query(User).filter_by(username="root").one()
+        db.expunge(user)
+    clients, agenda = ClientService(), AgendaService()
+    day0 = date.today() + timedelta(days=1)
+    latencies, errors = [], []
+    start.wait()
+    t_start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        try:
+            if i % 2:
+                clients.create_client(
+                    name=f"Estação {desk} cliente {i}", email=None, phone=None, document=None,
+                    notes=None, responsible_id=None, current_user=user, permset=PERMSET,
+                )
+            else:
+                agenda.create_appointment(
+                    user, PERMSET, day0 + timedelta(days=i % 60), dtime(8 + i % 10), None,
+                    "Reunião", f"estação {desk}", None,
+                )
+        except Exception as e:  # conta e segue: o relatório mostra quantas falharam
+            errors.append(str(e))
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - t_start
+    audit.get_writer().flush()
+    out.put({"desk": desk, "latencies_ms": latencies, "errors": errors,
+             "seconds": elapsed, "coordinator": write_coordinator.snapshot()})
+
+
+def run(desks: int, writes: int) -> dict:
+    from core.auth import AuthService
+    AuthService().create_schema_if_needed()
+
+    ctx = mp.get_context("spawn")
+    start, out = ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=_desk, args=(d, writes, start, out)) for d in range(desks)]
+    for p in procs:
+        p.start()
+    time.sleep(1.0)  # deixa as estações importarem tudo antes da largada
+    t0 = time.perf_counter()
+    start.set()
+    results = [out.get() for _ in procs]
+    wall = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+
+    lat = [ms for r in results for ms in r["latencies_ms"]]
+    stats = [r["coordinator"] for r in results]
+    return {
+        "desks": desks,
+        "writes_per_desk": writes,
+        "ok": len(lat),
+        "errors": sum(len(r["errors"]) for r in results),
+        "error_samples": sorted({e for r in results for e in r["errors"]})[:5],
+        "wall_s": round(wall, 3),
+        "writes_per_s": round(len(lat) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(lat, 0.50), 2),
+            "p95": round(_percentile(lat, 0.95), 2),
+            "p99": round(_percentile(lat, 0.99), 2),
+            "max": round(max(lat, default=0.0), 2),
+        },
+        "transactions": sum(s["transactions"] for s in stats),
+        "contended": sum(s["contended"] for s in stats),
+        "retries": sum(s["retries"] for s in stats),
+        "timeouts": sum(s["timeouts"] for s in stats),
+        "begin_wait_p95_ms": round(max(s["begin_wait_ms"]["p95"] for s in stats), 2),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Estresse de escrita: várias estações (processos) no mesmo banco")
+    p.add_argument("--estacoes", type=int, default=10, help="Processos gravando ao mesmo tempo")
+    p.add_argument("--gravacoes", type=int, default=200, help="Gravações por estação")
+    p.add_argument("--perfil", default="desktop-safe", help="Perfil de armazenamento (core.db.STORAGE_PROFILES)")
+    p.add_argument("--banco", help="Arquivo SQLite a usar (padrão: base temporária nova)")
+    p.add_argument("--json", help="Grava o resultado neste arquivo")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["JURIS_DB_PATH"] = args.banco or str(Path(tmp) / "stress.db")
+        os.environ["JURIS_DB_PROFILE"] = args.perfil
+        result = run(args.estacoes, args.gravacoes)
+
+    lat = result["latency_ms"]
+    print(f"{result['desks']} estações x {result['writes_per_desk']} gravações ({args.perfil})")
+    print(f"  concluídas     {result['ok']} em {result['wall_s']} s  ({result['writes_per_s']} gravações/s)")
+    print(f"  latência (ms)  p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  máx {lat['max']}")
+    print(f"  disputa        {result['contended']} de {result['transactions']} transações, "
+          f"{result['retries']} retentativas, {result['timeouts']} desistências")
+    if result["errors"]:
+        print(f"  [ERRO] {result['errors']} falharam, ex.: {result['error_samples'][0]}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(result, fp, ensure_ascii=False, indent=2)
+        print(f"Resultado gravado em {args.json}")
+    if result["errors"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
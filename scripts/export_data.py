@@ -0,0 +1,45 @@
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+from core.auth import AuthService  # noqa: E402
+from core.rbac import RBACService  # noqa: E402
+from core.export import ExportService, FORMATS  # noqa: E402
+from core.models import User  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Exporta clientes/agenda em CSV ou JSONL (streaming)")
+    p.add_argument("tipo", choices=["clientes", "agenda"])
+    p.add_argument("saida", help="Arquivo de saída ('-' para stdout)")
+    p.add_argument("--formato", choices=FORMATS, default="csv")
+    p.add_argument("--usuario", default="root", help="Exporta com as permissões deste usuário")
+    p.add_argument("--de", type=date.fromisoformat, help="Agenda: data inicial (AAAA-MM-DD)")
+    p.add_argument("--ate", type=date.fromisoformat, help="Agenda: data final (AAAA-MM-DD)")
+    p.add_argument("--lote", type=int, default=1000, help="Linhas lidas por vez do banco")
+    args = p.parse_args()
+
+    auth = AuthService()
+    with auth.session_factory() as db:
+        user = db.scalars(select(User).where(User.username == args.usuario)).first()
+    if not user:
+        sys.exit(f"Usuário inexistente: {args.usuario}")
+    permset = RBACService().effective_permissions(user)
+
+    svc = ExportService(batch_size=args.lote)
+    fp = sys.stdout if args.saida == "-" else open(args.saida, "w", newline="", encoding="utf-8")
+    try:
+        if args.tipo == "clientes":
+            n = svc.export_clients(fp, user, permset, args.formato)
+        else:
+            n = svc.export_appointments(fp, user, permset, args.formato, start=args.de, end=args.ate)
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+    print(f"{n} linhas exportadas.", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
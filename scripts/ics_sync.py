@@ -0,0 +1,48 @@
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+from core.auth import AuthService  # noqa: E402
+from core.ics import IcsService  # noqa: E402
+from core.models import User  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Agenda em iCalendar (ICS): exportar feed / importar eventos")
+    p.add_argument("acao", choices=["exportar", "importar"])
+    p.add_argument("arquivo", help="Arquivo .ics ('-' para stdout/stdin)")
+    p.add_argument("--usuario", required=True, help="Dono da agenda")
+    p.add_argument("--desde", type=datetime.fromisoformat,
+                   help="Exportar só eventos alterados após este instante UTC (AAAA-MM-DDTHH:MM)")
+    p.add_argument("--lote", type=int, default=500, help="Eventos por transação na importação")
+    args = p.parse_args()
+
+    auth = AuthService()
+    auth.create_schema_if_needed()
+    with auth.session_factory() as db:
+        user = db.scalars(select(User).where(User.username == args.usuario)).first()
+    if not user:
+        sys.exit(f"Usuário inexistente: {args.usuario}")
+
+    svc = IcsService(batch_size=args.lote)
+    if args.acao == "exportar":
+        fp = sys.stdout if args.arquivo == "-" else open(args.arquivo, "w", newline="", encoding="utf-8")
+        try:
+            svc.write_feed(fp, user, since=args.desde)
+        finally:
+            if fp is not sys.stdout:
+                fp.close()
+    else:
+        fp = sys.stdin if args.arquivo == "-" else open(args.arquivo, encoding="utf-8", newline="")
+        try:
+            stats = svc.import_ics(fp, user)
+        finally:
+            if fp is not sys.stdin:
+                fp.close()
+        print(f"{stats['read']} eventos lidos, {stats['written']} gravados, {stats['skipped']} ignorados.")
+
+if __name__ == "__main__":
+    main()
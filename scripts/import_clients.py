@@ -0,0 +1,72 @@
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+from core.auth import AuthService  # noqa: E402
+from core.importer import ClientImporter  # noqa: E402
+from core.models import User  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Importa clientes de um CSV (também exportado do Excel)")
+    p.add_argument("arquivo", help="CSV com cabeçalho (nome, email, telefone, documento, observacoes, responsavel)")
+    p.add_argument("--chunk", type=int, default=1000, help="Linhas por transação")
+    p.add_argument("--encoding", default="utf-8-sig", help="Ex.: latin-1 para CSV antigo do Excel")
+    p.add_argument("--autor", default="root", help="Usuário registrado como criador")
+    p.add_argument("--responsavel", help="Responsável padrão quando a linha não informa")
+    p.add_argument("--rejeitados", help="Grava as linhas rejeitadas (linha;motivo) neste CSV")
+    p.add_argument("--atomico", action="store_true", help="Importa tudo numa única transação (tudo ou nada)")
+    p.add_argument("--permitir-duplicados", action="store_true", help="Não rejeita CPF/CNPJ já cadastrado")
+    args = p.parse_args()
+
+    auth = AuthService()
+    auth.create_schema_if_needed()
+    with auth.session_factory() as db:
+        ids = dict(db.execute(select(User.username, User.id)).all())
+    if args.autor not in ids:
+        sys.exit(f"Usuário autor inexistente: {args.autor}")
+    if args.responsavel and args.responsavel not in ids:
+        sys.exit(f"Responsável padrão inexistente: {args.responsavel}")
+
+    def progress(read, inserted, rejected):
+        print(f"\r{read} lidas | {inserted} inseridas | {rejected} rejeitadas", end="", flush=True)
+
+    rejects_fp = open(args.rejeitados, "w", newline="", encoding="utf-8") if args.rejeitados else None
+    on_reject = None
+    if rejects_fp:
+        # grava cada rejeição ao ocorrer (sem acumular o arquivo todo em memória)
+        w = csv.writer(rejects_fp, delimiter=";")
+        w.writerow(["linha", "motivo"])
+        on_reject = lambda line, reason: w.writerow([line, reason])  # noqa: E731
+
+    importer = ClientImporter(chunk_size=args.chunk)
+    try:
+        result = importer.run(
+            args.arquivo,
+            created_by_id=ids[args.autor],
+            default_responsible_id=ids.get(args.responsavel),
+            skip_duplicates=not args.permitir_duplicados,
+            encoding=args.encoding,
+            progress=progress,
+            atomic=args.atomico,
+            on_reject=on_reject,
+        )
+    finally:
+        if rejects_fp:
+            rejects_fp.close()
+    print(f"\nConcluído: {result.inserted} de {result.processed} importados.")
+
+    if result.rejected:
+        if args.rejeitados:
+            print(f"{result.rejected} rejeitadas gravadas em {args.rejeitados}.")
+        else:
+            for line, reason in result.rejects[:20]:
+                print(f"  linha {line}: {reason}")
+            if result.rejected > 20:
+                print(f"  ... e mais {result.rejected - 20} (use --rejeitados)")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from core.rbac import RBACService  # noqa: E402
 from core.auth import AuthService  # noqa: E402
+from core.uow import uow  # noqa: E402
 
 def main():
     p = argparse.ArgumentParser(description="RBAC: permissões & seed")
@@ -17,9 +18,10 @@ def main():
     rbac = RBACService()
 
     if args.seed:
-        auth.get_or_create_roles()
-        rbac.get_or_create_permissions()
-        rbac.assign_default_permissions_to_roles()
+        with uow():
+            auth.get_or_create_roles()
+            rbac.get_or_create_permissions()
+            rbac.assign_default_permissions_to_roles()
         print("RBAC seed aplicado.")
 
     if args.list:
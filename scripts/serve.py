@@ -0,0 +1,29 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.auth import AuthService  # noqa: E402
+from core.server import CACHE_TTL, DEFAULT_HOST, DEFAULT_PORT, SESSION_TTL, AppServer  # noqa: E402
+
+def main():
+    p = argparse.ArgumentParser(description="Servidor HTTP/JSON do JurisGestão (um processo abre o banco, as estações conectam)")
+    p.add_argument("--host", default=DEFAULT_HOST,
+                   help="Interface de escuta (0.0.0.0 para atender a rede do escritório)")
+    p.add_argument("--porta", type=int, default=DEFAULT_PORT)
+    p.add_argument("--workers", type=int, help="Threads de banco (padrão: tamanho do pool de conexões)")
+    p.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="Validade das leituras em cache (s)")
+    p.add_argument("--sessao-ttl", type=float, default=SESSION_TTL,
+                   help="Tempo sem uso até o login expirar (s)")
+    args = p.parse_args()
+
+    AuthService().create_schema_if_needed()
+    server = AppServer(args.host, args.porta, workers=args.workers,
+                       cache_ttl=args.cache_ttl, session_ttl=args.sessao_ttl)
+    print(f"JurisGestão servindo em http://{args.host}:{args.porta} (Ctrl+C para parar)")
+    print(f"Nas estações: JURIS_SERVER_URL=http://<este computador>:{args.porta}")
+    server.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+from datetime import date, time
+from pathlib import Path
+
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.agenda import AgendaService  # noqa: E402
+from core.archive import ArchiveService  # noqa: E402
+from core.db import Base, create_db_engine  # noqa: E402
+from core.export import ExportService  # noqa: E402
+from core.models import Appointment, User  # noqa: E402
+
+
+def _setup(tmp_path):
+    engine = create_db_engine(tmp_path / "juris.db")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with factory() as db:
+        root = User(username="root", email="root@local", password_hash="-")
+        db.add(root)
+        db.flush()
+        db.add_all([
+            Appointment(user_id=root.id, date=date(2020, 3, 2), start_time=time(9), kind="Visita"),
+            Appointment(user_id=root.id, date=date(2020, 5, 4), start_time=time(10), kind="Reunião"),
+        ])
+        db.commit()
+    return factory, root
+
+
+def test_export_and_list_include_archived_years(tmp_path):
+    factory, root = _setup(tmp_path)
+    ArchiveService(factory, tmp_path / "arquivo").archive(date(2021, 1, 1))
+    with factory() as db:
+        db.add(Appointment(user_id=root.id, date=date(2025, 1, 6), kind="Audiencia"))
+        db.commit()
+
+    rows = list(ExportService(factory).iter_appointments(root, set()))
+    assert [(r[1], r[4]) for r in rows] == [
+        (date(2020, 3, 2), "Visita"), (date(2020, 5, 4), "Reunião"), (date(2025, 1, 6), "Audiencia"),
+    ]
+    rows = list(ExportService(factory).iter_appointments(root, set(), start=date(2020, 4, 1)))
+    assert [r[1] for r in rows] == [date(2020, 5, 4), date(2025, 1, 6)]
+
+    listed = AgendaService(factory).list_appointments(root)
+    assert sorted(a.date for a in listed) == [date(2020, 3, 2), date(2020, 5, 4), date(2025, 1, 6)]
+
+
+def test_reused_id_never_overwrites_archived_row(tmp_path):
+    factory, root = _setup(tmp_path)
+    svc = ArchiveService(factory, tmp_path / "arquivo")
+    svc.archive(date(2021, 1, 1))
+
+    # base ativa vazia: o SQLite devolve o id 1 para um compromisso retroativo
+    with factory() as db:
+        backdated = Appointment(user_id=root.id, date=date(2020, 7, 1), kind="Atendimento Externo")
+        db.add(backdated)
+        db.commit()
+    assert backdated.id == 1
+
+    assert svc.archive(date(2021, 1, 1)) == {2020: 0}
+    kinds = sorted(r[4] for r in ExportService(factory).iter_appointments(root, set()))
+    assert kinds == ["Atendimento Externo", "Reunião", "Visita"]
@@ -0,0 +1,65 @@
+import io
+import sys
+from datetime import date, time, timedelta
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from core.db import Base, create_db_engine  # noqa: E402
+from core.ics import IcsService  # noqa: E402
+from core.models import Appointment, User  # noqa: E402
+
+
+def _setup(tmp_path):
+    engine = create_db_engine(tmp_path / "ics.db")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with factory() as db:
+        root = User(username="root", email="root@local", password_hash="-")
+        bob = User(username="bob", email="bob@local", password_hash="-")
+        db.add_all([root, bob])
+        db.flush()
+        db.add(Appointment(user_id=root.id, date=date.today() + timedelta(days=1),
+                           start_time=time(9), kind="Reunião", notes="pauta"))
+        db.commit()
+    return factory, root, bob
+
+
+def _uids(factory):
+    with factory() as db:
+        return sorted(db.execute(select(Appointment.user_id, Appointment.uid)).all())
+
+
+def test_round_trip_between_users(tmp_path):
+    # root exporta; bob importa o feed de root; root reimporta o próprio feed
+    factory, root, bob = _setup(tmp_path)
+    ics = IcsService(factory)
+    feed = "".join(ics.iter_feed(root))
+
+    assert ics.import_ics(io.StringIO(feed), bob)["written"] == 1
+    ics.import_ics(io.StringIO(feed), root)
+
+    # o UID local continua só com a linha de origem; a cópia de bob tem UID próprio
+    assert _uids(factory) == [(root.id, "appt-1@jurisgestao"), (bob.id, f"u{bob.id}.appt-1@jurisgestao")]
+
+    # reimportar não duplica nem altera nada
+    assert ics.import_ics(io.StringIO(feed), bob)["written"] == 0
+    assert ics.import_ics(io.StringIO(feed), root)["written"] == 0
+    assert len(_uids(factory)) == 2
+
+
+def test_pin_skips_uid_already_taken(tmp_path):
+    # base antiga: outra linha já ficou com o UID local de root
+    factory, root, bob = _setup(tmp_path)
+    ics = IcsService(factory)
+    feed = "".join(ics.iter_feed(root))
+    with factory() as db:
+        db.add(Appointment(user_id=bob.id, date=date.today(), kind="Visita", uid="appt-1@jurisgestao"))
+        db.commit()
+
+    ics.import_ics(io.StringIO(feed), root)  # não pode violar UNIQUE(uid)
+
+    assert _uids(factory) == [(root.id, None), (bob.id, "appt-1@jurisgestao")]
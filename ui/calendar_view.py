@@ -1,9 +1,17 @@
+import calendar
 from PySide6.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QGridLayout, QPushButton, QFrame, QMessageBox
+    QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QFrame, QMessageBox
 )
 from PySide6.QtCore import Qt, QDate
 from datetime import date
 from ui.appointment_form import AppointmentFormDialog
+from ui.db_executor import get_executor
+
+WEEKDAY_NAMES = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
+MONTH_NAMES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro",
+]
 
 
 class AgendaView(QWidget):
@@ -15,12 +23,29 @@ class AgendaView(QWidget):
         self.current_user = current_user
         self.permset = permset
         self.selected_date = date.today()
+        self.shown_year = self.selected_date.year
+        self.shown_month = self.selected_date.month
+        self._cells: list[tuple[QFrame, QLabel, QLabel]] = []
+        self._cell_dates: list[date | None] = []
+        self._summary: dict = {}
 
         self._build_ui()
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
 
+        nav = QHBoxLayout()
+        self.btn_prev = QPushButton("<")
+        self.btn_next = QPushButton(">")
+        self.lbl_month = QLabel()
+        self.lbl_month.setAlignment(Qt.AlignCenter)
+        self.btn_prev.clicked.connect(lambda: self._shift_month(-1))
+        self.btn_next.clicked.connect(lambda: self._shift_month(1))
+        nav.addWidget(self.btn_prev)
+        nav.addWidget(self.lbl_month, 1)
+        nav.addWidget(self.btn_next)
+        layout.addLayout(nav)
+
         self.lbl_day = QLabel()
         self.lbl_day.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.lbl_day)
@@ -28,38 +53,118 @@ class AgendaView(QWidget):
         self.calendar = QGridLayout()
         layout.addLayout(self.calendar)
 
+        self.lbl_items = QLabel()
+        self.lbl_items.setWordWrap(True)
+        self.lbl_items.setAlignment(Qt.AlignTop | Qt.AlignLeft)
+        layout.addWidget(self.lbl_items, 1)
+
+        # grade fixa de 6 semanas x 7 dias; o conteúdo é trocado a cada mês
+        for weekday, name in enumerate(WEEKDAY_NAMES):
+            hdr = QLabel(f"<b>{name}</b>")
+            hdr.setAlignment(Qt.AlignCenter)
+            self.calendar.addWidget(hdr, 0, weekday)
+        for i in range(42):
+            cell = QFrame()
+            cell.setFrameShape(QFrame.Box)
+            cell.setFixedSize(80, 60)
+            box = QVBoxLayout(cell)
+            box.setContentsMargins(4, 2, 4, 2)
+            lbl_num = QLabel()
+            lbl_badges = QLabel()
+            lbl_badges.setStyleSheet("font-size: 9px; color: #005B96;")
+            box.addWidget(lbl_num)
+            box.addWidget(lbl_badges, 1)
+            cell.mousePressEvent = (lambda idx=i: lambda event: self._cell_clicked(idx))()
+            self.calendar.addWidget(cell, 1 + i // 7, i % 7)
+            self._cells.append((cell, lbl_num, lbl_badges))
+
+        self.lbl_day.setText(f"<b>{self.selected_date.strftime('%d/%m/%Y')}</b>")
         self._build_calendar()
 
         self.refresh_day()
 
+    def _shift_month(self, delta: int):
+        month = self.shown_month + delta
+        self.shown_year += (month - 1) // 12
+        self.shown_month = (month - 1) % 12 + 1
+        self._build_calendar()
+
     def _build_calendar(self):
-        today = date.today()
-        self.lbl_day.setText(f"<b>{today.strftime('%d/%m/%Y')}</b>")
+        """Desenha a grade do mês na hora; as marcações chegam de um único `month_summary`."""
+        year, month = self.shown_year, self.shown_month
+        self.lbl_month.setText(f"<b>{MONTH_NAMES[month - 1]} {year}</b>")
+        self._render_month(year, month, {})
+        get_executor().submit(
+            self.agenda.month_summary, self.current_user, year, month, owner=self
+        ).then(lambda summary: self._render_month(year, month, summary))
 
-        for week in range(5):
-            for weekday in range(7):
-                cell = QFrame()
-                cell.setFrameShape(QFrame.Box)
-                cell.setFixedSize(80, 60)
-                self.calendar.addWidget(cell, week, weekday)
+    def _render_month(self, year: int, month: int, summary: dict):
+        if (year, month) != (self.shown_year, self.shown_month):
+            return  # resposta de um mês que o usuário já deixou
+        self._summary = summary
+        weeks = calendar.Calendar(firstweekday=6).monthdatescalendar(year, month)
+        days = [d for week in weeks for d in week]
+        today = date.today()
+        self._cell_dates = []
+        for i, (cell, lbl_num, lbl_badges) in enumerate(self._cells):
+            d = days[i] if i < len(days) else None
+            if d is None or d.month != month:
+                self._cell_dates.append(None)
+                lbl_num.setText("")
+                lbl_badges.setText("")
+                cell.setStyleSheet("")
+                continue
+            self._cell_dates.append(d)
+            info = summary.get(d)
+            num = f"<b>{d.day}</b>" if d in (today, self.selected_date) else str(d.day)
+            lbl_num.setText(num)
+            if info and info["kinds"]:
+                # ex.: "2 Reunião\n1 Audiência" (abreviado para caber na célula)
+                lbl_badges.setText("\n".join(
+                    f"{n} {kind[:8]}" for kind, n in sorted(info["kinds"].items())
+                ))
+            else:
+                lbl_badges.setText("")
+            if d == self.selected_date:
+                cell.setStyleSheet("QFrame { background-color: #D6E9F8; }")
+            elif info and info["available"]:
+                cell.setStyleSheet("QFrame { background-color: #E3F4E1; }")
+            else:
+                cell.setStyleSheet("")
 
-                s_date = today  # Você pode melhorar essa lógica para renderizar o mês corretamente
-                cell.mousePressEvent = (lambda d=s_date: lambda event: self._select_day(d))()
+    def _cell_clicked(self, idx: int):
+        if idx < len(self._cell_dates) and self._cell_dates[idx] is not None:
+            self._select_day(self._cell_dates[idx])
 
     def _select_day(self, d):
         self.selected_date = d
         self.lbl_day.setText(f"<b>{d.strftime('%d/%m/%Y')}</b>")
+        # só muda o destaque: reaproveita o resumo do mês já carregado
+        self._render_month(self.shown_year, self.shown_month, self._summary)
+        self.refresh_day()
+
+    def refresh(self):
+        self._build_calendar()
         self.refresh_day()
 
     def refresh_day(self):
         self._refresh_day()
 
     def _refresh_day(self):
-        try:
-            items = self.agenda.list_day(self.current_user, self.permset, self.selected_date)
-            print(f"[DEBUG] Itens do dia: {items}")
-        except Exception as e:
-            print(f"[ERROR] Falha ao listar compromissos: {e}")
+        get_executor().submit(
+            self.agenda.list_day, self.current_user, self.permset, self.selected_date, owner=self
+        ).then(self._render_day)
+
+    def _render_day(self, items):
+        if not items:
+            self.lbl_items.setText("Nenhum compromisso neste dia.")
+            return
+        lines = []
+        for a in items:
+            hour = a.start_time.strftime("%H:%M") if a.start_time else "Dia todo"
+            note = f" — {a.notes}" if a.notes else ""
+            lines.append(f"{hour}  {a.kind}{note}")
+        self.lbl_items.setText("\n".join(lines))
 
     def _open_popup(self, day):
         dlg = AppointmentFormDialog(
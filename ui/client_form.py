@@ -7,11 +7,14 @@ from PySide6.QtCore import Qt
 
 class ClientFormDialog(QDialog):
     def __init__(self, parent=None, *, client=None,
-                allow_assign: bool=False, responsibles: list[tuple[int,str]]|None=None):
+                allow_assign: bool=False, responsibles: list[tuple[int,str]]|None=None,
+                find_duplicate=None):
         super().__init__(parent)
         self.client = client
         self.allow_assign = allow_assign
         self.responsibles = responsibles or []
+        # find_duplicate(documento) -> bool — aviso antes de salvar
+        self.find_duplicate = find_duplicate
         self.setWindowTitle("Editar cliente" if client else "Novo cliente")
         self._build_ui()
         if client:
@@ -66,6 +69,16 @@ class ClientFormDialog(QDialog):
         if not self.in_name.text().strip():
             QMessageBox.warning(self, "Campos obrigatórios", "Informe o nome do cliente.")
             return
+        document = self.in_document.text().strip()
+        if document and self.find_duplicate:
+            if self.find_duplicate(document):
+                answer = QMessageBox.question(
+                    self, "Documento já cadastrado",
+                    "Outro cliente já usa este CPF/CNPJ.\nSalvar mesmo assim?",
+                )
+                if answer != QMessageBox.Yes:
+                    self.in_document.setFocus()
+                    return
         self.accept()
 
     def values(self):
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import Callable
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# fetch_page(before_id, limit) -> lista de tuplas no formato de ClientService.list_clients_page
+FetchPage = Callable[[int | None, int], list[tuple]]
+
+
+class ClientsTableModel(QAbstractTableModel):
+    """Modelo da tabela de clientes carregado sob demanda (canFetchMore/fetchMore)."""
+
+    HEADERS = ["ID", "Nome", "E-mail", "Telefone", "Documento", "Responsável", "Observações"]
+
+    def __init__(self, fetch_page: FetchPage, page_size: int = 200, parent=None, executor=None):
+        super().__init__(parent)
+        self._fetch_page = fetch_page
+        self._page_size = page_size
+        self._rows: list[tuple] = []
+        self._exhausted = False
+        # com executor (ui.db_executor), as janelas chegam de forma assíncrona
+        self._executor = executor
+        self._loading = False
+        self._generation = 0  # descarta janelas pedidas antes de um reset
+
+    def reset(self):
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        self._loading = False
+        self._generation += 1
+        self.endResetModel()
+
+    def row_id(self, row: int) -> int | None:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self._rows[index.row()][index.column()]
+        if value is None:
+            return ""
+        if index.column() == 6:
+            # preview limpo de quebras de linha
+            return value.replace("\n", " ")
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        before_id = self._rows[-1][0] if self._rows else None
+        if self._executor is None:
+            self._append(self._generation, self._fetch_page(before_id, self._page_size))
+            return
+        self._loading = True
+        generation = self._generation
+        self._executor.submit(
+            self._fetch_page, before_id, self._page_size, owner=self.parent()
+        ).then(lambda batch: self._append(generation, batch),
+               lambda _msg: self._failed(generation))
+
+    def _failed(self, generation: int):
+        if generation == self._generation:
+            self._loading = False
+
+    def _append(self, generation: int, batch: list[tuple]):
+        if generation != self._generation:
+            return
+        self._loading = False
+        if len(batch) < self._page_size:
+            self._exhausted = True
+        if not batch:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
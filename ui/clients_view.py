@@ -1,9 +1,12 @@
 from __future__ import annotations
+from PySide6.QtCore import QModelIndex, QTimer
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
-    QTableWidgetItem, QMessageBox, QAbstractItemView
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView,
+    QMessageBox, QAbstractItemView, QLineEdit
 )
 from .client_form import ClientFormDialog
+from .clients_model import ClientsTableModel
+from .db_executor import get_executor
 
 class ClientsView(QWidget):
     def __init__(self, client_service, auth_service, current_user, permset: set[str]):
@@ -12,6 +15,7 @@ class ClientsView(QWidget):
         self.auth = auth_service
         self.current_user = current_user
         self.permset = permset
+        self._search_ids: list[int] | None = None  # None => listagem normal
         self._build_ui()
         self._apply_perm_rules()
         self._refresh()
@@ -27,18 +31,31 @@ class ClientsView(QWidget):
         btns.addWidget(self.btn_edit)
         btns.addWidget(self.btn_del)
         btns.addStretch(1)
+        self.in_search = QLineEdit()
+        self.in_search.setPlaceholderText("Buscar (nome, e-mail, telefone, documento, notas)")
+        self.in_search.setClearButtonEnabled(True)
+        self.in_search.setMinimumWidth(280)
+        btns.addWidget(self.in_search)
         btns.addWidget(self.btn_refresh)
 
-        # + Observações
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels(
-            ["ID", "Nome", "E-mail", "Telefone", "Documento", "Responsável", "Observações"]
-        )
+        # debounce: só consulta depois que o usuário para de digitar
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._run_search)
+        self.in_search.textChanged.connect(lambda *_: self._search_timer.start())
+
+        # + Observações — modelo paginado: só busca janelas conforme a rolagem
+        self.model = ClientsTableModel(self._fetch_page, parent=self, executor=get_executor())
+        self.model.rowsInserted.connect(self._rows_inserted)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
         # UX: duplo-clique para editar
-        self.table.itemDoubleClicked.connect(lambda *_: self._edit())
+        self.table.doubleClicked.connect(lambda *_: self._edit())
 
         layout.addLayout(btns)
         layout.addWidget(self.table)
@@ -53,37 +70,59 @@ class ClientsView(QWidget):
         self.btn_edit.setEnabled(("clients.update_all" in self.permset) or ("clients.update_own" in self.permset))
         self.btn_del.setEnabled(("clients.delete_all" in self.permset) or ("clients.delete_own" in self.permset))
 
+    def _fetch_page(self, before_id: int | None, limit: int) -> list[tuple]:
+        if self._search_ids is not None:
+            # resultado de busca: uma única janela, na ordem de relevância
+            if before_id is not None or not self._search_ids:
+                return []
+            rows = self.svc.list_clients_page(
+                self.current_user, self.permset, ids=self._search_ids, limit=len(self._search_ids)
+            )
+            rank = {cid: i for i, cid in enumerate(self._search_ids)}
+            return sorted(rows, key=lambda r: rank[r[0]])
+        return self.svc.list_clients_page(
+            self.current_user, self.permset, before_id=before_id, limit=limit
+        )
+
+    def _run_search(self):
+        q = self.in_search.text().strip()
+        if not q:
+            self._search_ids = None
+            self._refresh()
+            return
+        get_executor().submit(
+            self.svc.search, q, self.permset, limit=200, current_user=self.current_user, owner=self
+        ).then(lambda hits, q=q: self._show_search(q, hits))
+
+    def _show_search(self, q: str, hits: list[tuple[int, str]]):
+        if q != self.in_search.text().strip():
+            return  # o usuário já digitou outra coisa
+        self._search_ids = [cid for cid, _ in hits]
+        self._refresh()
+
     def _refresh(self):
-        rows = self.svc.list_clients(self.current_user, self.permset)
-        self.table.setRowCount(0)
-        for c in rows:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(str(c.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(c.name or ""))
-            self.table.setItem(row, 2, QTableWidgetItem(c.email or ""))
-            self.table.setItem(row, 3, QTableWidgetItem(c.phone or ""))
-            self.table.setItem(row, 4, QTableWidgetItem(c.document or ""))
-            self.table.setItem(row, 5, QTableWidgetItem(c.responsible.username if c.responsible else ""))
-            # preview limpo de quebras de linha
-            preview = (c.notes or "").replace("\n", " ")[:120]
-            self.table.setItem(row, 6, QTableWidgetItem(preview))
-        self.table.resizeColumnsToContents()
+        self.model.reset()
+        if self.model.canFetchMore(QModelIndex()):
+            self.model.fetchMore(QModelIndex())
+
+    def _rows_inserted(self, _parent, first: int, _last: int):
+        if first == 0:
+            self.table.resizeColumnsToContents()
 
     def _selected_id(self) -> int | None:
-        r = self.table.currentRow()
-        if r < 0:
+        idx = self.table.currentIndex()
+        if not idx.isValid():
             return None
-        it = self.table.item(r, 0)
-        return int(it.text()) if it else None
+        return self.model.row_id(idx.row())
 
     def _new(self):
         if "clients.create" not in self.permset:
             QMessageBox.warning(self, "Acesso negado", "Sem permissão para criar clientes.")
             return
         allow_assign = ("clients.assign_responsible" in self.permset) or ("clients.update_all" in self.permset)
-        responsibles = [(u.id, u.username) for u in self.auth.list_users_by_role("advogado")] if allow_assign else []
-        dlg = ClientFormDialog(self, allow_assign=allow_assign, responsibles=responsibles)
+        responsibles = list(self.auth.list_responsibles("advogado")) if allow_assign else []
+        dlg = ClientFormDialog(self, allow_assign=allow_assign, responsibles=responsibles,
+                               find_duplicate=self.svc.document_exists)
         if dlg.exec():
             vals = dlg.values()
             self.svc.create_client(current_user=self.current_user, permset=self.permset, **vals)
@@ -94,15 +133,16 @@ class ClientsView(QWidget):
         if cid is None:
             QMessageBox.information(self, "Editar", "Selecione um cliente.")
             return
-        c = self.svc.get_client(cid)
+        c = self.svc.get_client(cid, current_user=self.current_user, permset=self.permset)
         # robustez: registro pode ter sido removido em outra sessão
         if not c:
             QMessageBox.warning(self, "Cliente", "Registro não encontrado (pode ter sido removido).")
             self._refresh()
             return
         allow_assign = ("clients.assign_responsible" in self.permset) or ("clients.update_all" in self.permset)
-        responsibles = [(u.id, u.username) for u in self.auth.list_users_by_role("advogado")] if allow_assign else []
-        dlg = ClientFormDialog(self, client=c, allow_assign=allow_assign, responsibles=responsibles)
+        responsibles = list(self.auth.list_responsibles("advogado")) if allow_assign else []
+        dlg = ClientFormDialog(self, client=c, allow_assign=allow_assign, responsibles=responsibles,
+                               find_duplicate=lambda doc: self.svc.document_exists(doc, exclude_id=cid))
         if dlg.exec():
             vals = dlg.values()
             try:
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+from PySide6.QtCore import QObject, Signal, Slot
+
+
+class DbFuture(QObject):
+    """Resultado de uma chamada ao banco; os sinais chegam na thread da UI."""
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, key: Optional[Hashable], owner: Optional[QObject]):
+        super().__init__()
+        self.key = key
+        self.owner = owner
+        self._cancelled = False
+        self.done = False
+
+    def cancel(self) -> None:
+        # não interrompe a consulta em andamento: apenas descarta o resultado
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def then(self, on_ok: Callable[[Any], None], on_error: Optional[Callable[[str], None]] = None) -> "DbFuture":
+        self.finished.connect(on_ok)
+        if on_error is not None:
+            self.failed.connect(on_error)
+        return self
+
+
+class DbExecutor(QObject):
+    """Executa chamadas dos serviços numa thread dedicada ao banco.
+
+    - FIFO numa única thread (escritas e leituras na ordem em que foram pedidas);
+    - coalescência: pedido igual (mesma `key`, mesmo `owner`) ainda pendente devolve o mesmo DbFuture;
+    - cancelamento por dono (`cancel_owner`), ex.: quando a tela sai do RootWindow.stack.
+    """
+
+    _completed = Signal(object, object, object)  # (future, resultado, erro)
+
+    def __init__(self, parent: Optional[QObject] = None, workers: int = 1):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._pending: dict[Hashable, DbFuture] = {}
+        self._inflight: set[DbFuture] = set()
+        self._lock = threading.Lock()
+        self._completed.connect(self._on_completed)
+
+    def submit(
+        self, fn: Callable, *args, key: Optional[Hashable] = None,
+        owner: Optional[QObject] = None, **kwargs,
+    ) -> DbFuture:
+        if key is None:
+            key = _auto_key(fn, args, kwargs)
+        if key is not None:
+            # só coalesce pedidos do mesmo dono: cancel_owner de uma tela não
+            # pode deixar callbacks dela presos a um pedido de outra
+            key = (id(owner), key)
+        with self._lock:
+            if key is not None:
+                same = self._pending.get(key)
+                if same is not None and not same.cancelled:
+                    return same
+            future = DbFuture(key, owner)
+            if key is not None:
+                self._pending[key] = future
+            self._inflight.add(future)
+        self._pool.submit(self._run, future, fn, args, kwargs)
+        return future
+
+    def _run(self, future: DbFuture, fn, args, kwargs):
+        if future.cancelled:
+            self._completed.emit(future, None, None)
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:  # entregue pelo sinal failed
+            self._completed.emit(future, None, e)
+            return
+        self._completed.emit(future, result, None)
+
+    @Slot(object, object, object)
+    def _on_completed(self, future: DbFuture, result, error):
+        with self._lock:
+            if self._pending.get(future.key) is future:
+                del self._pending[future.key]
+            self._inflight.discard(future)
+        future.done = True
+        if future.cancelled:
+            return
+        if error is not None:
+            print(f"[ERROR] Falha na consulta em segundo plano: {error}")
+            future.failed.emit(str(error))
+        else:
+            future.finished.emit(result)
+
+    def cancel_owner(self, owner: QObject) -> int:
+        """Descarta os resultados pendentes pedidos por `owner`."""
+        n = 0
+        with self._lock:
+            for future in self._inflight:
+                if future.owner is owner and not future.cancelled:
+                    future.cancel()
+                    n += 1
+        return n
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for future in self._inflight:
+                future.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _auto_key(fn, args, kwargs) -> Optional[Hashable]:
+    # chamadas idênticas (mesmo método, mesmo serviço, mesmos argumentos) são coalescidas
+    target = getattr(fn, "__self__", None)
+    key = (id(target), getattr(fn, "__name__", repr(fn)), args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+_executor: Optional[DbExecutor] = None
+
+
+def get_executor() -> DbExecutor:
+    """Executor único da aplicação (criado na primeira chamada, na thread da UI)."""
+    global _executor
+    if _executor is None:
+        _executor = DbExecutor()
+    return _executor
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import json
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
+    QTabWidget, QLabel, QSpinBox, QCheckBox, QFileDialog, QMessageBox, QAbstractItemView
+)
+from core.querystats import query_stats
+from core.writes import write_coordinator
+
+REFRESH_MS = 1000
+
+_COLUMNS = ["Chamador", "Qtd", "Total (ms)", "Média (ms)", "p95 (ms)", "Máx (ms)", "Linhas", "SQL"]
+
+
+class DevToolsDialog(QDialog):
+    """Painel do root: consultas mais lentas/frequentes e suspeitas de N+1, ao vivo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Dev Tools — SQL")
+        self.resize(1000, 520)
+        self._build_ui()
+        query_stats.enable()
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start(REFRESH_MS)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        bar = QHBoxLayout()
+        self.chk_collect = QCheckBox("Coletar")
+        self.chk_collect.setChecked(True)
+        self.spn_top = QSpinBox()
+        self.spn_top.setRange(5, 200)
+        self.spn_top.setValue(20)
+        self.btn_reset = QPushButton("Zerar")
+        self.btn_export = QPushButton("Exportar JSON...")
+        self.lbl_totals = QLabel()
+        bar.addWidget(self.chk_collect)
+        bar.addWidget(QLabel("Top"))
+        bar.addWidget(self.spn_top)
+        bar.addWidget(self.lbl_totals, 1)
+        bar.addWidget(self.btn_reset)
+        bar.addWidget(self.btn_export)
+        layout.addLayout(bar)
+
+        self.tabs = QTabWidget()
+        self.tbl_slow = self._make_table(_COLUMNS)
+        self.tbl_frequent = self._make_table(_COLUMNS)
+        self.tbl_suspects = self._make_table(["Chamador", "Repetições", "Desde", "SQL"])
+        self.tabs.addTab(self.tbl_slow, "Mais lentas")
+        self.tabs.addTab(self.tbl_frequent, "Mais frequentes")
+        self.tabs.addTab(self.tbl_suspects, "N+1")
+        layout.addWidget(self.tabs)
+
+        self.chk_collect.toggled.connect(self._toggle_collect)
+        self.spn_top.valueChanged.connect(self._refresh)
+        self.btn_reset.clicked.connect(self._reset)
+        self.btn_export.clicked.connect(self._export)
+
+    @staticmethod
+    def _make_table(headers: list[str]) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill(table: QTableWidget, rows: list[list]):
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(r, c, item)
+
+    @staticmethod
+    def _stat_row(s: dict) -> list:
+        caller = next(iter(s["callers"]), "?")
+        if len(s["callers"]) > 1:
+            caller += f" (+{len(s['callers']) - 1})"
+        return [caller, s["count"], s["total_ms"], s["avg_ms"], s["p95_ms"], s["max_ms"], s["rows"], s["statement"]]
+
+    def _refresh(self):
+        if not self.isVisible():
+            return
+        n = self.spn_top.value()
+        self._fill(self.tbl_slow, [self._stat_row(s) for s in query_stats.top(n, by="max_ms")])
+        self._fill(self.tbl_frequent, [self._stat_row(s) for s in query_stats.top(n, by="count")])
+        suspects = query_stats.suspects()
+        self._fill(self.tbl_suspects, [[s["caller"], s["repeats"], s["first_seen"], s["statement"]] for s in suspects])
+        self.tabs.setTabText(2, f"N+1 ({len(suspects)})" if suspects else "N+1")
+        snap = query_stats.snapshot()
+        w = write_coordinator.snapshot()
+        self.lbl_totals.setText(
+            f"{snap['total_queries']} consultas, {snap['total_ms']:.1f} ms | "
+            f"escritas {w['transactions']} ({w['contended']} disputadas, {w['retries']} retentativas), "
+            f"espera p95 {w['queue_wait_ms']['p95'] + w['begin_wait_ms']['p95']:.1f} ms"
+        )
+
+    def _toggle_collect(self, on: bool):
+        if on:
+            query_stats.enable()
+        else:
+            query_stats.disable()
+
+    def _reset(self):
+        query_stats.reset()
+        self._refresh()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar estatísticas", "querystats.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as fp:
+                json.dump(query_stats.snapshot(), fp, ensure_ascii=False, indent=2)
+        except OSError as e:
+            QMessageBox.warning(self, "Exportar", f"Falha ao gravar: {e}")
+
+
+_dialog: DevToolsDialog | None = None
+
+
+def _forget_dialog(*_):
+    global _dialog
+    _dialog = None
+
+
+def open_dev_tools(parent=None) -> DevToolsDialog:
+    """Abre (ou traz para frente) o painel único de Dev Tools."""
+    global _dialog
+    if _dialog is None:
+        # pendurado na janela principal: sobrevive à troca de telas do stack
+        _dialog = DevToolsDialog(parent.window() if parent is not None else None)
+        _dialog.destroyed.connect(_forget_dialog)
+    _dialog.show()
+    _dialog.raise_()
+    _dialog.activateWindow()
+    return _dialog
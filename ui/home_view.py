@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
 from datetime import datetime
 from PySide6.QtCore import Qt
+from ui.db_executor import get_executor
 
 
 class HomeView(QWidget):
@@ -31,16 +32,22 @@ class HomeView(QWidget):
         if self.current_user.username != "root":
             self.btn_dev.hide()
 
+    def refresh(self):
+        self._load_appointments()
+
     def _load_appointments(self):
         today = datetime.today().date()
-        try:
-            appointments = self.agenda_service.list_day(self.current_user, self.permset, today)
-            summary = f"Você tem {len(appointments)} compromisso(s) para hoje."
-        except Exception as e:
-            summary = f"[Erro] Falha ao carregar compromissos: {e}"
+        self.lbl_summary.setText("Resumo do dia: carregando...")
+        get_executor().submit(
+            self.agenda_service.list_day, self.current_user, self.permset, today, owner=self
+        ).then(self._show_summary, self._show_error)
+
+    def _show_summary(self, appointments):
+        self.lbl_summary.setText(f"Você tem {len(appointments)} compromisso(s) para hoje.")
 
-        self.lbl_summary.setText(summary)
+    def _show_error(self, message: str):
+        self.lbl_summary.setText(f"[Erro] Falha ao carregar compromissos: {message}")
 
     def _open_dev_tools(self):
-        # Aqui você pode adicionar um diálogo ou outra interface de desenvolvedor
-        print("[DEBUG] Dev Tools abertas para root.")
+        from ui.dev_tools import open_dev_tools
+        open_dev_tools(self)
@@ -1,21 +1,45 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QHBoxLayout, QSpacerItem, QSizePolicy, QStyle
+    QHBoxLayout, QSpacerItem, QSizePolicy, QStyle, QApplication
 )
 from PySide6.QtGui import QFont
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, Signal
+
+
+class _LoginSignals(QObject):
+    # emitidos da thread do pool; entregues na thread da UI (conexão enfileirada)
+    finished = Signal(object)
+    failed = Signal(str)
 
 
 class LoginView(QWidget):
     def __init__(self, auth_service, on_login_ok):
+        """`auth_service` pode chegar depois (set_auth_service), quando o banco ficar pronto."""
         super().__init__()
         self.auth_service = auth_service
         self.on_login_ok = on_login_ok
+        self._busy = False
+        self._signals = _LoginSignals(self)
+        self._signals.finished.connect(self._on_login_finished)
+        self._signals.failed.connect(self._on_login_failed)
         self.resize(500, 360)
         self.setMinimumSize(400, 300)
         self.setWindowTitle("Login - JurisGestão")
 
         self._build_ui()
+        if auth_service is None:
+            self._set_ready(False, "Preparando banco de dados...")
+
+    def set_auth_service(self, auth_service):
+        self.auth_service = auth_service
+        self._set_ready(True, "")
+
+    def set_unavailable(self, message: str):
+        self._set_ready(False, f"Banco de dados indisponível: {message}")
+
+    def _set_ready(self, ready: bool, message: str):
+        self.login_btn.setEnabled(ready)
+        self.status_lbl.setText(message)
 
     def _build_ui(self):
         self.setStyleSheet("""
@@ -91,15 +115,55 @@ class LoginView(QWidget):
         self.login_btn.clicked.connect(self._handle_login)
         layout.addWidget(self.login_btn)
 
+        self.status_lbl = QLabel("")
+        self.status_lbl.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_lbl)
+
         layout.addSpacerItem(QSpacerItem(0, 80, QSizePolicy.Minimum, QSizePolicy.Expanding))
 
     def _handle_login(self):
+        if self._busy or self.auth_service is None:
+            return
         user = self.username_input.text()
         pwd = self.password_input.text()
-        account = self.auth_service.authenticate(user, pwd)
+        self._set_busy(True)
+        self.auth_service.authenticate_async(user, pwd, callback=self._deliver)
+
+    def _deliver(self, future):
+        # roda na thread do pool: só repassa o resultado via sinal
+        try:
+            if future.exception() is not None:
+                self._signals.failed.emit(str(future.exception()))
+            else:
+                self._signals.finished.emit(future.result())
+        except RuntimeError:
+            pass  # janela já destruída
+
+    def _set_busy(self, busy: bool):
+        self._busy = busy
+        self.username_input.setEnabled(not busy)
+        self.password_input.setEnabled(not busy)
+        self.login_btn.setEnabled(not busy)
+        self.login_btn.setText(" Entrando..." if busy else " Entrar")
+        if busy:
+            self.status_lbl.setText("")
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+        else:
+            QApplication.restoreOverrideCursor()
+
+    def _on_login_finished(self, account):
+        self._set_busy(False)
         if account:
+            self.status_lbl.setText("")
             self.on_login_ok(account)
         else:
+            self.status_lbl.setText("Usuário ou senha inválidos.")
             self.username_input.clear()
             self.password_input.clear()
             self.username_input.setFocus()
+
+    def _on_login_failed(self, message: str):
+        self._set_busy(False)
+        self.status_lbl.setText(f"Falha ao autenticar: {message}")
+        self.password_input.clear()
+        self.password_input.setFocus()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import heapq
+from datetime import datetime
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtWidgets import QApplication, QStyle, QSystemTrayIcon
+from core import events
+from core.reminders import PendingReminder, ReminderService, as_pending
+from ui.db_executor import get_executor
+
+# maior espera armada de uma vez: o timer acorda de tempos em tempos para
+# recalcular (relógio ajustado, máquina suspensa) sem varrer a tabela
+MAX_WAIT_MS = 60 * 60 * 1000
+
+
+class ReminderScheduler(QObject):
+    """Dispara os lembretes do usuário logado com um único QTimer.
+
+    Os pendentes ficam num min-heap por horário; o timer é armado só para o
+    primeiro. Criar/excluir compromissos atualiza o heap via core.events,
+    sem reler o banco. Parado, não consome CPU.
+
+    Exclusão tira do heap na hora os lembretes do compromisso: ids de
+    compromisso são reaproveitados pelo SQLite, então não há lista de
+    "cancelados" que um compromisso novo com o mesmo id pudesse herdar.
+    """
+
+    due = Signal(object)                 # PendingReminder disparado
+    _created = Signal(object)            # ponte thread do serviço -> thread da UI
+    _deleted = Signal(int)
+
+    def __init__(self, parent=None, service: ReminderService | None = None):
+        super().__init__(parent)
+        self.service = service or ReminderService()
+        self.user_id: int | None = None
+        self._heap: list[PendingReminder] = []
+        # eventos chegados antes da carga inicial: reaplicados sobre ela, em ordem
+        self._loading = False
+        self._backlog: list[tuple[str, object]] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire_due)
+        self._created.connect(self._push)
+        self._deleted.connect(self._cancel)
+        self._tray: QSystemTrayIcon | None = None
+
+    # --- ciclo de vida ---
+    def start(self, user_id: int) -> None:
+        self.stop()
+        self.user_id = user_id
+        self._loading = True
+        events.subscribe("appointment.created", self._on_created)
+        events.subscribe("appointment.deleted", self._on_deleted)
+        get_executor().submit(self.service.pending, user_id, owner=self).then(self._load)
+
+    def stop(self) -> None:
+        events.unsubscribe("appointment.created", self._on_created)
+        events.unsubscribe("appointment.deleted", self._on_deleted)
+        get_executor().cancel_owner(self)
+        self._timer.stop()
+        self._heap.clear()
+        self._loading = False
+        self._backlog.clear()
+        self.user_id = None
+
+    def pending_count(self) -> int:
+        return len(self._heap)
+
+    # --- heap ---
+    def _load(self, pending: list[PendingReminder]) -> None:
+        # já vem ordenado do banco; heapify garante a invariante de qualquer forma
+        self._heap = list(pending)
+        heapq.heapify(self._heap)
+        self._loading = False
+        backlog, self._backlog = self._backlog, []
+        for op, arg in backlog:
+            (self._push if op == "push" else self._cancel)(arg)
+        self._arm()
+
+    def _on_created(self, appointment, reminders, **_):
+        # thread de quem criou: só repassa
+        if appointment.user_id == self.user_id:
+            for r in reminders:
+                if r.channel == "popup":
+                    self._created.emit(as_pending(r))
+
+    def _on_deleted(self, appointment_id, user_id=None, **_):
+        if user_id == self.user_id:
+            self._deleted.emit(appointment_id)
+
+    def _push(self, reminder: PendingReminder) -> None:
+        if self._loading:
+            self._backlog.append(("push", reminder))
+            return
+        if any(r.id == reminder.id for r in self._heap):
+            return  # a carga inicial já trouxe este
+        heapq.heappush(self._heap, reminder)
+        if self._heap[0] is reminder:
+            self._arm()
+
+    def _cancel(self, appointment_id: int) -> None:
+        if self._loading:
+            self._backlog.append(("cancel", appointment_id))
+            return
+        was_first = bool(self._heap) and self._heap[0].appointment_id == appointment_id
+        kept = [r for r in self._heap if r.appointment_id != appointment_id]
+        if len(kept) == len(self._heap):
+            return
+        heapq.heapify(kept)
+        self._heap = kept
+        if was_first:
+            self._arm()
+
+    def _arm(self) -> None:
+        if not self._heap:
+            self._timer.stop()
+            return
+        wait = (self._heap[0].fire_at - datetime.now()).total_seconds() * 1000
+        self._timer.start(int(min(max(wait, 0), MAX_WAIT_MS)))
+
+    def _fire_due(self) -> None:
+        now = datetime.now()
+        fired = []
+        while self._heap and self._heap[0].fire_at <= now:
+            reminder = heapq.heappop(self._heap)
+            fired.append(reminder)
+            self.due.emit(reminder)
+            self._notify(reminder)
+        if fired:
+            get_executor().submit(self.service.mark_delivered, [r.id for r in fired], self.user_id)
+        self._arm()
+
+    # --- aviso ---
+    def _notify(self, reminder: PendingReminder) -> None:
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return  # sem bandeja: quem escuta `due` mostra o aviso
+        if self._tray is None:
+            icon = QApplication.style().standardIcon(QStyle.SP_MessageBoxInformation)
+            self._tray = QSystemTrayIcon(icon, self)
+            self._tray.setToolTip("JurisGestão")
+            self._tray.show()
+        self._tray.showMessage("Lembrete", reminder.message, QSystemTrayIcon.Information, 10_000)
@@ -1,32 +1,52 @@
-from PySide6.QtWidgets import QMainWindow, QStackedWidget, QMessageBox, QMenuBar, QMenu
+from __future__ import annotations
+from PySide6.QtWidgets import QMainWindow, QStackedWidget, QMessageBox, QMenuBar, QMenu, QSystemTrayIcon
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QAction
 from ui.login_view import LoginView
-from ui.home_view import HomeView
-from ui.users_view import UsersView
-from ui.clients_view import ClientsView
-from ui.calendar_view import AgendaView
-from core.auth import AuthService
 from core.agenda import AgendaService
 from core.clients import ClientService
 from core.rbac import RBACService
+from core.remote import (
+    RemoteAgendaService, RemoteClientService, RemoteRBACService, RemoteReminderService, RemoteService,
+)
+from core import audit, startup
+from ui.db_executor import get_executor
+from ui.reminder_scheduler import ReminderScheduler
+
+# As telas são importadas e construídas no primeiro uso (ver _open_*):
+# o login e a primeira tela após o login não pagam pelas demais.
 
 
 class RootWindow(QMainWindow):
-    def __init__(self, auth_service: AuthService):
+    def __init__(self, auth_service):
         super().__init__()
         self.setWindowTitle("JurisGestão")
         self.setGeometry(100, 100, 1000, 600)
 
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
+        self._current_view = None
+        self.stack.currentChanged.connect(self._on_view_changed)
 
         self.auth = auth_service
-        self.rbac = RBACService(self.auth.session_factory)
-        self.agenda = AgendaService()
-        self.clients = ClientService()
+        reminder_service = None
+        if isinstance(auth_service, RemoteService):
+            # modo servidor (JURIS_SERVER_URL): mesmos métodos, via HTTP
+            client = auth_service.client
+            self.rbac = RemoteRBACService(client)
+            self.agenda = RemoteAgendaService(client)
+            self.clients = RemoteClientService(client)
+            reminder_service = RemoteReminderService(client)
+        else:
+            self.rbac = RBACService(self.auth.session_factory)
+            self.agenda = AgendaService()
+            self.clients = ClientService()
 
         self.current_user = None
-        self.permset = set()
+        self.permset = frozenset()
+
+        self.reminders = ReminderScheduler(self, service=reminder_service)
+        self.reminders.due.connect(self._show_reminder)
 
         self._build_menu()
 
@@ -38,6 +58,9 @@ class RootWindow(QMainWindow):
         self.menu = QMenuBar()
         self.setMenuBar(self.menu)
 
+        self.menu_file = QMenu("Menu", self)
+        self.menu.addMenu(self.menu_file)
+
         self.act_users = QAction("Usuários", self)
         self.act_users.triggered.connect(self._open_users)
         self.menu_file.addAction(self.act_users)
@@ -46,9 +69,6 @@ class RootWindow(QMainWindow):
         self.act_clients.triggered.connect(self._open_clients)
         self.menu_file.addAction(self.act_clients)
 
-        self.menu_file = QMenu("Menu", self)
-        self.menu.addMenu(self.menu_file)
-
         self.act_home = QAction("Início", self)
         self.act_home.triggered.connect(self._open_home)
         self.menu_file.addAction(self.act_home)
@@ -70,25 +90,52 @@ class RootWindow(QMainWindow):
 
         self.menu_dev.menuAction().setVisible(False)  # Oculto por padrão
 
+    def _on_view_changed(self, _index):
+        # tela que saiu de cena: resultados pendentes dela são descartados
+        new = self.stack.currentWidget()
+        old = self._current_view
+        if old is not None and old is not new:
+            get_executor().cancel_owner(old)
+        self._current_view = new
+
+    def _replace_view(self, attr: str, widget, show: bool = True):
+        """Coloca `widget` no stack no lugar da instância anterior guardada em `attr`."""
+        old = getattr(self, attr, None)
+        self.stack.addWidget(widget)
+        setattr(self, attr, widget)
+        if show:
+            self.stack.setCurrentWidget(widget)
+        if old is not None:
+            get_executor().cancel_owner(old)
+            self.stack.removeWidget(old)
+            old.deleteLater()
+
+    def _drop_view(self, attr: str):
+        old = getattr(self, attr, None)
+        if old is not None:
+            get_executor().cancel_owner(old)
+            self.stack.removeWidget(old)
+            old.deleteLater()
+            setattr(self, attr, None)
+
     def _open_users(self):
-        self.users_view = UsersView(auth_service=self.auth, permset=self.permset)
-        self.stack.addWidget(self.users_view)
-        self.stack.setCurrentWidget(self.users_view)
+        from ui.users_view import UsersView
+        self._replace_view("users_view", UsersView(auth_service=self.auth, permset=self.permset))
 
 
     def _open_clients(self):
-        self.clients_view = ClientsView(
+        from ui.clients_view import ClientsView
+        self._replace_view("clients_view", ClientsView(
             client_service=self.clients,
             auth_service=self.auth,
             current_user=self.current_user,
             permset=self.permset
-        )
-        self.stack.addWidget(self.clients_view)
-        self.stack.setCurrentWidget(self.clients_view)
+        ))
 
 
 
     def _apply_menu_permissions(self):
+        # permset é um snapshot imutável do RBACService: cada teste é O(1)
         is_root = getattr(self.current_user, "username", "") == "root"
         self.menu_dev.menuAction().setVisible(is_root)
 
@@ -103,36 +150,44 @@ class RootWindow(QMainWindow):
     def _go_home(self, user):
         self.current_user = user
         self.permset = self.rbac.effective_permissions(user)
+        audit.set_actor(user.id)
 
-        self.home_view = HomeView(
+        from ui.home_view import HomeView
+        # telas do usuário anterior saem; a agenda só é montada quando aberta
+        for attr in ("agenda_view", "users_view", "clients_view"):
+            self._drop_view(attr)
+        self._replace_view("home_view", HomeView(
             current_user=self.current_user,
             agenda_service=self.agenda,
             permset=self.permset
-        )
-        self.agenda_view = AgendaView(
-            agenda_service=self.agenda,
-            client_service=self.clients,
-            auth_service=self.auth,
-            current_user=self.current_user,
-            permset=self.permset,
-        )
-
-        self.stack.addWidget(self.home_view)
-        self.stack.addWidget(self.agenda_view)
+        ), show=False)
 
         self._apply_menu_permissions()
         self.stack.setCurrentWidget(self.home_view)
         self.statusBar().showMessage("Autenticado com sucesso", 3000)
+        self.reminders.start(user.id)
+        startup.mark("tela inicial montada")
 
     def _open_home(self):
-        if hasattr(self, "home_view"):
+        if getattr(self, "home_view", None) is not None:
             self.home_view.refresh()
             self.stack.setCurrentWidget(self.home_view)
 
     def _open_agenda(self):
-        if hasattr(self, "agenda_view"):
+        if self.current_user is None:
+            return
+        if getattr(self, "agenda_view", None) is not None:
             self.agenda_view.refresh()
-            self.stack.setCurrentWidget(self.agenda_view)
+        else:
+            from ui.calendar_view import AgendaView
+            self._replace_view("agenda_view", AgendaView(
+                agenda_service=self.agenda,
+                client_service=self.clients,
+                auth_service=self.auth,
+                current_user=self.current_user,
+                permset=self.permset,
+            ), show=False)
+        self.stack.setCurrentWidget(self.agenda_view)
 
     def _logout(self):
         confirm = QMessageBox.question(
@@ -142,11 +197,22 @@ class RootWindow(QMainWindow):
             QMessageBox.Yes | QMessageBox.No,
         )
         if confirm == QMessageBox.Yes:
+            self.reminders.stop()
+            self.auth.logout(self.current_user.id)
+            audit.set_actor(None)
             self.current_user = None
-            self.permset.clear()
+            self.permset = frozenset()
             self._apply_menu_permissions()
             self.stack.setCurrentWidget(self.login_view)
             self.statusBar().showMessage("Logout efetuado", 3000)
 
+    def _show_reminder(self, reminder):
+        self.statusBar().showMessage(f"Lembrete: {reminder.message}", 15000)
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            box = QMessageBox(QMessageBox.Information, "Lembrete", reminder.message, parent=self)
+            box.setAttribute(Qt.WA_DeleteOnClose)
+            box.open()  # não modal: não bloqueia a tela atual
+
     def _debug(self):
-        QMessageBox.information(self, "Debug", "Modo desenvolvedor ativado.")
+        from ui.dev_tools import open_dev_tools
+        open_dev_tools(self)
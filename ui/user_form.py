@@ -41,9 +41,9 @@ class UserFormDialog(QDialog):
 
     def _load_roles(self):
         self.lst_roles.clear()
-        for r in self.auth.list_roles():
-            item = QListWidgetItem(r.name)
-            item.setData(Qt.UserRole, r.name)
+        for name in self.auth.list_role_names():
+            item = QListWidgetItem(name)
+            item.setData(Qt.UserRole, name)
             self.lst_roles.addItem(item)
 
     def _fill_from_user(self, user):
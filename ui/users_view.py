@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (
     QMessageBox, QAbstractItemView
 )
 from .user_form import UserFormDialog
+from .db_executor import get_executor
 
 class UsersView(QWidget):
     def __init__(self, auth_service, permset: set[str] | None = None):
@@ -48,13 +49,18 @@ class UsersView(QWidget):
         self.btn_del.setEnabled("users.delete" in self.permset)
 
     def _refresh(self):
-        users = self.auth.list_users()
-        self.table.setRowCount(0)
-        for (uid, uname, email, active) in users:
-            u = self.auth.get_user(uid)  # para exibir papéis
-            roles = ", ".join(sorted([r.name for r in u.roles])) if u else ""
-            row = self.table.rowCount()
-            self.table.insertRow(row)
+        # uma única consulta já traz os papéis agregados (sem get_user por linha)
+        self.btn_refresh.setEnabled(False)
+        get_executor().submit(self.auth.list_users_with_roles, owner=self).then(self._fill, self._load_failed)
+
+    def _load_failed(self, message: str):
+        self.btn_refresh.setEnabled(True)
+        QMessageBox.warning(self, "Usuários", f"Falha ao carregar: {message}")
+
+    def _fill(self, users):
+        self.btn_refresh.setEnabled(True)
+        self.table.setRowCount(len(users))
+        for row, (uid, uname, email, active, roles) in enumerate(users):
             self.table.setItem(row, 0, QTableWidgetItem(str(uid)))
             self.table.setItem(row, 1, QTableWidgetItem(uname))
             self.table.setItem(row, 2, QTableWidgetItem(email))